@@ -4,11 +4,19 @@ from . import graph
 from . import examples
 from .tree import Tree
 from .tree import BinaryTree
+from .tsp import solve_tsp
+from .generators import netgen
+from .dimacs import read_dimacs, write_dimacs
+from .dot_parser import read_dot
+from .snapshot import Snapshot, VersionedSnapshot, QueryExecutor
 
 Graph = graph.Graph
 DisjointSet = graph.DisjointSet
+read_binary = graph.read_binary
 MATPLOTLIB_INSTALLED = graph.MATPLOTLIB_INSTALLED
 DOT2TEX_INSTALLED = graph.DOT2TEX_INSTALLED
 PIL_INSTALLED = graph.PIL_INSTALLED
 XDOT_INSTALLED = graph.XDOT_INSTALLED
 ETREE_INSTALLED = graph.ETREE_INSTALLED
+NUMPY_INSTALLED = graph.NUMPY_INSTALLED
+SCIPY_INSTALLED = graph.SCIPY_INSTALLED
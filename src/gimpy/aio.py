@@ -0,0 +1,77 @@
+'''
+asyncio wrappers of the steppable solvers of Graph. The *_steps() generators
+(Graph.network_simplex_steps(), Graph.cycle_canceling_steps() and
+Graph.max_flow_preflowpush_steps()) yield after a given number of pivots,
+canceled cycles or pushes, the coroutines here give control back to the
+event loop at every step, so many solves can run on one event loop without
+blocking it. Each solve changes the attributes of its own graph, so solves
+that run at the same time should be given different graphs.
+'''
+from __future__ import absolute_import
+
+from .global_constants import *
+import asyncio
+
+async def run_steps(steps, callback = None):
+    '''
+    API: run_steps(steps, callback = None)
+    Description:
+        Runs a *_steps() generator to the end, gives control to the event
+        loop after every step.
+    Input:
+        steps: Generator of SolverStep instances.
+        callback: Called with every step if given.
+    Return:
+        Returns the last step.
+    '''
+    step = None
+    for step in steps:
+        if callback is not None:
+            callback(step)
+        await asyncio.sleep(0)
+    return step
+
+async def min_cost_flow(graph, algo = 'simplex', pivot = 'dantzig',
+                        root = None, every = ASYNC_STEP_SIZE,
+                        callback = None):
+    '''
+    API: min_cost_flow(graph, algo = 'simplex', pivot = 'dantzig',
+                       root = None, every = ASYNC_STEP_SIZE, callback = None)
+    Description:
+        Coroutine version of Graph.min_cost_flow(), see it for the
+        arguments. Display is off.
+    Input:
+        every: Number of pivots (canceled cycles) between steps.
+        callback: Called with every SolverStep if given.
+    Return:
+        Returns True if the problem is feasible, False otherwise.
+    '''
+    if algo == 'simplex':
+        if root is None:
+            for root in graph.neighbors:
+                break
+        steps = graph.network_simplex_steps('off', pivot, root, every)
+    elif algo == 'cycle_canceling':
+        steps = graph.cycle_canceling_steps('off', every)
+    else:
+        raise Exception('Unknown min cost flow algorithm %s' %str(algo))
+    step = await run_steps(steps, callback)
+    return step.feasible
+
+async def max_flow_preflowpush(graph, source, sink, algo = 'FIFO',
+                               every = ASYNC_STEP_SIZE, callback = None):
+    '''
+    API: max_flow_preflowpush(graph, source, sink, algo = 'FIFO',
+                              every = ASYNC_STEP_SIZE, callback = None)
+    Description:
+        Coroutine version of Graph.max_flow_preflowpush(), see it for the
+        arguments. Display is off.
+    Input:
+        every: Number of pushes between steps.
+        callback: Called with every SolverStep if given.
+    Return:
+        Returns value of the maximum flow.
+    '''
+    steps = graph.max_flow_preflowpush_steps(source, sink, algo, 'off', every)
+    step = await run_steps(steps, callback)
+    return step.objective
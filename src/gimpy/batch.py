@@ -0,0 +1,196 @@
+'''
+Solves many small independent flow problems on a process pool. Instances
+are sent to the workers in a compact form, parallel arrays of node indices,
+capacities, costs and demands (see pack_instance()), instead of pickled
+graphs with attribute dictionaries. Workers rebuild a graph with integer
+node names, solve it and send the arc flows back as an array, which are
+mapped back to the arcs of the instance. Results are yielded in completion
+order with the time spent in the solver.
+'''
+from __future__ import absolute_import
+from builtins import range
+
+from .global_constants import *
+from .graph import Graph
+from .results import BatchResult
+import multiprocessing
+import array
+import time
+
+# algorithms of solve_batch(), min cost flow and max flow ones
+MIN_COST_FLOW_ALGOS = ['simplex', 'cycle_canceling']
+AUGMENTING_PATH_ALGOS = ['DFS', 'BFS']
+PREFLOW_PUSH_ALGOS = ['FIFO', 'SAP', 'HighestLabel']
+
+def solve_batch(instances, algo = 'simplex', workers = None,
+                chunksize = BATCH_CHUNK_SIZE, pivot = 'dantzig'):
+    '''
+    API: solve_batch(instances, algo = 'simplex', workers = None,
+                     chunksize = BATCH_CHUNK_SIZE, pivot = 'dantzig')
+    Description:
+        Solves independent flow problems on a process pool and yields the
+        results as they are completed. At most two chunks per worker are
+        in flight, so instances can be streamed from a generator.
+    Input:
+        instances: Iterable of instances. A min cost flow instance is a
+        directed Graph (see Pre section of Graph.min_cost_flow()), a max
+        flow instance is a tuple (graph, source, sink).
+        algo: 'simplex' or 'cycle_canceling' for min cost flow (see
+        Graph.min_cost_flow()), 'DFS' or 'BFS' for augmenting path max flow
+        (see Graph.max_flow()), 'FIFO', 'SAP' or 'HighestLabel' for preflow
+        push max flow (see Graph.max_flow_preflowpush()).
+        workers: Number of processes, number of processors if None.
+        Instances are solved in this process if workers is 1.
+        chunksize: Number of instances sent to a worker at once.
+        pivot: Pivot rule of network simplex.
+    Return:
+        Yields BatchResult instances in completion order. index of a result
+        is the position of its instance in instances, flow is keyed by the
+        arcs of the instance. The graphs are not changed.
+    '''
+    if algo not in (MIN_COST_FLOW_ALGOS + AUGMENTING_PATH_ALGOS +
+                    PREFLOW_PUSH_ALGOS):
+        raise Exception('Unknown batch algorithm %s' %str(algo))
+    options = (algo, pivot)
+    # arc lists of instances in flight, flows are mapped back with them
+    edges = {}
+    chunks = pack_chunks(instances, algo, chunksize, edges)
+    if workers == 1:
+        for chunk in chunks:
+            for result in solve_chunk(options, chunk):
+                yield unpack_result(result, edges)
+        return
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        limit = 2*workers
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(solve_chunk, options, chunk))
+            if len(pending) < limit:
+                continue
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    yield unpack_result(result, edges)
+        while pending:
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    yield unpack_result(result, edges)
+
+def pack_chunks(instances, algo, chunksize, edges):
+    '''
+    Used by solve_batch(). Yields lists of chunksize packed instances,
+    records arc list of every instance in edges. Should not be called by
+    user directly.
+    '''
+    chunk = []
+    for index, instance in enumerate(instances):
+        if algo in MIN_COST_FLOW_ALGOS:
+            packed, edges[index] = pack_instance(instance)
+        else:
+            packed, edges[index] = pack_instance(*instance)
+        chunk.append((index, packed))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def pack_values(values):
+    '''
+    Returns values in an array of 64 bit integers if they are all integers,
+    of doubles otherwise.
+    '''
+    if all(isinstance(v, int) for v in values):
+        return array.array('q', values)
+    return array.array('d', values)
+
+def pack_instance(graph, source = None, sink = None):
+    '''
+    API: pack_instance(graph, source = None, sink = None)
+    Description:
+        Returns compact form of a flow instance. Nodes are numbered in the
+        order of get_node_list(). Arcs without 'capacity' have capacity INF,
+        arcs without 'cost' and nodes without 'demand' get 0.
+    Input:
+        graph: Directed Graph instance.
+        source: Source node name for max flow instances.
+        sink: Sink node name for max flow instances.
+    Return:
+        Returns tuple (packed, edges) where packed is a tuple (n, tails,
+        heads, capacity, cost, demand, source, sink) of arrays of node
+        indices and values (source and sink are node indices, None for min
+        cost flow) and edges is the list of arcs in the order of arrays.
+    '''
+    names, index, edges, tails, heads, capacity = graph.get_edge_arrays(
+        'capacity', INF)
+    cost = [graph.edge_attr[e].get('cost', 0) for e in edges]
+    demand = [graph.nodes[n].attr.get('demand', 0) for n in names]
+    if source is not None:
+        source = index[source]
+        sink = index[sink]
+    packed = (len(names), array.array('q', tails), array.array('q', heads),
+              pack_values(capacity), pack_values(cost), pack_values(demand),
+              source, sink)
+    return packed, edges
+
+def unpack_instance(packed):
+    '''
+    API: unpack_instance(packed)
+    Description:
+        Returns the graph of a packed instance, nodes are named 0,...,n-1.
+        See pack_instance().
+    '''
+    n, tails, heads, capacity, cost, demand, source, sink = packed
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(zip(range(n), demand), ('demand',))
+    g.add_edges(zip(tails, heads, capacity, cost), ('capacity', 'cost'))
+    return g
+
+def solve_chunk(options, chunk):
+    '''
+    Used by solve_batch(). Solves packed instances of chunk in a worker
+    process. Returns list of tuples (index, flows, value, feasible, time).
+    Should not be called by user directly.
+    '''
+    algo, pivot = options
+    results = []
+    for index, packed in chunk:
+        g = unpack_instance(packed)
+        tails, heads, source = packed[1], packed[2], packed[6]
+        start = time.perf_counter()
+        feasible = True
+        if algo == 'simplex':
+            feasible = g.network_simplex('off', pivot, 0)
+        elif algo == 'cycle_canceling':
+            feasible = g.cycle_canceling('off')
+        elif algo in AUGMENTING_PATH_ALGOS:
+            g.max_flow(source, packed[7], 'off', algo)
+        else:
+            g.max_flow_preflowpush(source, packed[7], algo, 'off')
+        elapsed = time.perf_counter() - start
+        edge_attr = g.edge_attr
+        flows = pack_values([edge_attr[(tails[k], heads[k])]['flow']
+                             for k in range(len(tails))])
+        if algo in MIN_COST_FLOW_ALGOS:
+            value = g.get_flow_cost()
+        else:
+            value = (sum(edge_attr[(source, m)]['flow']
+                         for m in g.neighbors[source]) -
+                     sum(edge_attr[(m, source)]['flow']
+                         for m in g.in_neighbors[source]))
+        results.append((index, flows, value, feasible, elapsed))
+    return results
+
+def unpack_result(result, edges):
+    '''
+    Used by solve_batch(). Returns BatchResult of a result of solve_chunk(),
+    flows are keyed by the arcs of the instance. Should not be called by
+    user directly.
+    '''
+    index, flows, value, feasible, elapsed = result
+    flow = dict(zip(edges.pop(index), flows))
+    return BatchResult(index, flow, value, feasible, elapsed)
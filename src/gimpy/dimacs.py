@@ -0,0 +1,181 @@
+'''
+Readers and writers of network flow problems in DIMACS format (min cost
+flow 'min' and max flow 'max' problems). Files are read and written line by
+line, arcs are streamed into the bulk loader (Graph.add_edges()) so large
+files are never held in memory as text.
+See http://archive.dimacs.rutgers.edu/pub/netflow/general-info/ for format.
+'''
+from __future__ import absolute_import
+from builtins import str
+from builtins import range
+
+from .global_constants import *
+from .graph import Graph
+
+def read_dimacs(path):
+    '''
+    API:
+        read_dimacs(path)
+    Description:
+        Reads a min cost flow or max flow problem in DIMACS format. Nodes
+        are named 1,...,n. For min cost flow problems supply of 'n' lines
+        is kept in the 'demand' attribute of nodes (positive for supply
+        nodes, 0 for nodes without 'n' line), capacity and cost of 'a'
+        lines are kept in 'capacity' and 'cost' attributes of edges, so
+        min_cost_flow() can be called on the graph. For max flow problems
+        'a' lines give 'capacity' attributes and source and sink are
+        returned for max_flow().
+    Input:
+        path: File name or file object.
+    Pre:
+        Arc lower bounds should be 0.
+    Return:
+        Returns the Graph for 'min' problems, (Graph, source, sink) tuple
+        for 'max' problems.
+    '''
+    if hasattr(path, 'read'):
+        f = path
+    else:
+        f = open(path, 'r')
+    try:
+        lines = iter(f)
+        g = Graph(type = DIRECTED_GRAPH)
+        problem = None
+        source = None
+        sink = None
+        for line in lines:
+            fields = line.split()
+            if not fields or fields[0] == 'c':
+                continue
+            if fields[0] == 'p':
+                problem = fields[1]
+                if problem not in ('min', 'max'):
+                    raise Exception('Unknown DIMACS problem %s!' %problem)
+                n = int(fields[2])
+                if problem == 'min':
+                    g.add_nodes(((i, 0) for i in range(1, n+1)), ('demand',))
+                else:
+                    g.add_nodes(range(1, n+1))
+            elif problem is None:
+                raise Exception('DIMACS problem line is missing!')
+            elif fields[0] == 'n':
+                if problem == 'min':
+                    g.get_node(int(fields[1])).set_attr('demand',
+                                                        int(fields[2]))
+                elif fields[2] == 's':
+                    source = int(fields[1])
+                elif fields[2] == 't':
+                    sink = int(fields[1])
+            elif fields[0] == 'a':
+                # nodes are done, stream the rest of the file into the graph
+                arcs = dimacs_arcs(problem, fields, lines)
+                if problem == 'min':
+                    g.add_edges(arcs, ('capacity', 'cost'))
+                else:
+                    g.add_edges(arcs, ('capacity',))
+            else:
+                raise Exception('Unknown DIMACS line %s' %line)
+    finally:
+        if f is not path:
+            f.close()
+    if problem == 'max':
+        return g, source, sink
+    return g
+
+def dimacs_arcs(problem, fields, lines):
+    '''
+    Used by read_dimacs(). Generates (tail, head, capacity, cost) tuples
+    ((tail, head, capacity) for max flow problems) from the arc line with
+    fields and remaining lines. Should not be called by user directly.
+    '''
+    while True:
+        if fields and fields[0] == 'a':
+            if problem == 'min':
+                if int(fields[3]) != 0:
+                    raise Exception('Arc lower bounds are not supported!')
+                yield (int(fields[1]), int(fields[2]), int(fields[4]),
+                       int(fields[5]))
+            else:
+                yield (int(fields[1]), int(fields[2]), int(fields[3]))
+        elif fields and fields[0] != 'c':
+            raise Exception('Unexpected DIMACS line after arcs: %s'
+                            %' '.join(fields))
+        try:
+            fields = next(lines).split()
+        except StopIteration:
+            return
+
+def write_dimacs(graph, path, problem = 'min', source = None, sink = None,
+                 comment = None):
+    '''
+    API:
+        write_dimacs(graph, path, problem = 'min', source = None,
+                     sink = None, comment = None)
+    Description:
+        Writes graph as a min cost flow or max flow problem in DIMACS
+        format. If nodes are not named 1,...,n they are numbered in
+        get_node_list() order.
+    Input:
+        graph: Directed Graph instance, edges should have 'capacity'
+        attribute ('capacity' and 'cost' for 'min' problems).
+        path: File name or file object.
+        problem: 'min' or 'max'.
+        source: Source node name, required for 'max' problems.
+        sink: Sink node name, required for 'max' problems.
+        comment: Text of comment line written at the beginning.
+    Pre:
+        Nodes should have 'demand' attribute for 'min' problems (nodes
+        without it are transshipment nodes).
+    Return:
+        Returns dictionary that maps node names to DIMACS node numbers.
+    '''
+    names = graph.get_node_list()
+    n = len(names)
+    if set(names) == set(range(1, n+1)):
+        number = dict((v, v) for v in names)
+    else:
+        number = dict((v, i+1) for i, v in enumerate(names))
+    edge_attr = graph.edge_attr
+    if problem == 'min':
+        node_lines = []
+        for v in names:
+            demand = graph.get_node_attr(v, 'demand')
+            if demand:
+                node_lines.append((number[v], demand))
+        arc_lines = ((number[u], number[v], 0, edge_attr[(u, v)]['capacity'],
+                      edge_attr[(u, v)]['cost']) for (u, v) in edge_attr)
+    elif problem == 'max':
+        if source is None or sink is None:
+            raise Exception('Source and sink are required for max flow!')
+        node_lines = [(number[source], 's'), (number[sink], 't')]
+        arc_lines = ((number[u], number[v], edge_attr[(u, v)]['capacity'])
+                     for (u, v) in edge_attr)
+    else:
+        raise Exception('Unknown DIMACS problem %s!' %problem)
+    write_dimacs_stream(path, problem, n, len(edge_attr), node_lines,
+                        arc_lines, comment)
+    return number
+
+def write_dimacs_stream(path, problem, n, m, node_lines, arc_lines,
+                        comment = None):
+    '''
+    Used by write_dimacs() and netgen(). Writes an instance in DIMACS
+    format line by line. node_lines and arc_lines are iterables of tuples
+    of the fields of 'n' and 'a' lines. path is a file name or a file
+    object. Should not be called by user directly.
+    '''
+    if hasattr(path, 'write'):
+        f = path
+    else:
+        f = open(path, 'w')
+    try:
+        if comment is not None:
+            f.write('c %s\n' %comment)
+        f.write('p %s %d %d\n' %(problem, n, m))
+        for fields in node_lines:
+            f.write('n %s\n' %' '.join(str(x) for x in fields))
+        for fields in arc_lines:
+            f.write('a %s\n' %' '.join(str(x) for x in fields))
+    finally:
+        if f is not path:
+            f.close()
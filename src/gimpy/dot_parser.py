@@ -0,0 +1,437 @@
+'''
+Streaming parser of the DOT language. Reads a file object in chunks,
+tokenizes it incrementally and builds a Graph, so memory used besides the
+graph is bounded by the chunk size (and the longest token) and parsing
+takes linear time. Subgraphs whose names start with 'cluster' become
+clusters (see Graph.create_cluster()). Output of Graph.to_string() is
+parsed back to a graph with the same to_string() output.
+'''
+from __future__ import absolute_import
+from builtins import str
+from builtins import object
+
+from .global_constants import *
+from .graph import Graph
+import re
+
+# whitespace and comments followed by a token
+DOT_TOKEN_RE = re.compile(r'''
+    (?:\s|//[^\n]*\n|\#[^\n]*\n|/\*.*?\*/)*
+    (?:(?P<qid>"(?:[^"\\]|\\.)*")
+    |(?P<op>->|--)
+    |(?P<num>-?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?))
+    |(?P<id>[A-Za-z_\x80-\U0010ffff][A-Za-z_0-9\x80-\U0010ffff]*)
+    |(?P<punct>[{}\[\];,=:])
+    |(?P<html><))
+    ''', re.VERBOSE | re.DOTALL)
+DOT_SKIP_RE = re.compile(r'(?:\s|//[^\n]*|\#[^\n]*|/\*.*?\*/)*$', re.DOTALL)
+DOT_INT_RE = re.compile(r'^-?[0-9]+$')
+DOT_FLOAT_RE = re.compile(r'^-?(?:\.[0-9]+|[0-9]+\.[0-9]*)$')
+
+def read_dot(path, chunksize = DOT_CHUNK_SIZE):
+    '''
+    API:
+        read_dot(path, chunksize = DOT_CHUNK_SIZE)
+    Description:
+        Reads a graph in DOT language. Node and edge attributes of
+        statements are kept as node and edge attributes. Values that are
+        integer or float numerals (quoted or not) are converted to int and
+        float, other values are kept as strings (with their quotes if
+        quotes are needed to write them back as they were read). Default
+        attribute statements (node [...] and edge [...]) apply to nodes and
+        edges created after them, except in clusters where they are kept as
+        node attributes of the cluster. Ports of node ids are kept as part
+        of node names. Repeated edges update attributes of the edge.
+    Input:
+        path: File name or file object.
+        chunksize: Number of characters read at once.
+    Return:
+        Returns the Graph.
+    '''
+    if hasattr(path, 'read'):
+        return DotParser(path, chunksize).parse()
+    with open(path, 'r') as f:
+        return DotParser(f, chunksize).parse()
+
+def dot_tokens(f, chunksize = DOT_CHUNK_SIZE):
+    '''
+    Used by DotParser. Generates (kind, text) tuples of tokens of the DOT
+    text read from file object f, where kind is 'id', 'num', 'qid' (quoted
+    string), 'html', 'op' or a punctuation character. Whitespace and
+    comments are skipped. Should not be called by user directly.
+    '''
+    buf = ''
+    pos = 0
+    eof = False
+    match = DOT_TOKEN_RE.match
+    while True:
+        m = match(buf, pos)
+        if m is not None and m.lastgroup == 'html':
+            start = m.start('html')
+            end = html_end(buf, start)
+            if end is not None:
+                pos = end
+                yield ('html', buf[start:end])
+                continue
+            m = None
+        # a token that fails or ends at the end of the buffer may continue
+        if m is None or m.end() == len(buf):
+            if not eof:
+                data = f.read(chunksize)
+                eof = not data
+                buf = buf[pos:] + data
+                pos = 0
+                continue
+            if m is None:
+                if DOT_SKIP_RE.match(buf, pos):
+                    return
+                raise Exception('Invalid DOT input near %s'
+                                %buf[pos:pos+20].strip())
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == 'punct':
+            kind = text
+        yield (kind, text)
+
+def html_end(buf, pos):
+    '''
+    Used by dot_tokens(). Returns end position of the HTML string that
+    starts at pos (angle brackets nest), None if it is not complete in
+    buf. Should not be called by user directly.
+    '''
+    depth = 0
+    for i in range(pos, len(buf)):
+        c = buf[i]
+        if c == '<':
+            depth += 1
+        elif c == '>':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+def dot_value(kind, text, name = False):
+    '''
+    Used by DotParser. Converts token text to an attribute value (to a
+    node name if name is True, in which case only integers are converted).
+    Should not be called by user directly.
+    '''
+    if kind == 'qid':
+        content = text[1:-1].replace('\\"', '"').replace('\\\n', '')
+        if quote_if_necessary(content) == text:
+            value = content
+        else:
+            value = text
+    else:
+        content = text
+        value = text
+    if DOT_INT_RE.match(content) and str(int(content)) == content:
+        return int(content)
+    if (not name and DOT_FLOAT_RE.match(content) and
+        str(float(content)) == content):
+        return float(content)
+    return value
+
+
+class DotParser(object):
+    '''
+    Recursive descent parser of the DOT language on a token stream. See
+    read_dot().
+    '''
+    def __init__(self, f, chunksize = DOT_CHUNK_SIZE):
+        '''
+        API: __init__(self, f, chunksize = DOT_CHUNK_SIZE)
+        Description:
+            Constructor. f is a file object.
+        '''
+        self.tokens = dot_tokens(f, chunksize)
+        self.kind = None
+        self.text = None
+        self.advance()
+        self.graph = None
+        self.graph_type = None
+        self.name = None
+        self.graph_attrs = []
+
+    def advance(self):
+        '''
+        API: advance(self)
+        Description:
+            Moves to the next token, kind is None at the end of input.
+        '''
+        try:
+            self.kind, self.text = next(self.tokens)
+        except StopIteration:
+            self.kind, self.text = None, None
+
+    def expect(self, kind):
+        '''
+        API: expect(self, kind)
+        Description:
+            Checks that the current token is of kind, returns its text and
+            moves to the next token.
+        '''
+        if self.kind != kind:
+            raise Exception('Expected %s in DOT input, found %s'
+                            %(kind, self.text))
+        text = self.text
+        self.advance()
+        return text
+
+    def is_id(self):
+        '''
+        API: is_id(self)
+        Description:
+            Returns True if the current token is an ID.
+        '''
+        return self.kind in ('id', 'num', 'qid', 'html')
+
+    def get_graph(self):
+        '''
+        API: get_graph(self)
+        Description:
+            Returns the graph, creates it with the graph attributes read so
+            far if it is not created yet.
+        '''
+        if self.graph is None:
+            attrs = dict(self.graph_attrs)
+            attrs['type'] = self.graph_type
+            self.graph = Graph(**attrs)
+            if self.name is not None:
+                self.graph.name = self.name
+        return self.graph
+
+    def parse(self):
+        '''
+        API: parse(self)
+        Description:
+            Parses the input and returns the graph.
+        '''
+        if self.kind == 'id' and self.text.lower() == 'strict':
+            self.advance()
+        keyword = self.expect('id').lower()
+        if keyword == 'digraph':
+            self.graph_type = DIRECTED_GRAPH
+        elif keyword == 'graph':
+            self.graph_type = UNDIRECTED_GRAPH
+        else:
+            raise Exception('DOT input should start with graph or digraph!')
+        if self.is_id():
+            self.name = str(dot_value(self.kind, self.text, True))
+            self.advance()
+        self.expect('{')
+        self.statements(None, {}, {})
+        self.expect('}')
+        return self.get_graph()
+
+    def statements(self, cluster, node_defaults, edge_defaults):
+        '''
+        API: statements(self, cluster, node_defaults, edge_defaults)
+        Description:
+            Parses statements until the closing brace of the current graph
+            or subgraph. cluster is the dictionary of the current cluster
+            (None outside clusters). Returns list of nodes of the
+            statements.
+        '''
+        nodes = []
+        node_defaults = dict(node_defaults)
+        edge_defaults = dict(edge_defaults)
+        while self.kind not in ('}', None):
+            if self.kind == ';':
+                self.advance()
+                continue
+            if self.kind == 'id' and self.text.lower() in ('node', 'edge',
+                                                           'graph'):
+                keyword = self.text.lower()
+                self.advance()
+                attrs = self.attr_list(None if keyword == 'edge' else cluster)
+                if keyword == 'node':
+                    if cluster is not None:
+                        cluster['node_attrs'].update(attrs)
+                    else:
+                        node_defaults.update(attrs)
+                elif keyword == 'edge':
+                    edge_defaults.update(attrs)
+                else:
+                    self.set_attrs(cluster, attrs)
+                continue
+            if self.kind == '{' or (self.kind == 'id' and
+                                    self.text.lower() == 'subgraph'):
+                operand = self.subgraph(cluster, node_defaults,
+                                        edge_defaults)
+            elif self.is_id():
+                kind, text = self.kind, self.text
+                self.advance()
+                if self.kind == '=':
+                    self.advance()
+                    self.set_attrs(cluster, [(text, self.value(cluster,
+                                                               text))])
+                    continue
+                operand = [self.node_id(kind, text)]
+            else:
+                raise Exception('Unexpected %s in DOT input' %self.text)
+            if self.kind == 'op':
+                nodes.extend(self.edges(operand, cluster, node_defaults,
+                                        edge_defaults))
+            elif len(operand) == 1 and not isinstance(operand, tuple):
+                attrs = self.attr_list()
+                self.add_node(operand[0], cluster, node_defaults, attrs)
+                nodes.append(operand[0])
+            else:
+                nodes.extend(operand)
+        return nodes
+
+    def node_id(self, kind, text):
+        '''
+        API: node_id(self, kind, text)
+        Description:
+            Returns node name of the node id that starts with the token
+            (kind, text), ports are joined to the name.
+        '''
+        name = dot_value(kind, text, True)
+        while self.kind == ':':
+            self.advance()
+            name = '%s:%s' %(name, self.text)
+            self.advance()
+        return name
+
+    def subgraph(self, cluster, node_defaults, edge_defaults):
+        '''
+        API: subgraph(self, cluster, node_defaults, edge_defaults)
+        Description:
+            Parses a subgraph and returns tuple of its nodes. Subgraphs
+            named cluster* become clusters of the graph.
+        '''
+        name = None
+        if self.kind == 'id' and self.text.lower() == 'subgraph':
+            self.advance()
+            if self.is_id():
+                name = str(dot_value(self.kind, self.text, True))
+                self.advance()
+        self.expect('{')
+        new_cluster = None
+        if cluster is None and name is not None and name.startswith('cluster'):
+            new_cluster = {'attrs':[], 'node_attrs':{}, 'node_list':[]}
+            inner = new_cluster
+        else:
+            inner = cluster
+        nodes = self.statements(inner, node_defaults, edge_defaults)
+        self.expect('}')
+        if new_cluster is not None:
+            attrs = dict(new_cluster['attrs'])
+            if 'name' not in attrs:
+                attrs['name'] = name[len('cluster_'):] \
+                    if name.startswith('cluster_') else name
+            self.get_graph().create_cluster(new_cluster['node_list'], attrs,
+                                            new_cluster['node_attrs'])
+        return tuple(nodes)
+
+    def edges(self, operand, cluster, node_defaults, edge_defaults):
+        '''
+        API: edges(self, operand, cluster, node_defaults, edge_defaults)
+        Description:
+            Parses the rest of an edge statement that starts with operand
+            (list of nodes), adds edges and returns list of their nodes.
+        '''
+        operands = [operand]
+        while self.kind == 'op':
+            self.advance()
+            if self.is_id():
+                kind, text = self.kind, self.text
+                self.advance()
+                operands.append([self.node_id(kind, text)])
+            else:
+                operands.append(self.subgraph(cluster, node_defaults,
+                                              edge_defaults))
+        attrs = dict(edge_defaults)
+        attrs.update(self.attr_list())
+        g = self.get_graph()
+        nodes = []
+        for o in operands:
+            for n in o:
+                if n not in g.nodes:
+                    self.add_node(n, cluster, node_defaults, [])
+                nodes.append(n)
+        for k in range(len(operands) - 1):
+            for u in operands[k]:
+                for v in operands[k+1]:
+                    if g.check_edge(u, v):
+                        e = (u, v) if (u, v) in g.edge_attr else (v, u)
+                        g.edge_attr[e].update(attrs)
+                    else:
+                        g.add_edge(u, v, **attrs)
+        return nodes
+
+    def add_node(self, name, cluster, node_defaults, attrs):
+        '''
+        API: add_node(self, name, cluster, node_defaults, attrs)
+        Description:
+            Adds node to the graph (and to cluster), updates its attributes
+            if it exists.
+        '''
+        g = self.get_graph()
+        node = g.get_node(name)
+        if node is None:
+            a = dict(node_defaults)
+            a.update(attrs)
+            g.add_node(name, **a)
+        else:
+            node.attr.update(attrs)
+        if cluster is not None and name not in cluster['node_list']:
+            cluster['node_list'].append(name)
+
+    def set_attrs(self, cluster, attrs):
+        '''
+        API: set_attrs(self, cluster, attrs)
+        Description:
+            Sets graph (cluster) attributes. Graph attributes read before
+            any node or edge are passed to the constructor of the graph.
+        '''
+        attrs = list(dict(attrs).items())
+        if cluster is not None:
+            cluster['attrs'].extend(attrs)
+        elif self.graph is None:
+            self.graph_attrs.extend(attrs)
+        else:
+            self.graph.attr.update(attrs)
+
+    def value(self, cluster, key):
+        '''
+        API: value(self, cluster, key)
+        Description:
+            Returns value of attribute key from the current token and moves
+            to the next token. Attributes of clusters are kept as strings
+            since Graph.to_string() writes them as they are (except label).
+        '''
+        kind, text = self.kind, self.text
+        self.advance()
+        if cluster is None:
+            return dot_value(kind, text)
+        if key == 'label':
+            return str(dot_value(kind, text, True))
+        return text
+
+    def attr_list(self, cluster = None):
+        '''
+        API: attr_list(self, cluster = None)
+        Description:
+            Parses attribute lists ([a=b, ...] [...]) if there are any and
+            returns list of (attribute, value) tuples. cluster is given if
+            attributes are attributes of the cluster or of its nodes.
+        '''
+        attrs = []
+        while self.kind == '[':
+            self.advance()
+            while self.kind != ']':
+                if self.kind in (',', ';'):
+                    self.advance()
+                    continue
+                key = self.expect(self.kind)
+                if self.kind == '=':
+                    self.advance()
+                    attrs.append((key, self.value(cluster, key)))
+                else:
+                    attrs.append((key, 'true'))
+            self.expect(']')
+        return attrs
@@ -0,0 +1,194 @@
+'''
+Random network flow instance generators in the spirit of NETGEN (Klingman,
+Napier and Stutz, 1974). Instances are built around a skeleton of paths
+that carries all supply, so every instance is feasible. The remaining arcs
+are random. Instances are deterministic for a given seed and are either
+loaded into a Graph with the bulk loader (Graph.add_nodes() and
+Graph.add_edges()) or streamed to a file in DIMACS format without keeping
+arcs in memory.
+'''
+from __future__ import division
+from __future__ import absolute_import
+from builtins import range
+
+from .global_constants import *
+from .graph import Graph
+from .dimacs import write_dimacs_stream
+import random
+
+def netgen(nodes, arcs, sources = 1, sinks = 1, supply = 1000,
+           cost_range = (1, 100), capacity_range = (100, 1000),
+           problem = 'min', seed = 0, path = None):
+    '''
+    API:
+        netgen(nodes, arcs, sources = 1, sinks = 1, supply = 1000,
+               cost_range = (1, 100), capacity_range = (100, 1000),
+               problem = 'min', seed = 0, path = None)
+    Description:
+        Generates a random feasible network flow instance. Nodes are named
+        1,...,nodes. Nodes 1,...,sources are supply nodes and the last sinks
+        nodes are demand nodes. Total supply is split randomly among supply
+        nodes. Transshipment nodes are randomly split into one chain per
+        supply node. Each chain leads to a set of demand nodes (every
+        demand node is reached by at least one chain) and the supply of
+        the chain is split among them, which gives demands of demand nodes.
+        Chain arcs get enough capacity to carry the supply. Random arcs are
+        added until there are arcs arcs. No instance has parallel arcs,
+        loops or both (i,j) and (j,i), as required by the flow methods of
+        Graph.
+    Input:
+        nodes: Number of nodes. Ignored if problem is 'transportation'
+        (nodes is sources+sinks then).
+        arcs: Number of arcs.
+        sources: Number of supply nodes, 1 if problem is 'max'.
+        sinks: Number of demand nodes, 1 if problem is 'max'.
+        supply: Total supply.
+        cost_range: Tuple of lower and upper bounds of arc costs.
+        capacity_range: Tuple of lower and upper bounds of arc capacities.
+        problem: 'min' for min cost flow, 'max' for max flow (source is
+        node 1, sink is the last node, arcs do not have costs),
+        'transportation' for a min cost flow instance where all arcs go
+        from a supply node to a demand node.
+        seed: Seed of the random number generator.
+        path: File name or file object. Instance is written in DIMACS
+        format if given.
+    Return:
+        Returns a Graph with 'demand' node attribute, 'capacity' and 'cost'
+        edge attributes if path is None, None otherwise.
+    '''
+    supplies, edges = netgen_arcs(nodes, arcs, sources, sinks, supply,
+                                  cost_range, capacity_range, problem, seed)
+    n = len(supplies)
+    if path is not None:
+        if problem == 'max':
+            write_dimacs_stream(path, 'max', n, arcs, [(1, 's'), (n, 't')],
+                                ((u, v, c) for (u, v, c, w) in edges),
+                                'netgen seed %d' %seed)
+        else:
+            write_dimacs_stream(path, 'min', n, arcs,
+                                [(v, supplies[v-1]) for v in range(1, n+1)
+                                 if supplies[v-1] != 0],
+                                ((u, v, 0, c, w) for (u, v, c, w) in edges),
+                                'netgen seed %d' %seed)
+        return None
+    g = Graph(type = DIRECTED_GRAPH)
+    if problem == 'max':
+        g.add_nodes(range(1, n+1))
+        g.add_edges(((u, v, c) for (u, v, c, w) in edges), ('capacity',))
+    else:
+        g.add_nodes(((v, supplies[v-1]) for v in range(1, n+1)),
+                    ('demand',))
+        g.add_edges(edges, ('capacity', 'cost'))
+    return g
+
+def netgen_arcs(nodes, arcs, sources = 1, sinks = 1, supply = 1000,
+                cost_range = (1, 100), capacity_range = (100, 1000),
+                problem = 'min', seed = 0):
+    '''
+    API:
+        netgen_arcs(nodes, arcs, sources = 1, sinks = 1, supply = 1000,
+                    cost_range = (1, 100), capacity_range = (100, 1000),
+                    problem = 'min', seed = 0)
+    Description:
+        Used by netgen(). Builds the skeleton and returns supplies of nodes
+        and a generator of arcs, so arcs are produced while they are
+        written or loaded. Should not be called by user directly. See
+        netgen() for arguments.
+    Return:
+        Returns tuple (supplies, arcs). supplies is a list, supplies[i-1]
+        is supply of node i (negative for demand). arcs generates
+        (tail, head, capacity, cost) tuples.
+    '''
+    rand = random.Random(seed)
+    if problem == 'max':
+        sources = sinks = 1
+    if problem == 'transportation':
+        nodes = sources + sinks
+    if sources < 1 or sinks < 1 or sources + sinks > nodes:
+        raise Exception('Invalid number of supply and demand nodes!')
+    if problem == 'transportation':
+        max_arcs = sources*sinks
+    else:
+        max_arcs = nodes*(nodes-1)//2
+    first_sink = nodes - sinks + 1
+    transshipment = list(range(sources + 1, first_sink))
+    rand.shuffle(transshipment)
+    # split supply and transshipment nodes among supply nodes
+    supplies = [0]*nodes
+    amounts = random_partition(rand, supply, sources)
+    cuts = sorted(rand.randint(0, len(transshipment))
+                  for i in range(sources - 1))
+    cuts = [0] + cuts + [len(transshipment)]
+    # every demand node is reached by at least one chain
+    targets = [[] for i in range(sources)]
+    for k in range(sinks):
+        targets[k % sources].append(first_sink + k)
+    for i in range(sources):
+        extra = rand.randint(0, min(sinks, NETGEN_SINKS_PER_CHAIN))
+        for j in rand.sample(range(first_sink, nodes + 1), extra):
+            if j not in targets[i]:
+                targets[i].append(j)
+    skeleton = []
+    for i in range(sources):
+        source = i + 1
+        supplies[i] = amounts[i]
+        chain = [source] + transshipment[cuts[i]:cuts[i+1]]
+        for k in range(len(chain) - 1):
+            skeleton.append((chain[k], chain[k+1], amounts[i]))
+        for j, amount in zip(targets[i],
+                             random_partition(rand, amounts[i],
+                                              len(targets[i]))):
+            skeleton.append((chain[-1], j, amount))
+            supplies[j-1] -= amount
+    if arcs < len(skeleton) or arcs > max_arcs:
+        raise Exception('Number of arcs should be between %d and %d!'
+                        %(len(skeleton), max_arcs))
+    return supplies, generate_arcs(rand, nodes, arcs, skeleton, sources,
+                                   first_sink, problem, cost_range,
+                                   capacity_range)
+
+def generate_arcs(rand, nodes, arcs, skeleton, sources, first_sink, problem,
+                  cost_range, capacity_range):
+    '''
+    Used by netgen_arcs(). Generates skeleton arcs and then random arcs
+    until there are arcs arcs. Pairs already used are kept in a set of
+    integer keys. Should not be called by user directly.
+    '''
+    used = set()
+    base = nodes + 1
+    for (u, v, flow) in skeleton:
+        used.add(u*base + v)
+        used.add(v*base + u)
+        capacity = max(rand.randint(capacity_range[0], capacity_range[1]),
+                       flow)
+        yield (u, v, capacity, rand.randint(cost_range[0], cost_range[1]))
+    count = len(skeleton)
+    while count < arcs:
+        if problem == 'transportation':
+            u = rand.randint(1, sources)
+            v = rand.randint(first_sink, nodes)
+        else:
+            u = rand.randint(1, nodes)
+            v = rand.randint(1, nodes)
+            if u == v:
+                continue
+        if u*base + v in used:
+            continue
+        used.add(u*base + v)
+        used.add(v*base + u)
+        count += 1
+        yield (u, v, rand.randint(capacity_range[0], capacity_range[1]),
+               rand.randint(cost_range[0], cost_range[1]))
+
+def random_partition(rand, total, parts):
+    '''
+    Used by netgen_arcs(). Splits integer total into parts nonnegative
+    integers (positive if total >= parts) at random. Should not be called
+    by user directly.
+    '''
+    if total >= parts:
+        cuts = sorted(rand.sample(range(1, total), parts - 1))
+    else:
+        cuts = sorted(rand.randint(0, total) for i in range(parts - 1))
+    cuts = [0] + cuts + [total]
+    return [cuts[k+1] - cuts[k] for k in range(parts)]
@@ -64,7 +64,33 @@ DOT2TEX_INSTALLED = None # it wil be set when we try to import
 PIL_INSTALLED = None
 XDOT_INSTALLED = None
 ETREE_INSTALLED = None
+NUMPY_INSTALLED = None
+SCIPY_INSTALLED = None
 INF = 10000
+# tolerance used when comparing start times in critical_path()
+CPM_TOLERANCE = 1e-9
+# largest Held-Karp table (8 n 2^n bytes for n nodes) allocated by
+# hamiltonian_path() with NumPy, 18 nodes fit, and largest graph solved by
+# Held-Karp without NumPy
+HELD_KARP_MAX_TABLE_BYTES = 1 << 26
+HELD_KARP_MAX_NODES_PURE = 15
+# binary graph file format, see Graph.save_binary()
+BINARY_MAGIC = b'GIMPYBIN'
+BINARY_VERSION = 2
+BINARY_ALIGNMENT = 64
+# most extra demand nodes a supply chain of netgen() leads to
+NETGEN_SINKS_PER_CHAIN = 3
+# number of characters read at once by read_dot()
+DOT_CHUNK_SIZE = 65536
+# number of rows converted at once by Graph.from_edgelist()
+EDGELIST_CHUNK_SIZE = 100000
+# number of query results kept by the cache of a graph, see Graph.cached()
+QUERY_CACHE_SIZE = 128
+# pivots, pushes or canceled cycles between the steps of the coroutines in
+# aio.py
+ASYNC_STEP_SIZE = 100
+# number of instances sent to a worker at once by solve_batch()
+BATCH_CHUNK_SIZE = 16
 
 DOT2TEX_TEMPLATE = r'''
 \documentclass[landscape]{minimal}
@@ -54,10 +54,12 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import str
 from builtins import range
-from past.utils import old_div
 from builtins import object
 
 from .global_constants import *
+from .results import SearchResult, DFSResult, ComponentsResult
+from .results import ShortestPathResult, FlowResult, SolverStep
+from .results import ParametricFlowResult
 try:
     from src.blimpy import Stack, Queue, PriorityQueue
 except ImportError:
@@ -67,9 +69,34 @@ import io   # for StringIO()
 import copy       # for deepcopy()
 import sys        # for exit()
 import random     # for seed, random, randint
+import math       # for log()
 import tempfile   # for mkstemp()
 import os         # for close()
 import operator   # for itemgetter()
+import time       # for time()
+import json       # for dumps(), loads()
+import struct     # for pack(), unpack()
+import array      # for array()
+import mmap as mmap_module # for mmap()
+import csv        # for reader()
+import itertools  # for islice()
+import collections # for OrderedDict(), deque()
+import fractions  # for Fraction()
+
+try:
+    import numpy
+except ImportError:
+    NUMPY_INSTALLED = False
+else:
+    NUMPY_INSTALLED = True
+
+try:
+    import scipy.sparse
+    import scipy.spatial
+except ImportError:
+    SCIPY_INSTALLED = False
+else:
+    SCIPY_INSTALLED = True
 
 try:
     import pygtk
@@ -207,7 +234,8 @@ class Graph(object):
             Sets following attributes using **attrs; self.attr,
             self.graph_type. Creates following initial attributes;
             self.neighbors, self.in_neighbors, self.nodes, self.out_neighbors,
-            self.cluster
+            self.cluster, self.structure_version, self.attr_version,
+            self.cache
         '''
         # graph attributes
         self.attr = copy.deepcopy(DEFAULT_GRAPH_ATTRIBUTES)
@@ -240,6 +268,16 @@ class Graph(object):
             self.attr['layout'] = 'fdp'
         self.attr['cluster_count'] = 0
         self.cluster = {}
+        # version counters, bumped when nodes/edges are added or removed and
+        # when edge attributes are set, see cached()
+        self.structure_version = 0
+        self.attr_version = 0
+        # query cache, None until enable_cache() is called
+        self.cache = None
+        # spanning tree basis of the last network simplex solve
+        self.simplex_basis = None
+        # (source, sink, algo, structure_version) of the last max flow solve
+        self.max_flow_state = None
 
     def __repr__(self):
         '''
@@ -296,6 +334,7 @@ class Graph(object):
         '''
         if name in self.neighbors:
             raise MultipleNodeException
+        self.structure_version += 1
         self.neighbors[name] = list()
         if self.graph_type is DIRECTED_GRAPH:
             self.in_neighbors[name] = list()
@@ -316,6 +355,7 @@ class Graph(object):
         '''
         if name not in self.neighbors:
             raise Exception('Node %s does not exist!' %str(name))
+        self.structure_version += 1
         for n in self.neighbors[name]:
             del self.edge_attr[(name, n)]
             if self.graph_type == UNDIRECTED_GRAPH:
@@ -351,6 +391,7 @@ class Graph(object):
             raise MultipleEdgeException
         if self.graph_type is UNDIRECTED_GRAPH and (name2,name1) in self.edge_attr:
             raise MultipleEdgeException
+        self.structure_version += 1
         self.edge_attr[(name1,name2)] = copy.deepcopy(DEFAULT_EDGE_ATTRIBUTES)
         for a in attr:
             self.edge_attr[(name1,name2)][a] = attr[a]
@@ -364,6 +405,101 @@ class Graph(object):
         else:
             self.in_neighbors[name2].append(name1)
 
+    def add_nodes(self, names, attr_names = None, **attr):
+        '''
+        API: add_nodes(self, names, attr_names = None, **attr)
+        Description:
+        Adds nodes to the graph in bulk. Faster than calling add_node() for
+        every node when there are many nodes.
+        Input:
+            names: Iterable of node names, or of tuples (name, value1,
+            value2, ...) if attr_names is given.
+            attr_names: Sequence of node attribute names, values in the
+            tuples are assigned to these attributes.
+            attr: Attributes of all nodes.
+        Pre:
+            Graph should not contain a node with any of these names.
+        Post:
+            self.neighbors, self.nodes and self.in_neighbors are updated.
+        Return:
+            Returns number of nodes added.
+        '''
+        neighbors = self.neighbors
+        nodes = self.nodes
+        directed = self.graph_type is DIRECTED_GRAPH
+        self.structure_version += 1
+        count = 0
+        for t in names:
+            if attr_names is None:
+                name = t
+            else:
+                name = t[0]
+            if name in neighbors:
+                raise MultipleNodeException
+            neighbors[name] = list()
+            if directed:
+                self.in_neighbors[name] = list()
+            node = Node(name, **attr)
+            if attr_names is not None:
+                node.attr.update(zip(attr_names, t[1:]))
+            nodes[name] = node
+            count += 1
+        return count
+
+    def add_edges(self, edges, attr_names = None, **attr):
+        '''
+        API: add_edges(self, edges, attr_names = None, **attr)
+        Description:
+        Adds edges to the graph in bulk. Faster than calling add_edge() for
+        every edge when there are many edges. edges can be a generator, so
+        edges can be streamed from a generator or a file without keeping
+        them in a list.
+        Input:
+            edges: Iterable of tuples (name1, name2, value1, value2, ...).
+            attr_names: Sequence of edge attribute names, values in the
+            tuples are assigned to these attributes.
+            attr: Attributes of all edges.
+        Pre:
+            Graph should not already contain any of these edges.
+        Post:
+            self.edge_attr is updated.
+            self.neighbors, self.nodes and self.in_neighbors are updated if
+            graph was missing some of the nodes.
+        Return:
+            Returns number of edges added.
+        '''
+        edge_attr = self.edge_attr
+        neighbors = self.neighbors
+        directed = self.graph_type is DIRECTED_GRAPH
+        if directed:
+            in_neighbors = self.in_neighbors
+        template = copy.deepcopy(DEFAULT_EDGE_ATTRIBUTES)
+        template.update(attr)
+        self.structure_version += 1
+        count = 0
+        for e in edges:
+            name1 = e[0]
+            name2 = e[1]
+            if (name1, name2) in edge_attr:
+                raise MultipleEdgeException
+            if not directed and (name2, name1) in edge_attr:
+                raise MultipleEdgeException
+            a = dict(template)
+            if attr_names is not None:
+                a.update(zip(attr_names, e[2:]))
+            edge_attr[(name1, name2)] = a
+            if name1 not in neighbors:
+                self.add_node(name1)
+            if name2 not in neighbors:
+                self.add_node(name2)
+            neighbors[name1].append(name2)
+            if directed:
+                in_neighbors[name2].append(name1)
+            else:
+                neighbors[name2].append(name1)
+            count += 1
+        return count
+
     def del_edge(self, e):
         '''
         API: del_edge(self, e)
@@ -376,6 +512,7 @@ class Graph(object):
         Post:
             self.edge_attr, self.neighbors and self.in_neighbors are updated.
         '''
+        self.structure_version += 1
         if self.graph_type is DIRECTED_GRAPH:
             try:
                 del self.edge_attr[e]
@@ -545,6 +682,7 @@ class Graph(object):
         Post:
             Edge attribute will be updated.
         '''
+        self.attr_version += 1
         if self.graph_type is DIRECTED_GRAPH:
             self.edge_attr[(n,m)][attr] = value
         else:
@@ -595,6 +733,516 @@ class Graph(object):
         '''
         return self.neighbors[name]
 
+    def to_csr(self, attr = None, reverse = False, default = None):
+        '''
+        API: to_csr(self, attr = None, reverse = False, default = None)
+        Description:
+        Returns compressed sparse row (CSR) representation of the adjacency
+        lists. Nodes are numbered 0,...,n-1 in the order of get_node_list().
+        Neighbors of node with index i are targets[offsets[i]:offsets[i+1]].
+        This is the input format of the headless algorithm kernels, which
+        do not read or write node attributes.
+        Input:
+            attr: Edge attribute to collect in weights list. No weights are
+            collected if None.
+            reverse: Uses in-neighbors instead of out-neighbors if True and
+            the graph is directed.
+            default: Weight used for edges that do not have attr.
+        Return:
+            Returns a tuple (names, index, offsets, targets, weights) where
+            names is the list of node names, index is a dictionary mapping
+            names to indices, offsets and targets are lists of integers and
+            weights is a list aligned with targets (None if attr is None).
+        '''
+        names = list(self.neighbors)
+        index = dict(zip(names, range(len(names))))
+        neighbors = self.neighbors
+        if self.graph_type is DIRECTED_GRAPH and reverse:
+            neighbors = self.in_neighbors
+        offsets = [0]
+        targets = []
+        weights = None
+        if attr is not None:
+            weights = []
+        edge_attr = self.edge_attr
+        for n in names:
+            nbrs = neighbors[n]
+            targets.extend([index[m] for m in nbrs])
+            offsets.append(len(targets))
+            if attr is None:
+                continue
+            for m in nbrs:
+                if self.graph_type is DIRECTED_GRAPH:
+                    e = (m, n) if reverse else (n, m)
+                elif (n, m) in edge_attr:
+                    e = (n, m)
+                else:
+                    e = (m, n)
+                weights.append(edge_attr[e].get(attr, default))
+        return names, index, offsets, targets, weights
+
+    def get_edge_arrays(self, attr = None, default = None):
+        '''
+        API: get_edge_arrays(self, attr = None, default = None)
+        Description:
+        Returns edges as parallel arrays of node indices. Nodes are numbered
+        in the order of get_node_list() and edges in the order of
+        get_edge_list().
+        Input:
+            attr: Edge attribute to collect in values list. No values are
+            collected if None.
+            default: Value used for edges that do not have attr.
+        Return:
+            Returns a tuple (names, index, edges, tails, heads, values) where
+            edges is the edge list, tails and heads are lists of node
+            indices and values is a list aligned with edges (None if attr is
+            None).
+        '''
+        names = list(self.neighbors)
+        index = dict(zip(names, range(len(names))))
+        edges = list(self.edge_attr)
+        tails = [index[e[0]] for e in edges]
+        heads = [index[e[1]] for e in edges]
+        values = None
+        if attr is not None:
+            edge_attr = self.edge_attr
+            values = [edge_attr[e].get(attr, default) for e in edges]
+        return names, index, edges, tails, heads, values
+
+    # views are imported when they are created since views.py imports Graph
+    def reverse_view(self):
+        '''
+        API: reverse_view(self)
+        Description:
+        Returns a read-only view of the graph with all arcs reversed. The
+        view does not copy adjacency lists, it can be used instead of
+        reverse/transpose arguments of search methods. See views.py.
+        Return:
+            Returns a ReverseView instance.
+        '''
+        from .views import ReverseView
+        return ReverseView(self)
+
+    def subgraph_view(self, nodes):
+        '''
+        API: subgraph_view(self, nodes)
+        Description:
+        Returns a read-only view of the subgraph induced by nodes. Neighbor
+        lists of the view are computed when they are accessed. See
+        views.py.
+        Input:
+            nodes: Iterable of node names.
+        Return:
+            Returns a SubgraphView instance.
+        '''
+        from .views import SubgraphView
+        return SubgraphView(self, nodes = nodes)
+
+    def filtered_view(self, edge_pred):
+        '''
+        API: filtered_view(self, edge_pred)
+        Description:
+        Returns a read-only view of the graph that has the edges for which
+        edge_pred returns True, e.g. arcs with positive capacity. edge_pred
+        is evaluated when edges are accessed, so the view follows attribute
+        changes of the graph. See views.py.
+        Input:
+            edge_pred: Function of (name1, name2, attr) where attr is the
+            attribute dictionary of edge (name1, name2).
+        Return:
+            Returns a SubgraphView instance.
+        '''
+        from .views import SubgraphView
+        return SubgraphView(self, edge_pred = edge_pred)
+
+    def residual_view(self, flow_attr = 'flow'):
+        '''
+        API: residual_view(self, flow_attr = 'flow')
+        Description:
+        Returns a read-only view of the residual graph of the flow kept in
+        flow_attr attribute of arcs. Unlike create_residual_graph(), nothing
+        is copied and the view reflects later changes of the flow.
+        Residual arcs have 'capacity' (residual capacity) and 'cost'
+        (negated for backward arcs) attributes.
+        Input:
+            flow_attr: Edge attribute that keeps the flow.
+        Pre:
+            (1) Arcs should have 'capacity' and flow_attr attributes.
+            (2) Graph should be a directed graph
+        Return:
+            Returns a ResidualView instance.
+        '''
+        from .views import ResidualView
+        return ResidualView(self, flow_attr)
+
+    def overlay(self):
+        '''
+        API: overlay(self)
+        Description:
+        Returns a scratch overlay of the graph. Nodes and edges added to the
+        overlay are seen by methods called on the overlay together with the
+        nodes and edges of the graph, but they are kept in the overlay, so
+        the graph is not changed and they are discarded in O(1) by
+        dropping the overlay. Other structural changes raise an exception.
+        Attributes of nodes and edges of the graph are shared. See
+        views.py.
+        Return:
+            Returns an OverlayView instance.
+        '''
+        from .views import OverlayView
+        return OverlayView(self)
+
+    def snapshot(self, attr = 'cost', default = 1):
+        '''
+        API: snapshot(self, attr = 'cost', default = 1)
+        Description:
+        Returns an immutable snapshot of the structure of the graph and of
+        edge attribute attr. Later changes of the graph do not change the
+        snapshot, and read-only queries can run on it from many threads or
+        processes at once. See snapshot.py for the queries, QueryExecutor
+        and VersionedSnapshot.
+        Input:
+            attr: Edge attribute used as weight by shortest path queries.
+            default: Weight of edges that do not have attr.
+        Return:
+            Returns a Snapshot instance.
+        '''
+        from .snapshot import Snapshot
+        return Snapshot(self, attr, default)
+
+    def cached(self, method, args, compute, attrs = False):
+        '''
+        API: cached(self, method, args, compute, attrs = False)
+        Description:
+        Used by methods whose results are cached (search() with Dijkstra
+        and store='result', get_degrees(), get_diameter(), page_rank()).
+        If caching is enabled (see enable_cache()) results are kept in
+        self.cache, a QueryCache, keyed on (method, args, version) where
+        version is the structure version of the graph, and also the
+        attribute version if attrs is True. Results of older versions are
+        removed when the graph changes. A copy of the cached result is
+        returned, so callers can modify it. Should not be called by user
+        directly.
+        Input:
+            method: Method name.
+            args: Hashable tuple of arguments of the method.
+            compute: Function that computes the result.
+            attrs: True if the result depends on edge attributes.
+        Return:
+            Returns a copy of the cached result if there is one, result of
+            compute() otherwise.
+        '''
+        cache = self.cache
+        if cache is None:
+            return compute()
+        version = (self.structure_version, self.attr_version)
+        cache.invalidate(version)
+        if not attrs:
+            version = version[:1]
+        return copy.deepcopy(cache.get((method, args, version), compute))
+
+    def enable_cache(self, maxsize = QUERY_CACHE_SIZE):
+        '''
+        API: enable_cache(self, maxsize = QUERY_CACHE_SIZE)
+        Description:
+        Caches results of search() with Dijkstra and store='result',
+        get_degrees(), get_diameter() and page_rank() until the graph
+        changes (see cached()). Only changes made through the methods of
+        the graph (add/del node/edge methods and set_edge_attr()) are
+        noticed. Changes made directly to node objects or edge_attr
+        dictionaries, which is how flow algorithms write 'flow' and
+        'capacity', are not; call clear_cache() after such changes.
+        Input:
+            maxsize: Largest number of results kept, see QueryCache.
+        '''
+        self.cache = QueryCache(maxsize)
+
+    def disable_cache(self):
+        '''
+        API: disable_cache(self)
+        Description:
+        Removes the query cache, results are computed on every call.
+        '''
+        self.cache = None
+
+    def cache_info(self):
+        '''
+        API: cache_info(self)
+        Description:
+        Returns statistics of the query cache, see QueryCache.info(). Returns
+        None if caching is disabled (self.cache is None).
+        '''
+        if self.cache is None:
+            return None
+        return self.cache.info()
+
+    def clear_cache(self):
+        '''
+        API: clear_cache(self)
+        Description:
+        Removes all cached query results, see cached().
+        '''
+        if self.cache is not None:
+            self.cache.clear()
+
+    def save_binary(self, path):
+        '''
+        API: save_binary(self, path)
+        Description:
+        Saves graph in binary format, see load_binary(). The file keeps the
+        CSR representation of edges (each undirected edge once, in its
+        (source,sink) orientation), the reverse CSR representation (edges
+        entering each node) and numeric node and edge attributes as raw
+        arrays aligned to BINARY_ALIGNMENT bytes, so they can be memory
+        mapped. An attribute is stored as an array if every node (edge) has
+        it and all values are ints that fit in 64 bits or all values are
+        floats. Node names are stored as an int array or as a block of
+        UTF-8 strings. Graph attributes, clusters and other attributes are
+        stored as JSON, see binary_encode(); values other than None, bool,
+        int, float, str, bytes, tuple, list, set and dict raise an
+        exception.
+        Input:
+            path: File name.
+        '''
+        names = list(self.neighbors)
+        index = dict(zip(names, range(len(names))))
+        edge_attr = self.edge_attr
+        offsets = [0]
+        targets = []
+        edges = []
+        for n in names:
+            for m in self.neighbors[n]:
+                if (n, m) in edge_attr:
+                    targets.append(index[m])
+                    edges.append(edge_attr[(n, m)])
+            offsets.append(len(targets))
+        entering = [[] for n in names]
+        for i in range(len(names)):
+            for p in range(offsets[i], offsets[i+1]):
+                entering[targets[p]].append((i, p))
+        in_offsets = [0]
+        in_sources = []
+        in_edges = []
+        for pairs in entering:
+            in_sources.extend(i for (i, p) in pairs)
+            in_edges.extend(p for (i, p) in pairs)
+            in_offsets.append(len(in_sources))
+        arrays = [('offsets', 'q', offsets), ('targets', 'q', targets),
+                  ('in_offsets', 'q', in_offsets),
+                  ('in_sources', 'q', in_sources),
+                  ('in_edges', 'q', in_edges)]
+        if all(type(n) is int and -2**63 <= n < 2**63 for n in names):
+            name_format = 'int'
+            arrays.append(('names', 'q', names))
+        else:
+            if all(isinstance(n, str) for n in names):
+                name_format = 'str'
+                encoded = [n.encode('utf-8') for n in names]
+            else:
+                name_format = 'json'
+                encoded = [json.dumps(binary_encode(n)).encode('utf-8')
+                           for n in names]
+            name_offsets = [0]
+            for raw in encoded:
+                name_offsets.append(name_offsets[-1] + len(raw))
+            arrays.append(('name_offsets', 'q', name_offsets))
+            arrays.append(('names', 'B', b''.join(encoded)))
+        node_columns, node_extra = binary_columns(
+            [self.nodes[n].attr for n in names], 'node', arrays)
+        edge_columns, edge_extra = binary_columns(edges, 'edge', arrays)
+        meta = json.dumps(binary_encode(
+            {'attr':self.attr, 'cluster':self.cluster,
+             'node_extra':node_extra, 'edge_extra':edge_extra}))
+        blocks = [('meta', 'B', meta.encode('utf-8'))] + arrays
+        header = {'byteorder':sys.byteorder, 'version':BINARY_VERSION,
+                  'names':name_format, 'node_columns':node_columns,
+                  'edge_columns':edge_columns, 'blocks':[]}
+        data = []
+        # header size depends on offsets, so offsets are relative to the
+        # end of the header
+        position = 0
+        for (key, typecode, values) in blocks:
+            if typecode == 'B':
+                raw = values
+            else:
+                raw = array.array(typecode, values).tobytes()
+            header['blocks'].append([key, typecode, position, len(raw)])
+            padding = (-len(raw)) % BINARY_ALIGNMENT
+            data.append(raw + b'\0'*padding)
+            position += len(raw) + padding
+        header = json.dumps(header).encode('utf-8')
+        start = len(BINARY_MAGIC) + 8 + len(header)
+        padding = (-start) % BINARY_ALIGNMENT
+        with open(path, 'wb') as f:
+            f.write(BINARY_MAGIC)
+            f.write(struct.pack('<Q', len(header) + padding))
+            f.write(header + b' '*padding)
+            for raw in data:
+                f.write(raw)
+
+    @classmethod
+    def load_binary(cls, path, mmap = True, view = False):
+        '''
+        API: load_binary(cls, path, mmap = True, view = False)
+        Description:
+        Creates a graph from a file written by save_binary(). Arrays are
+        read with read_binary(). If view is False adjacency lists, node
+        objects and edge attribute dictionaries are built from the arrays,
+        which takes time linear in the size of the graph. If view is True
+        a read-only BinaryView is returned instead, which builds node
+        objects, adjacency lists and edge attribute dictionaries when they
+        are accessed, so loading only decodes node names (see views.py).
+        Input:
+            path: File name.
+            mmap: Memory maps the file if True, reads it otherwise.
+            view: Returns a BinaryView if True.
+        Return:
+            Returns the graph.
+        '''
+        data = read_binary(path, mmap)
+        if view:
+            from .views import BinaryView
+            return BinaryView(data)
+        attr = dict(data['attr'])
+        cluster_count = attr.pop('cluster_count', 0)
+        g = cls(**attr)
+        g.attr['cluster_count'] = cluster_count
+        g.cluster = data['cluster']
+        names = data['names']
+        n = len(names)
+        node_extra = data['node_extra']
+        node_keys = list(data['node_columns'])
+        node_rows = zip(*[data['node_columns'][k].tolist()
+                          for k in node_keys])
+        if not node_keys:
+            node_rows = itertools.repeat(())
+        for i, values in zip(range(n), node_rows):
+            node = Node(names[i])
+            node.attr.update(zip(node_keys, values))
+            if i in node_extra:
+                node.attr.update(node_extra[i])
+            g.nodes[names[i]] = node
+        offsets = data['offsets'].tolist()
+        targets = data['targets'].tolist()
+        in_offsets = data['in_offsets'].tolist()
+        in_sources = data['in_sources'].tolist()
+        edge_keys = list(data['edge_columns'])
+        edge_rows = zip(*[data['edge_columns'][k].tolist()
+                          for k in edge_keys])
+        if not edge_keys:
+            edge_rows = itertools.repeat((), len(targets))
+        attrs = [dict(zip(edge_keys, values)) for values in edge_rows]
+        for p, extra in data['edge_extra'].items():
+            attrs[p].update(extra)
+        tails = []
+        for i in range(n):
+            tails.extend(itertools.repeat(names[i], offsets[i+1] - offsets[i]))
+        g.edge_attr.update(zip(zip(tails, map(names.__getitem__, targets)),
+                               attrs))
+        for i in range(n):
+            u = names[i]
+            out = [names[j] for j in targets[offsets[i]:offsets[i+1]]]
+            into = [names[j] for j in in_sources[in_offsets[i]:in_offsets[i+1]]]
+            if g.graph_type is DIRECTED_GRAPH:
+                g.neighbors[u] = out
+                g.in_neighbors[u] = into
+            else:
+                g.neighbors[u] = out + into
+        g.structure_version += 1
+        return g
+
+    @classmethod
+    def from_edgelist(cls, path, columns = None, dtypes = None,
+                      chunksize = EDGELIST_CHUNK_SIZE, delimiter = ',',
+                      header = None, vectorized = True, **attr):
+        '''
+        API:
+            from_edgelist(cls, path, columns = None, dtypes = None,
+                          chunksize = EDGELIST_CHUNK_SIZE, delimiter = ',',
+                          header = None, vectorized = True, **attr)
+        Description:
+        Creates a graph from an edge list file (CSV), one edge per row.
+        Rows are parsed with the csv module chunksize rows at a time, each
+        chunk is converted column by column and passed to add_edges(), so
+        memory used besides the graph is proportional to chunksize. Node
+        names are converted once per distinct name and the same name object
+        is used for all of its edges. Numeric attribute columns are
+        converted with NumPy if it is installed and vectorized is True.
+        Input:
+            path: File name or file object.
+            columns: Sequence of column names in file order. Columns 'tail'
+            and 'head' are the nodes of the edge, the others are edge
+            attributes. Columns named None are skipped. If None, names are
+            read from the header row.
+            dtypes: Dictionary of column types (callables that convert
+            strings, like int, float or str). Default is str for node
+            columns and float for attributes. Type of 'tail' is used for
+            both node columns.
+            chunksize: Number of rows converted and added at once.
+            delimiter: Field delimiter.
+            header: True if the first row is a header. Default is True if
+            columns is None, False otherwise.
+            vectorized: Converts int and float columns with NumPy if True.
+            attr: Graph attributes, given to the constructor (type, etc.).
+        Pre:
+            Every row should have a value for every column, file should not
+            have repeated edges.
+        Return:
+            Returns the graph.
+        '''
+        if hasattr(path, 'read'):
+            f = path
+        else:
+            f = open(path, 'r')
+        try:
+            rows = csv.reader(f, delimiter = delimiter)
+            if header is None:
+                header = columns is None
+            if header:
+                names = [c.strip() for c in next(rows)]
+                if columns is None:
+                    columns = names
+            columns = list(columns)
+            if 'tail' not in columns or 'head' not in columns:
+                raise Exception('Edge list columns should have tail and head!')
+            if dtypes is None:
+                dtypes = {}
+            tail = columns.index('tail')
+            head = columns.index('head')
+            node_type = dtypes.get('tail', str)
+            attr_columns = [(i, c, dtypes.get(c, float))
+                            for i, c in enumerate(columns)
+                            if c not in (None, 'tail', 'head')]
+            attr_names = [c for (i, c, t) in attr_columns]
+            vectorized = vectorized and NUMPY_INSTALLED
+            g = cls(**attr)
+            interned = {}
+            def intern(s):
+                name = interned.get(s)
+                if name is None:
+                    name = interned[s] = node_type(s)
+                return name
+            while True:
+                chunk = [r for r in itertools.islice(rows, chunksize) if r]
+                if not chunk:
+                    break
+                cols = list(zip(*chunk))
+                if len(cols) < len(columns):
+                    raise Exception('Edge list rows should have %d columns!'
+                                    %len(columns))
+                values = [list(map(intern, cols[tail])),
+                          list(map(intern, cols[head]))]
+                for (i, c, t) in attr_columns:
+                    if vectorized and t in (int, float):
+                        values.append(numpy.array(cols[i], dtype = t).tolist())
+                    else:
+                        values.append(list(map(t, cols[i])))
+                g.add_edges(zip(*values), attr_names)
+        finally:
+            if f is not path:
+                f.close()
+        return g
+
     def edge_to_string(self, e):
         '''
         API: edge_to_string(self, e)
@@ -691,9 +1339,9 @@ class Graph(object):
         graph.append( '}\n' )
         return ''.join(graph)
 
-    def label_components(self, display = None):
+    def label_components(self, display = None, store = 'attrs'):
         '''
-        API: label_components(self, display=None)
+        API: label_components(self, display=None, store = 'attrs')
         Description:
         This method labels the nodes of an undirected graph with component
         numbers so that each node has the same label as all nodes in the
@@ -701,15 +1349,36 @@ class Graph(object):
         provided.
         Input:
             display: display method.
+            store: 'attrs' writes results to node attributes, 'result'
+            returns a ComponentsResult and does not change the graph.
         Pre:
             self.graph_type should be UNDIRECTED_GRAPH.
         Post:
             Nodes will have 'component' attribute that will have component
-            number as value.
+            number as value. Nothing changes if store is 'result'.
+        Return:
+            Returns a ComponentsResult if store is 'result'.
         '''
         if self.graph_type == DIRECTED_GRAPH:
             raise Exception("label_components only works for ",
                             "undirected graphs")
+        if store == 'result':
+            component = {}
+            num_components = 0
+            for n in self.neighbors:
+                if n in component:
+                    continue
+                component[n] = num_components
+                stack = [n]
+                while stack:
+                    for m in self.neighbors[stack.pop()]:
+                        if m not in component:
+                            component[m] = num_components
+                            stack.append(m)
+                num_components += 1
+            return ComponentsResult(component, num_components)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
         self.num_components = 0
         for n in self.get_node_list():
             self.get_node(n).set_attr('component', None)
@@ -721,68 +1390,160 @@ class Graph(object):
                             component=self.num_components, algo='DFS')
                 self.num_components += 1
 
-    def tarjan(self):
+    def tarjan(self, store = 'attrs'):
         '''
-        API: tarjan(self)
+        API: tarjan(self, store = 'attrs')
         Description:
         Implements Tarjan's algorithm for determining strongly connected set of
-        nodes.
+        nodes. Uses the iterative kernel strong_components(), so there is no
+        recursion limit on the size of the components.
+        Input:
+            store: 'attrs' writes results to node attributes, 'result'
+            returns a ComponentsResult and does not change the graph.
         Pre:
             self.graph_type should be DIRECTED_GRAPH.
         Post:
             Nodes will have 'component' attribute that will have component
-            number as value. Changes 'index' attribute of nodes.
-        '''
-        index = 0
-        component = 0
-        q = []
-        for n in self.get_node_list():
-            if self.get_node_attr(n, 'index') is None:
-                index, component = self.strong_connect(q, n, index, component)
+            number as value. self.num_components is updated. Nothing changes
+            if store is 'result'.
+        Return:
+            Returns a ComponentsResult if store is 'result'.
+        '''
+        component, dag = self.strong_components()
+        if store == 'result':
+            return ComponentsResult(dict(zip(self.neighbors, component)),
+                                    max(component) + 1 if component else 0)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
+        for n, c in zip(self.neighbors, component):
+            self.nodes[n].attr['component'] = c
+        self.num_components = max(component) + 1 if component else 0
 
-    def strong_connect(self, q, node, index, component):
+    def strong_components(self, condensation = False, algo = 'Tarjan'):
         '''
-        API: strong_connect (self, q, node, index, component)
+        API: strong_components(self, condensation = False, algo = 'Tarjan')
         Description:
-        Used by tarjan method. This method should not be called directly by
-        user.
+        Headless computation of strongly connected components. Does not
+        read or write node attributes.
+        'Tarjan' is an iterative implementation of Tarjan's algorithm in the
+        space efficient form given by Pearce. A single rindex array replaces
+        index and lowlink, a byte array marks component roots and an
+        explicit stack of (node, edge pointer) pairs replaces recursion. It
+        works on the CSR representation of the graph (see to_csr()).
+        Components are numbered in the order they are completed, i.e. in
+        reverse topological order of the condensation.
+        'Kosaraju' runs depth_first_order() on the graph and then on its
+        transpose with roots in reverse finish order. Components are
+        numbered in topological order of the condensation.
         Input:
-            q: Node list.
-            node: Node that is being connected to nodes in q.
-            index: Index used by tarjan method.
-            component: Current component number.
+            condensation: Builds the condensation DAG if True.
+            algo: 'Tarjan' or 'Kosaraju'.
         Pre:
-            Should be called by tarjan and itself (recursive) only.
-        Post:
-            Nodes will have 'component' attribute that will have component
-            number as value. Changes 'index' attribute of nodes.
-        Return:
-            Returns new index and component numbers.
-        '''
-        self.set_node_attr(node, 'index', index)
-        self.set_node_attr(node, 'lowlink', index)
-        index += 1
-        q.append(node)
-        for m in self.get_neighbors(node):
-            if self.get_node_attr(m, 'index') is None:
-                index, component = self.strong_connect(q, m, index, component)
-                self.set_node_attr(node, 'lowlink',
-                                   min([self.get_node_attr(node, 'lowlink'),
-                                        self.get_node_attr(m, 'lowlink')]))
-            elif m in q:
-                self.set_node_attr(node, 'lowlink',
-                                   min([self.get_node_attr(node, 'lowlink'),
-                                        self.get_node_attr(m, 'index')]))
-        if self.get_node_attr(node, 'lowlink') == self.get_node_attr(node, 'index'):
-            m = q.pop()
-            self.set_node_attr(m, 'component', component)
-            while (node!=m):
-                m = q.pop()
-                self.set_node_attr(m, 'component', component)
-            component += 1
-            self.num_components = component
-
-        return (index, component)
+            self.graph_type should be DIRECTED_GRAPH.
+        Return:
+            Returns a tuple (component, dag). component is a list aligned
+            with get_node_list() that keeps component numbers. dag is None
+            if condensation is False, otherwise it is a directed Graph
+            instance with a node for every component ('size' attribute
+            keeps the number of nodes in the component) and an arc (c,d) if
+            the graph has an arc from component c to component d.
+        '''
+        if algo == 'Kosaraju':
+            names, disc, finish, pred, order, tree = self.depth_first_order()
+            component = self.depth_first_order([names[i] for i in order],
+                                               transpose = True)[5]
+            return component, self.get_condensation(component, condensation)
+        elif algo != 'Tarjan':
+            raise Exception('Unknown strongly connected components '
+                            'algorithm %s' %str(algo))
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        rindex = [0]*n
+        root = bytearray(n)
+        stack = []
+        next_index = 1
+        c = n - 1
+        for s in range(n):
+            if rindex[s]:
+                continue
+            rindex[s] = next_index
+            next_index += 1
+            root[s] = 1
+            call = [s]
+            pointer = [offsets[s]]
+            while call:
+                v = call[-1]
+                p = pointer[-1]
+                end = offsets[v+1]
+                descended = False
+                while p < end:
+                    w = targets[p]
+                    p += 1
+                    if not rindex[w]:
+                        pointer[-1] = p
+                        rindex[w] = next_index
+                        next_index += 1
+                        root[w] = 1
+                        call.append(w)
+                        pointer.append(offsets[w])
+                        descended = True
+                        break
+                    if rindex[w] < rindex[v]:
+                        rindex[v] = rindex[w]
+                        root[v] = 0
+                if descended:
+                    continue
+                call.pop()
+                pointer.pop()
+                if root[v]:
+                    next_index -= 1
+                    while stack and rindex[v] <= rindex[stack[-1]]:
+                        w = stack.pop()
+                        rindex[w] = c
+                        next_index -= 1
+                    rindex[v] = c
+                    c -= 1
+                else:
+                    stack.append(v)
+                if call:
+                    u = call[-1]
+                    if rindex[v] < rindex[u]:
+                        rindex[u] = rindex[v]
+                        root[u] = 0
+        component = [n - 1 - r for r in rindex]
+        return component, self.get_condensation(component, condensation)
+
+    def get_condensation(self, component, build = True):
+        '''
+        API: get_condensation(self, component, build = True)
+        Description:
+        Used by strong_components(). Builds the condensation DAG from a
+        component number list aligned with get_node_list().
+        Input:
+            component: List of component numbers.
+            build: Returns None without building anything if False.
+        Return:
+            Returns a directed Graph instance with a node for every
+            component ('size' attribute keeps the number of nodes in the
+            component) and an arc (c,d) if the graph has an arc from
+            component c to component d.
+        '''
+        if not build:
+            return None
+        dag = Graph(type = DIRECTED_GRAPH)
+        size = [0]*(max(component) + 1 if component else 0)
+        for k in component:
+            size[k] += 1
+        for k in range(len(size)):
+            dag.add_node(k, size = size[k])
+        names, index, offsets, targets, weights = self.to_csr()
+        for v in range(len(names)):
+            cv = component[v]
+            for p in range(offsets[v], offsets[v+1]):
+                cw = component[targets[p]]
+                if cv != cw and (cv, cw) not in dag.edge_attr:
+                    dag.add_edge(cv, cw)
+        return dag
 
     def label_strong_component(self):
         '''
@@ -795,33 +1556,54 @@ class Graph(object):
             self.graph_type should be DIRECTED_GRAPH.
         Post:
             Nodes will have 'component' attribute that will have component
-            number as value. Changes 'index' attribute of nodes.
+            number as value.
         '''
         self.num_components = 0
         self.tarjan()
 
     def dfs(self, root, disc_count = 0, finish_count = 1, topological_order = None,
-            component = None, transpose = False, display = None, pred = None):
+            component = None, transpose = False, display = None, pred = None,
+            store = 'attrs'):
         '''
-        API: dfs(self, root, disc_count = 0, finish_count = 1, component=None,
-            transpose=False)
+        API: dfs(self, root, disc_count = 0, finish_count = 1,
+                 topological_order = None, component = None,
+                 transpose = False, display = None, pred = None,
+                 store = 'attrs')
         Description:
-        Make a depth-first search starting from node with name root.
+        Make a depth-first search starting from node with name root. The
+        search uses an explicit stack, so it is not limited by recursion
+        depth. See depth_first_order() for a headless version that does not
+        change node attributes.
         Input:
             root: Starting node name.
             disc_count: Discovery time.
             finish_count: Finishing time.
+            topological_order: If a list is given, nodes finished in this
+            search are inserted to the beginning of it in reverse finishing
+            order.
             component: component number.
             transpose: Goes in the reverse direction along edges if transpose
             is True.
+            display: Display method.
+            pred: Predecessor dictionary of the search tree, updated.
+            store: 'attrs' writes results to node attributes, 'result'
+            returns a DFSResult and does not change the graph.
         Post:
             Nodes will have 'component' attribute that will have component
             number as value. Updates 'disc_time' and 'finish_time' attributes
             of nodes which represents discovery time and finishing time.
+            Nothing changes if store is 'result'.
         Return:
             Returns a tuple that has discovery time and finish time of the
-            last node in the following form (disc_time,finish_time).
-        '''
+            last node in the following form (disc_time,finish_time). Returns
+            a DFSResult if store is 'result'.
+        '''
+        if store == 'result':
+            return self.dfs_result(root, disc_count, finish_count,
+                                   topological_order, component, transpose,
+                                   pred)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
         if pred == None:
             pred = {}
         if display == None:
@@ -831,55 +1613,189 @@ class Graph(object):
         neighbors = self.neighbors
         if self.graph_type == DIRECTED_GRAPH and transpose:
             neighbors = self.in_neighbors
-        self.get_node(root).set_attr('component', component)
-        disc_count += 1
-        self.get_node(root).set_attr('disc_time', disc_count)
-        self.get_node(root).set_attr('label', str(disc_count)+',-')
-        self.get_node(root).set_attr('color', 'blue')
-        if root in pred:
-            self.set_edge_attr(pred[root], root, 'color', 'green')
-        self.display()
-        if transpose:
-            fTime = []
-            for n in neighbors[root]:
-                fTime.append((n,self.get_node(n).get_attr('finish_time')))
-            neighbor_list = sorted(fTime, key=operator.itemgetter(1))
-            neighbor_list = list(t[0] for t in neighbor_list)
-            neighbor_list.reverse()
-        else:
-            neighbor_list = neighbors[root]
-        for i in neighbor_list:
-            if not transpose:
-                if self.get_node(i).get_attr('disc_time') is None:
-                    pred[i] = root
-                    disc_count, finish_count = self.dfs(i, disc_count,
-                                                        finish_count, topological_order,
-                                                        component, transpose,
-                                                        pred = pred)
-            else:
-                if self.get_node(i).get_attr('component') is None:
-                    disc_count, finish_count = self.dfs(i, disc_count,
-                                                        finish_count, topological_order,
-                                                        component, transpose,
-                                                        pred = pred)
-        self.get_node(root).set_attr('finish_time', finish_count)
+        finished = []
+        stack = []
+        current = root
+        while True:
+            # discover current
+            node = self.get_node(current)
+            node.set_attr('component', component)
+            disc_count += 1
+            node.set_attr('disc_time', disc_count)
+            node.set_attr('label', str(disc_count)+',-')
+            node.set_attr('color', 'blue')
+            if current in pred:
+                self.set_edge_attr(pred[current], current, 'color', 'green')
+            self.display()
+            stack.append((current, iter(neighbors[current])))
+            current = None
+            while stack:
+                v, neighbor_iter = stack[-1]
+                for i in neighbor_iter:
+                    if not transpose:
+                        if self.get_node(i).get_attr('disc_time') is None:
+                            pred[i] = v
+                            current = i
+                            break
+                    elif self.get_node(i).get_attr('component') is None:
+                        current = i
+                        break
+                if current is not None:
+                    break
+                # all neighbors of v are processed, finish v
+                stack.pop()
+                node = self.get_node(v)
+                node.set_attr('finish_time', finish_count)
+                finished.append(v)
+                label = '"' + str(node.get_attr('disc_time')) + ',' + \
+                    str(finish_count) + '"'
+                node.set_attr('label', label)
+                node.set_attr('color', 'green')
+                self.display()
+                finish_count += 1
+            if current is None:
+                break
         if topological_order != None:
-            topological_order.insert(0, root)
-        d_time = self.get_node(root).get_attr('disc_time')
-        label = '"' + str(d_time) + ',' + str(finish_count) + '"'
-        self.get_node(root).set_attr('label', label)
-        self.get_node(root).set_attr('color', 'green')
-        self.display()
-        finish_count += 1
+            finished.reverse()
+            topological_order[:0] = finished
         return disc_count, finish_count
 
+    def dfs_result(self, root, disc_count, finish_count, topological_order,
+                   component, transpose, pred):
+        '''
+        API: dfs_result(self, root, disc_count, finish_count,
+                        topological_order, component, transpose, pred)
+        Description:
+        Used by dfs() method if store is 'result'. Makes the same search as
+        dfs() but keeps discovery and finish times in local dictionaries
+        instead of node attributes and does not display. Nodes are
+        discovered once, whether transpose is True or not. Should not be
+        called by user directly.
+        Return:
+            Returns a DFSResult.
+        '''
+        if pred is None:
+            pred = {}
+        neighbors = self.neighbors
+        if self.graph_type == DIRECTED_GRAPH and transpose:
+            neighbors = self.in_neighbors
+        disc = {}
+        finish = {}
+        finished = []
+        stack = []
+        current = root
+        while current is not None:
+            disc_count += 1
+            disc[current] = disc_count
+            stack.append((current, iter(neighbors[current])))
+            current = None
+            while stack:
+                v, neighbor_iter = stack[-1]
+                for i in neighbor_iter:
+                    if i not in disc:
+                        if not transpose:
+                            pred[i] = v
+                        current = i
+                        break
+                if current is not None:
+                    break
+                stack.pop()
+                finish[v] = finish_count
+                finished.append(v)
+                finish_count += 1
+        if topological_order != None:
+            finished.reverse()
+            topological_order[:0] = finished
+        if component is not None:
+            component = dict.fromkeys(disc, component)
+        return DFSResult(disc, finish, pred, component, disc_count,
+                         finish_count)
+
+    def depth_first_order(self, roots = None, transpose = False):
+        '''
+        API: depth_first_order(self, roots = None, transpose = False)
+        Description:
+        Headless depth-first search. Uses an explicit stack of (node, edge
+        pointer) pairs on the CSR representation of the graph (see
+        to_csr()) and does not read or write node attributes. Searches are
+        started from roots in the given order, skipping roots that are
+        already discovered. Discovery and finish times are counted as in
+        dfs(), starting from 1. Topological order is built by appending
+        finished nodes and reversing once at the end.
+        Input:
+            roots: List of node names to start searches from. All nodes in
+            the order of get_node_list() if None.
+            transpose: Goes in the reverse direction along edges if transpose
+            is True.
+        Return:
+            Returns a tuple (names, disc, finish, pred, order, tree). names is
+            get_node_list() and the remaining lists are indexed by node
+            index; disc and finish keep discovery and finish times (0 if not
+            reached), pred keeps the index of the predecessor in the search
+            forest (-1 for roots and unreached nodes), order keeps node
+            indices in reverse finish order (a topological order if the
+            graph is acyclic) and tree keeps the number of the search tree
+            that contains the node (-1 if not reached).
+        '''
+        names, index, offsets, targets, weights = self.to_csr(
+            reverse = transpose)
+        n = len(names)
+        disc = [0]*n
+        finish = [0]*n
+        pred = [-1]*n
+        tree = [-1]*n
+        order = []
+        if roots is None:
+            root_list = range(n)
+        else:
+            root_list = [index[r] for r in roots]
+        disc_count = 0
+        finish_count = 0
+        tree_count = 0
+        for s in root_list:
+            if disc[s]:
+                continue
+            disc_count += 1
+            disc[s] = disc_count
+            tree[s] = tree_count
+            call = [s]
+            pointer = [offsets[s]]
+            while call:
+                v = call[-1]
+                p = pointer[-1]
+                end = offsets[v+1]
+                while p < end:
+                    w = targets[p]
+                    p += 1
+                    if not disc[w]:
+                        break
+                else:
+                    call.pop()
+                    pointer.pop()
+                    finish_count += 1
+                    finish[v] = finish_count
+                    order.append(v)
+                    continue
+                pointer[-1] = p
+                disc_count += 1
+                disc[w] = disc_count
+                pred[w] = v
+                tree[w] = tree_count
+                call.append(w)
+                pointer.append(offsets[w])
+            tree_count += 1
+        order.reverse()
+        return names, disc, finish, pred, order, tree
+
     def hamiltonian(self, source, destination = None, distance = 0,
                     display = None, pred = None):
         '''
-        API: tsp(source, destination = None, distance = 0,
-                 display = None, pred = None)
+        API: hamiltonian(source, destination = None, distance = 0,
+                         display = None, pred = None)
         Description:
-        Find a Hamiltonian tour starting from source.
+        Find a Hamiltonian path starting from source by exhaustive
+        backtracking. This method is for visualization, see
+        hamiltonian_path() for a solver that can handle larger graphs.
         Input:
             source: Starting node name
             destination: ending node name
@@ -917,8 +1833,8 @@ class Graph(object):
         for i in self.get_neighbors(source):
             if self.get_node(i).get_attr('visited') is None:
                 pred[i] = source
-                if (self.tsp(i, destination, distance+1, display = display, 
-                            pred = pred)):
+                if (self.hamiltonian(i, destination, distance+1,
+                                     display = display, pred = pred)):
                     return True
         if source in pred: # this is the original source node
             self.get_node(source).set_attr('color', 'black')            
@@ -928,6 +1844,356 @@ class Graph(object):
             self.get_node(source).set_attr('label', '-')
         return False
 
+    def hamiltonian_path(self, source = None, destination = None,
+                         tour = False, attr = 'cost', time_limit = None):
+        '''
+        API: hamiltonian_path(self, source = None, destination = None,
+                              tour = False, attr = 'cost', time_limit = None)
+        Description:
+        Finds a minimum cost Hamiltonian path (or tour). Uses Held-Karp
+        dynamic programming over subsets of nodes (see held_karp()) if its
+        table fits in HELD_KARP_MAX_TABLE_BYTES (HELD_KARP_MAX_NODES_PURE
+        nodes without NumPy), branch and bound otherwise (see
+        hamiltonian_branch_and_bound()). Does not change node or edge
+        attributes.
+        Input:
+            source: First node of the path. Any node if None.
+            destination: Last node of the path. Any node if None. Not valid
+            if tour is True.
+            tour: Finds a Hamiltonian cycle if True.
+            attr: Edge attribute that keeps edge costs. Edges that do not
+            have it cost 1.
+            time_limit: Time budget in seconds for branch and bound. No
+            limit if None.
+        Return:
+            Returns a tuple (path, cost, optimal). path is the list of node
+            names (the arc from the last node back to the first one closes
+            the tour if tour is True), None if no path is found. optimal is
+            True if path is proven optimal (or proven not to exist).
+        '''
+        n = self.get_node_num()
+        if NUMPY_INSTALLED:
+            small = 8*n*(1 << n) <= HELD_KARP_MAX_TABLE_BYTES
+        else:
+            small = n <= HELD_KARP_MAX_NODES_PURE
+        if small:
+            path, cost = self.held_karp(source, destination, tour, attr)
+            return path, cost, True
+        return self.hamiltonian_branch_and_bound(source, destination, tour,
+                                                 attr, time_limit)
+
+    def held_karp(self, source = None, destination = None, tour = False,
+                  attr = 'cost'):
+        '''
+        API: held_karp(self, source = None, destination = None, tour = False,
+                       attr = 'cost')
+        Description:
+        Bitmask Held-Karp dynamic programming, O(2^n n^2) time and
+        O(2^n n) memory. cost[S][j] is the minimum cost of a path that
+        visits node set S and ends at j. With NumPy the table is filled
+        one subset size at a time and all subsets of a size are processed
+        with vectorized operations, otherwise subsets are processed one by
+        one pushing along out-arcs. See hamiltonian_path() for arguments.
+        Return:
+            Returns a tuple (path, cost), (None, None) if there is no
+            Hamiltonian path (tour).
+        '''
+        names, index, offsets, targets, weights = self.to_csr(attr,
+                                                              default = 1)
+        n = len(names)
+        if n == 0:
+            return None, None
+        if tour and source is None:
+            source = names[0]
+        if source is not None:
+            starts = [index[source]]
+        else:
+            starts = list(range(n))
+        full = (1 << n) - 1
+        inf = float('inf')
+        cost = {}
+        for u in range(n):
+            for p in range(offsets[u], offsets[u+1]):
+                if weights[p] < cost.get((u, targets[p]), inf):
+                    cost[(u, targets[p])] = weights[p]
+        if NUMPY_INSTALLED:
+            c = numpy.full((n, n), inf)
+            for (u, v), w in cost.items():
+                c[u, v] = w
+            table = numpy.full((1 << n, n), inf)
+            for s in starts:
+                table[1 << s, s] = 0
+            masks = numpy.arange(1 << n, dtype = numpy.int64)
+            size = numpy.zeros(1 << n, dtype = numpy.int8)
+            for b in range(n):
+                size += ((masks >> b) & 1).astype(numpy.int8)
+            for k in range(1, n):
+                layer = masks[size == k]
+                if len(starts) == 1:
+                    layer = layer[(layer >> starts[0]) & 1 == 1]
+                sub = table[layer]
+                for j in range(n):
+                    free = (layer >> j) & 1 == 0
+                    if not free.any():
+                        continue
+                    table[layer[free] | (1 << j), j] = \
+                        (sub[free] + c[:, j]).min(axis = 1)
+            def get(mask, j):
+                return table[mask, j]
+        else:
+            table = [None]*(1 << n)
+            for s in starts:
+                table[1 << s] = [inf]*n
+                table[1 << s][s] = 0
+            for mask in range(1, 1 << n):
+                row = table[mask]
+                if row is None:
+                    continue
+                for u in range(n):
+                    if row[u] == inf:
+                        continue
+                    for p in range(offsets[u], offsets[u+1]):
+                        v = targets[p]
+                        if mask >> v & 1:
+                            continue
+                        nmask = mask | (1 << v)
+                        if table[nmask] is None:
+                            table[nmask] = [inf]*n
+                        if row[u] + weights[p] < table[nmask][v]:
+                            table[nmask][v] = row[u] + weights[p]
+            def get(mask, j):
+                if table[mask] is None:
+                    return inf
+                return table[mask][j]
+        # pick the best last node
+        best = inf
+        last = None
+        if tour:
+            s = starts[0]
+            candidates = [j for j in range(n) if (j, s) in cost or n == 1]
+        elif destination is not None:
+            candidates = [index[destination]]
+        else:
+            candidates = range(n)
+        for j in candidates:
+            value = get(full, j)
+            if tour and n > 1:
+                value = value + cost[(j, starts[0])]
+            if value < best:
+                best = value
+                last = j
+        if last is None:
+            return None, None
+        # walk back through the table
+        path = [last]
+        mask = full
+        j = last
+        while mask & (mask - 1):
+            prev = mask ^ (1 << j)
+            for i in range(n):
+                if (i, j) in cost and get(prev, i) + cost[(i, j)] == get(mask, j):
+                    break
+            path.append(i)
+            mask = prev
+            j = i
+        path.reverse()
+        best = best.item() if hasattr(best, 'item') else best
+        return [names[v] for v in path], best
+
+    def hamiltonian_branch_and_bound(self, source = None, destination = None,
+                                     tour = False, attr = 'cost',
+                                     time_limit = None):
+        '''
+        API: hamiltonian_branch_and_bound(self, source = None,
+                                          destination = None, tour = False,
+                                          attr = 'cost', time_limit = None)
+        Description:
+        Depth-first branch and bound for Hamiltonian paths on sparse
+        graphs. Uses an explicit stack, so path length is not limited by
+        recursion depth. Partial paths are pruned if
+        (1) their cost plus the sum of the cheapest in-arcs of unvisited
+        nodes is not less than the best path found,
+        (2) an unvisited node is left without enough possible predecessors
+        (in-neighbors that are unvisited or the current end of the path;
+        two neighbors for undirected tours, where the first node counts as
+        well),
+        (3) an unvisited node is not reachable from the end of the path
+        through unvisited nodes.
+        Extensions are tried in increasing order of remaining possible
+        predecessors (Warnsdorff's rule), then cost. Search stops when
+        time_limit is exceeded and the best path found is returned. See
+        hamiltonian_path() for arguments and return value.
+        '''
+        names, index, offsets, targets, weights = self.to_csr(attr,
+                                                              default = 1)
+        n = len(names)
+        if n == 0:
+            return None, None, True
+        undirected = self.graph_type is not DIRECTED_GRAPH
+        in_offsets, in_targets = self.to_csr(reverse = True)[2:4]
+        inf = float('inf')
+        min_in = [inf]*n
+        close = {}
+        for u in range(n):
+            for p in range(offsets[u], offsets[u+1]):
+                v = targets[p]
+                if weights[p] < min_in[v]:
+                    min_in[v] = weights[p]
+        if tour and source is None:
+            source = names[0]
+        if source is not None:
+            starts = [index[source]]
+        else:
+            starts = list(range(n))
+        end = None
+        if destination is not None:
+            end = index[destination]
+            if n > 1 and end in starts:
+                starts.remove(end)
+        deadline = None
+        if time_limit is not None:
+            deadline = time.time() + time_limit
+        best = [inf, None]
+        counter = 0
+        timed_out = False
+        for s in starts:
+            if tour:
+                close = {}
+                for p in range(in_offsets[s], in_offsets[s+1]):
+                    close[in_targets[p]] = inf
+                for u in close:
+                    for p in range(offsets[u], offsets[u+1]):
+                        if targets[p] == s and weights[p] < close[u]:
+                            close[u] = weights[p]
+            need = [1]*n
+            if undirected and tour:
+                need = [2]*n
+            need[s] = 1 if tour else 0
+            avail = [in_offsets[v+1] - in_offsets[v] for v in range(n)]
+            visited = bytearray(n)
+            visited[s] = 1
+            remaining = sum(min_in[v] for v in range(n) if v != s)
+            if tour:
+                remaining += min_in[s]
+            if remaining == inf or any(avail[v] < need[v] for v in range(n)):
+                continue
+            path = [s]
+            path_cost = [0]
+            stack = [iter(self.hamiltonian_candidates(s, offsets, targets,
+                                                      weights, visited,
+                                                      avail))]
+            while stack:
+                counter += 1
+                if deadline is not None and counter % 256 == 0:
+                    if time.time() > deadline:
+                        timed_out = True
+                        break
+                u = path[-1]
+                keep = not (undirected and tour and u == s)
+                extended = False
+                for x, w in stack[-1]:
+                    cost = path_cost[-1] + w
+                    if cost + remaining - min_in[x] >= best[0]:
+                        continue
+                    if x == end and len(path) + 1 < n:
+                        continue
+                    # extend path by arc (u,x)
+                    visited[x] = 1
+                    remaining -= min_in[x]
+                    if keep:
+                        for p in range(offsets[u], offsets[u+1]):
+                            avail[targets[p]] -= 1
+                    feasible = True
+                    if len(path) + 1 == n:
+                        if end is not None and x != end:
+                            feasible = False
+                        elif tour:
+                            if x in close:
+                                cost += close[x]
+                            else:
+                                feasible = False
+                        if feasible and cost < best[0]:
+                            best[0] = cost
+                            best[1] = path + [x]
+                        feasible = False
+                    else:
+                        for p in range(offsets[u], offsets[u+1]):
+                            y = targets[p]
+                            if y != x and (not visited[y] or (tour and y == s)):
+                                if avail[y] < need[y]:
+                                    feasible = False
+                                    break
+                        if feasible:
+                            feasible = self.hamiltonian_reachable(
+                                x, len(path) + 1, offsets, targets, visited)
+                    if feasible:
+                        path.append(x)
+                        path_cost.append(cost)
+                        stack.append(iter(self.hamiltonian_candidates(
+                            x, offsets, targets, weights, visited, avail)))
+                        extended = True
+                        break
+                    # undo extension
+                    visited[x] = 0
+                    remaining += min_in[x]
+                    if keep:
+                        for p in range(offsets[u], offsets[u+1]):
+                            avail[targets[p]] += 1
+                if extended:
+                    continue
+                stack.pop()
+                if len(path) > 1:
+                    x = path.pop()
+                    path_cost.pop()
+                    u = path[-1]
+                    visited[x] = 0
+                    remaining += min_in[x]
+                    if not (undirected and tour and u == s):
+                        for p in range(offsets[u], offsets[u+1]):
+                            avail[targets[p]] += 1
+            if timed_out:
+                break
+        if best[1] is None:
+            return None, None, not timed_out
+        return [names[v] for v in best[1]], best[0], not timed_out
+
+    def hamiltonian_candidates(self, u, offsets, targets, weights, visited,
+                               avail):
+        '''
+        API: hamiltonian_candidates(self, u, offsets, targets, weights,
+                                    visited, avail)
+        Description:
+        Used by hamiltonian_branch_and_bound(). Returns (node, cost) list
+        of unvisited out-neighbors of u in the order they should be tried.
+        Should not be called by user directly.
+        '''
+        candidates = [(avail[targets[p]], weights[p], targets[p])
+                      for p in range(offsets[u], offsets[u+1])
+                      if not visited[targets[p]]]
+        candidates.sort()
+        return [(x, w) for (a, w, x) in candidates]
+
+    def hamiltonian_reachable(self, x, num_visited, offsets, targets,
+                              visited):
+        '''
+        API: hamiltonian_reachable(self, x, num_visited, offsets, targets,
+                                   visited)
+        Description:
+        Used by hamiltonian_branch_and_bound(). Returns True if all
+        unvisited nodes are reachable from x through unvisited nodes.
+        Should not be called by user directly.
+        '''
+        n = len(offsets) - 1
+        seen = set([x])
+        frontier = [x]
+        while frontier:
+            v = frontier.pop()
+            for w in targets[offsets[v]:offsets[v+1]]:
+                if not visited[w] and w not in seen:
+                    seen.add(w)
+                    frontier.append(w)
+        return len(seen) - 1 == n - num_visited
+
     def bfs(self, root, display = None, component = None):
         '''
         API: bfs(self, root, display = None, component=None)
@@ -944,47 +2210,201 @@ class Graph(object):
         self.search(root, display = display, component = component, q = Queue())
 
     def acyclic_shortest_path(G, source, destination = None):
-        dist = {}
-        pred = {}
-        order = []
-        found = False
-        G.dfs(source, topological_order = order)
-        for j in range(len(G.get_node_list())):
-            m = order[j]
-            if m == destination:
-                found = True
-                break
-            if len(G.get_in_neighbors(m)) == 0: 
-                dist[m] = 0
-            for n in G.get_out_neighbors(m):
-                estimate = dist[m] + G.get_edge_attr(m ,n, "cost")
-                if n not in dist or dist[n] > estimate:
-                    dist[n] = estimate
-                    pred[n] = m
-        if found:
-            path = [destination]
-            current = destination
-            while current != source:
-                path.insert(0, pred[current])
-                current = pred[current]
-            return path
-                
+        '''
+        API: acyclic_shortest_path(G, source, destination = None)
+        Description:
+        Finds shortest paths from source in a directed acyclic graph using
+        'cost' attribute of arcs. See dag_paths() for details.
+        Input:
+            source: Source node name.
+            destination: Destination node name.
+        Pre:
+            Graph should be a directed acyclic graph.
+        Return:
+            Returns list of nodes on the shortest path from source to
+            destination if destination is given and reachable from source.
+            Returns predecessor dictionary otherwise.
+        '''
+        distance, pred = G.dag_paths([source])[source]
+        if destination is not None and destination in distance:
+            return G.get_path(pred, source, destination)
         return pred
 
-    def search(self, source, destination = None, display = None,
-               component = None, q = None,
-               algo = 'DFS', reverse = False, **kargs):
+    def get_path(self, pred, source, destination):
         '''
-        API: search(self, source, destination = None, display = None,
-               component = None, q = Stack(),
-               algo = 'DFS', reverse = False, **kargs)
+        API: get_path(self, pred, source, destination)
         Description:
-        Generic search method. Changes behavior (dfs,bfs,dijkstra,prim)
-        according to algo argument.
-        if destination is not specified:
-           This method determines all nodes reachable from "source" ie. creates
-           precedence tree and returns it (dictionary).
-        if destionation is given:
+        Returns the path from source to destination in predecessor
+        dictionary pred as a list of node names.
+        Pre:
+            destination should be reachable from source in pred.
+        Return:
+            Returns list of node names, ie. [source,...,destination].
+        '''
+        path = [destination]
+        current = destination
+        while current != source:
+            current = pred[current]
+            path.append(current)
+        path.reverse()
+        return path
+
+    def topological_sort(self):
+        '''
+        API: topological_sort(self)
+        Description:
+        Returns nodes in topological order. Uses Kahn's algorithm on the CSR
+        representation of the graph, O(n+m). Does not change node
+        attributes.
+        Pre:
+            Graph should be a directed acyclic graph.
+        Return:
+            Returns list of node names in topological order. Raises an
+            exception if the graph has a cycle.
+        '''
+        names, index, offsets, targets, weights = self.to_csr()
+        return [names[v] for v in kahn_order(offsets, targets)]
+
+    def dag_paths(self, sources, attr = 'cost', longest = False,
+                  default = 0):
+        '''
+        API: dag_paths(self, sources, attr = 'cost', longest = False,
+                       default = 0)
+        Description:
+        Computes shortest (or longest) paths from each node in sources to
+        all nodes reachable from it in a directed acyclic graph. Topological
+        order (Kahn's algorithm) and the CSR representation of the graph
+        are computed once and shared by all sources. Each source is then
+        processed in O(n+m) by relaxing arcs in topological order, starting
+        from the position of the source. Does not change node attributes.
+        Input:
+            sources: List of source node names.
+            attr: Arc attribute that keeps arc lengths.
+            longest: Computes longest paths if True.
+            default: Length of arcs that do not have attr.
+        Pre:
+            Graph should be a directed acyclic graph.
+        Return:
+            Returns a dictionary. Keys are sources, values are
+            (distance, pred) tuples where distance is a dictionary of path
+            lengths of nodes reachable from the source and pred is the
+            predecessor dictionary (source is not a key). Use get_path() to
+            retrieve paths.
+        '''
+        names, index, offsets, targets, weights = self.to_csr(attr,
+                                                              default = default)
+        order = kahn_order(offsets, targets)
+        position = [0]*len(names)
+        for k, v in enumerate(order):
+            position[v] = k
+        result = {}
+        for source in sources:
+            s = index[source]
+            dist = {s:0}
+            pred = {}
+            for k in range(position[s], len(order)):
+                v = order[k]
+                if v not in dist:
+                    continue
+                d = dist[v]
+                for p in range(offsets[v], offsets[v+1]):
+                    w = targets[p]
+                    estimate = d + weights[p]
+                    if w not in dist:
+                        dist[w] = estimate
+                        pred[w] = v
+                    elif ((longest and estimate > dist[w]) or
+                          (not longest and estimate < dist[w])):
+                        dist[w] = estimate
+                        pred[w] = v
+            result[source] = (dict((names[v], dist[v]) for v in dist),
+                              dict((names[v], names[pred[v]]) for v in pred))
+        return result
+
+    def critical_path(self, duration = 'duration', lag = None,
+                      default_duration = 0):
+        '''
+        API: critical_path(self, duration = 'duration', lag = None,
+                           default_duration = 0)
+        Description:
+        Critical path method for project scheduling networks where nodes
+        are tasks and arc (i,j) means task i should be finished before task
+        j starts (e.g. the prerequisite map in examples/prerequisites.py).
+        Computes earliest and latest start times and slack of every task
+        with one forward and one backward pass over the topological order,
+        O(n+m). Does not change node attributes.
+        Input:
+            duration: Node attribute that keeps task durations.
+            lag: Arc attribute that keeps minimum time between finish of
+            tail task and start of head task. No lags if None.
+            default_duration: Duration of nodes that do not have duration
+            attribute.
+        Pre:
+            Graph should be a directed acyclic graph.
+        Return:
+            Returns a tuple (earliest, latest, slack, length, path).
+            earliest, latest and slack are dictionaries keyed by node names,
+            length is the project length and path is a critical path (a list
+            of tasks with zero slack).
+        '''
+        names, index, offsets, targets, lags = self.to_csr(lag, default = 0)
+        n = len(names)
+        if lags is None:
+            lags = [0]*len(targets)
+        order = kahn_order(offsets, targets)
+        nodes = self.nodes
+        dur = [nodes[name].attr.get(duration, default_duration)
+               for name in names]
+        es = [0]*n
+        for v in order:
+            finish = es[v] + dur[v]
+            for p in range(offsets[v], offsets[v+1]):
+                w = targets[p]
+                if finish + lags[p] > es[w]:
+                    es[w] = finish + lags[p]
+        length = max([es[v] + dur[v] for v in range(n)]) if n else 0
+        ls = [length - dur[v] for v in range(n)]
+        for v in reversed(order):
+            for p in range(offsets[v], offsets[v+1]):
+                w = targets[p]
+                start = ls[w] - lags[p] - dur[v]
+                if start < ls[v]:
+                    ls[v] = start
+        slack = [ls[v] - es[v] for v in range(n)]
+        path = []
+        current = None
+        for v in order:
+            if es[v] == 0 and abs(slack[v]) <= CPM_TOLERANCE:
+                current = v
+                break
+        while current is not None:
+            path.append(names[current])
+            finish = es[current] + dur[current]
+            nextn = None
+            for p in range(offsets[current], offsets[current+1]):
+                w = targets[p]
+                if (abs(slack[w]) <= CPM_TOLERANCE and
+                    abs(es[w] - finish - lags[p]) <= CPM_TOLERANCE):
+                    nextn = w
+                    break
+            current = nextn
+        return (dict(zip(names, es)), dict(zip(names, ls)),
+                dict(zip(names, slack)), length, path)
+
+    def search(self, source, destination = None, display = None,
+               component = None, q = None,
+               algo = 'DFS', reverse = False, store = 'attrs', **kargs):
+        '''
+        API: search(self, source, destination = None, display = None,
+               component = None, q = Stack(),
+               algo = 'DFS', reverse = False, store = 'attrs', **kargs)
+        Description:
+        Generic search method. Changes behavior (dfs,bfs,dijkstra,prim)
+        according to algo argument.
+        if destination is not specified:
+           This method determines all nodes reachable from "source" ie. creates
+           precedence tree and returns it (dictionary).
+        if destionation is given:
            If there exists a path from "source" to "destination" it will return
            list of the nodes is this path. If there is no such path, it will
            return the precedence tree constructed from source (dictionary).
@@ -998,18 +2418,34 @@ class Graph(object):
             algo: Algortihm that specifies search. Available algortihms are
             'DFS', 'BFS', 'Dijkstra' and 'Prim'.
             reverse: Search goes in reverse arc directions if True.
+            store: 'attrs' writes results to node attributes, 'result'
+            returns a SearchResult and does not change the graph.
             kargs: Additional keyword arguments.
         Post:
             Nodes will have 'component' attribute that will have component
             number as value (if component argument provided). Color attribute
-            of nodes and edges may change.
+            of nodes and edges may change. Nothing changes if store is
+            'result'.
         Return:
             Returns predecessor tree in dictionary form if destination is
             not specified, returns list of node names in the path from source
             to destionation if destionation is specified and there is a path.
             If there is no path returns predecessor tree in dictionary form.
-            See description section.
-        '''
+            See description section. Returns a SearchResult if store is
+            'result'. Dijkstra results are cached if caching is enabled
+            (see enable_cache()).
+        '''
+        if store == 'result':
+            compute = lambda: self.search_result(source, destination,
+                                                 component, q, algo, reverse)
+            if algo == 'Dijkstra' and q is None and not kargs:
+                # shortest path trees only change with the graph
+                return self.cached('search',
+                                   (source, destination, component, reverse),
+                                   compute, attrs = True)
+            return compute()
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
         if display == None:
             display = self.attr['display']
         else:
@@ -1092,6 +2528,119 @@ class Graph(object):
         else:
             return None
 
+    def search_result(self, source, destination, component, q, algo,
+                      reverse):
+        '''
+        API: search_result(self, source, destination, component, q, algo,
+                           reverse)
+        Description:
+        Used by search() method if store is 'result'. Makes the same search
+        as search() (same order of nodes and edges, same queue operations)
+        but keeps distances, components and processed nodes in local
+        dictionaries instead of node attributes and does not display.
+        Should not be called by user directly.
+        Return:
+            Returns a SearchResult.
+        '''
+        if algo == 'DFS':
+            if q is None:
+                q = Stack()
+        elif algo == 'BFS' or algo == 'UnweightedSPT':
+            if q is None:
+                q = Queue()
+        elif algo in ['Dijkstra', 'Prim']:
+            if q is None:
+                q = PriorityQueue()
+        else:
+            print("Unknown search algorithm...exiting")
+            return
+        neighbors = self.neighbors
+        if self.graph_type == DIRECTED_GRAPH and reverse:
+            neighbors = self.in_neighbors
+        edge_attr = self.edge_attr
+        directed = self.graph_type is DIRECTED_GRAPH
+        priority_queue = isinstance(q, PriorityQueue)
+        pred = {}
+        distance = {}
+        # priorities of processed nodes, distances of Dijkstra and Prim
+        priority = {}
+        components = {}
+        done = set()
+        if algo in ['Dijkstra', 'Prim']:
+            q.push(source, 0)
+        else:
+            distance[source] = 0
+            if priority_queue:
+                q.push(source, 0)
+            else:
+                q.push(source)
+            if component is not None:
+                components[source] = component
+        found = source == destination
+        while not q.isEmpty() and not found:
+            current = q.peek()
+            if current in done:
+                q.remove(current)
+                continue
+            if priority_queue:
+                priority[current] = q.get_priority(current)
+            if current == destination:
+                found = True
+                break
+            for n in neighbors[current]:
+                if n in done:
+                    continue
+                if algo in ['Dijkstra', 'Prim']:
+                    e = (n, current) if directed and reverse else (current, n)
+                    if not directed and e not in edge_attr:
+                        e = (n, current)
+                    cost = edge_attr[e]['cost']
+                    if algo == 'Dijkstra':
+                        cost += q.get_priority(current)
+                    if n not in pred or cost < q.get_priority(n):
+                        pred[n] = current
+                        q.push(n, cost)
+                    continue
+                if priority_queue:
+                    current_priority = q.get_priority(n)
+                    if algo == 'DFS':
+                        new_priority = -distance[current] - 1
+                    else:
+                        new_priority = distance[current] + 1
+                    if (current_priority is not None and
+                        new_priority >= current_priority):
+                        continue
+                    q.push(n, new_priority)
+                    if algo != 'DFS':
+                        distance[n] = new_priority
+                else:
+                    if algo != 'DFS' and n in distance:
+                        continue
+                    distance[n] = distance[current] + 1
+                    q.push(n)
+                pred[n] = current
+                if component is not None:
+                    components[n] = component
+            q.remove(current)
+            done.add(current)
+        path = None
+        if found:
+            path = [destination]
+            current = destination
+            while current != source:
+                path.insert(0, pred[current])
+                current = pred[current]
+            pred = {}
+            for k in range(1, len(path)):
+                pred[path[k]] = path[k-1]
+        elif destination is not None:
+            pred = None
+        if algo in ['Dijkstra', 'Prim']:
+            distance = priority
+        if component is None:
+            components = None
+        return SearchResult(pred, path, distance, components)
+
     def process_node_search(self, node, q, **kwargs):
         '''
         API: process_node_search(self, node, q, **kwargs)
@@ -1300,11 +2849,14 @@ class Graph(object):
                                            components = None)
         Description:
         Determines a minimum spanning tree using Kruskal's Algorithm.
+        If display is 'off' and components is not given, the headless
+        kernel mst_kruskal() is used and nothing is colored.
         Input:
             display: Display method.
             component: component number.
         Post:
-            'color' attribute of nodes and edges may change.
+            'color' attribute of nodes and edges may change unless display
+            is 'off'.
         Return:
             Returns list of edges where edges are tuples in (source,sink)
             format.
@@ -1313,6 +2865,8 @@ class Graph(object):
             display = self.attr['display']
         else:
             self.set_display_mode(display)
+        if display == 'off' and components is None:
+            return self.mst_kruskal()[0]
         if components is None:
             components = DisjointSet(display = display, layout = 'dot',
                                      optimize = False)
@@ -1336,6 +2890,197 @@ class Graph(object):
             components.display()
         return edges
 
+    def minimum_spanning_forest(self, algo = 'Kruskal', source = None,
+                                attr = 'cost', workers = 1):
+        '''
+        API: minimum_spanning_forest(self, algo = 'Kruskal', source = None,
+                                     attr = 'cost', workers = 1)
+        Description:
+        Headless minimum spanning tree/forest computation. Unlike
+        minimum_spanning_tree_kruskal() and minimum_spanning_tree_prim(),
+        this method does not display anything and does not change node or
+        edge attributes.
+        Input:
+            algo: 'Kruskal', 'Prim' or 'Boruvka'.
+            source: Valid if algo is 'Prim'. Only the tree of the component
+            that contains source is computed if given.
+            attr: Edge attribute that keeps edge weights.
+            workers: Valid if algo is 'Boruvka'. Number of processes that
+            scan edges for the minimum edge of each component.
+        Return:
+            Returns a tuple (edges, weight) where edges is a list of edges in
+            (source,sink) format and weight is their total weight.
+        '''
+        if algo == 'Kruskal':
+            return self.mst_kruskal(attr)
+        elif algo == 'Prim':
+            return self.mst_prim(source, attr)
+        elif algo == 'Boruvka':
+            return self.mst_boruvka(attr, workers)
+        else:
+            raise Exception('Unknown minimum spanning tree algorithm %s'
+                            %str(algo))
+
+    def mst_kruskal(self, attr = 'cost'):
+        '''
+        API: mst_kruskal(self, attr = 'cost')
+        Description:
+        Kruskal kernel used by minimum_spanning_forest(). Edge weights are
+        collected in an array and sorted once (with numpy.argsort if NumPy
+        is installed). Components are kept in an array based union-find
+        structure with path halving and union by rank. Arcs of a directed
+        graph are treated as undirected edges.
+        Input:
+            attr: Edge attribute that keeps edge weights.
+        Return:
+            Returns a tuple (edges, weight). Edges are in nondecreasing
+            weight order.
+        '''
+        names, index, edges, tails, heads, costs = self.get_edge_arrays(attr)
+        parent = list(range(len(names)))
+        rank = [0]*len(names)
+        limit = len(names) - 1
+        tree = []
+        weight = 0
+        for k in sort_edge_order(costs):
+            if len(tree) >= limit:
+                break
+            if union_roots(parent, rank, tails[k], heads[k]):
+                tree.append(edges[k])
+                weight += costs[k]
+        return tree, weight
+
+    def mst_prim(self, source = None, attr = 'cost', d = 4):
+        '''
+        API: mst_prim(self, source = None, attr = 'cost', d = 4)
+        Description:
+        Prim kernel used by minimum_spanning_forest(). Works on the CSR
+        representation of the graph (see to_csr()) and keeps tentative
+        edge weights in an indexed d-ary heap with decrease-key, so every
+        node is in the heap at most once.
+        Input:
+            source: Tree is grown from source. A spanning forest of all
+            components is computed if source is None.
+            attr: Edge attribute that keeps edge weights.
+            d: Arity of the heap.
+        Pre:
+            self.graph_type should be UNDIRECTED_GRAPH.
+        Return:
+            Returns a tuple (edges, weight).
+        '''
+        if self.graph_type == DIRECTED_GRAPH:
+            raise Exception("mst_prim only works for undirected graphs")
+        names, index, offsets, targets, weights = self.to_csr(attr)
+        n = len(names)
+        heap = IndexedHeap(n, d)
+        in_tree = [False]*n
+        pred = [-1]*n
+        if source is None:
+            roots = range(n)
+        else:
+            roots = [index[source]]
+        tree = []
+        weight = 0
+        for r in roots:
+            if in_tree[r]:
+                continue
+            heap.push(r, 0)
+            while len(heap):
+                u, key = heap.pop()
+                in_tree[u] = True
+                if pred[u] >= 0:
+                    e = (names[pred[u]], names[u])
+                    if e not in self.edge_attr:
+                        e = (e[1], e[0])
+                    tree.append(e)
+                    weight += key
+                for p in range(offsets[u], offsets[u+1]):
+                    v = targets[p]
+                    if in_tree[v]:
+                        continue
+                    if v not in heap:
+                        heap.push(v, weights[p])
+                        pred[v] = u
+                    elif weights[p] < heap.get_priority(v):
+                        heap.decrease_key(v, weights[p])
+                        pred[v] = u
+        return tree, weight
+
+    def mst_boruvka(self, attr = 'cost', workers = 1):
+        '''
+        API: mst_boruvka(self, attr = 'cost', workers = 1)
+        Description:
+        Boruvka kernel used by minimum_spanning_forest(). In every round
+        each component selects its minimum weight incident edge and all
+        selected edges are merged, so there are at most log(n) rounds.
+        Edges are numbered in sorted order so that ties are broken
+        consistently. The per-component minimum edge scan is vectorized
+        with NumPy when workers is 1 and NumPy is installed. When workers
+        is greater than 1, edges are split into chunks that are scanned by
+        a process pool.
+        Input:
+            attr: Edge attribute that keeps edge weights.
+            workers: Number of processes used for the scan.
+        Return:
+            Returns a tuple (edges, weight).
+        '''
+        names, index, edges, tails, heads, costs = self.get_edge_arrays(attr)
+        n = len(names)
+        m = len(edges)
+        order = sort_edge_order(costs)
+        tails = [tails[k] for k in order]
+        heads = [heads[k] for k in order]
+        parent = list(range(n))
+        rank = [0]*n
+        chosen = []
+        pool = None
+        if workers > 1:
+            pool = KernelPool({'tails':tails, 'heads':heads}, workers)
+            step = m//workers + 1
+        elif NUMPY_INSTALLED:
+            active = numpy.arange(m)
+            tails_a = numpy.asarray(tails, dtype = numpy.int64)
+            heads_a = numpy.asarray(heads, dtype = numpy.int64)
+        try:
+            while True:
+                comp = [find_root(parent, i) for i in range(n)]
+                if pool is not None:
+                    scans = pool.map(boruvka_scan,
+                                     [(comp, lo, min(lo+step, m))
+                                      for lo in range(0, m, step)])
+                    best = {}
+                    for s in scans:
+                        for c in s:
+                            if c not in best or s[c] < best[c]:
+                                best[c] = s[c]
+                    selected = sorted(set(best.values()))
+                elif NUMPY_INSTALLED:
+                    comp_a = numpy.asarray(comp, dtype = numpy.int64)
+                    cu = comp_a[tails_a[active]]
+                    cv = comp_a[heads_a[active]]
+                    keep = cu != cv
+                    active, cu, cv = active[keep], cu[keep], cv[keep]
+                    best = numpy.full(n, m, dtype = numpy.int64)
+                    numpy.minimum.at(best, cu, active)
+                    numpy.minimum.at(best, cv, active)
+                    selected = numpy.unique(best[best < m]).tolist()
+                else:
+                    best = boruvka_scan((comp, 0, m),
+                                        {'tails':tails, 'heads':heads})
+                    selected = sorted(set(best.values()))
+                if not selected:
+                    break
+                for k in selected:
+                    if union_roots(parent, rank, tails[k], heads[k]):
+                        chosen.append(k)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        chosen.sort()
+        tree = [edges[order[k]] for k in chosen]
+        weight = sum(costs[order[k]] for k in chosen)
+        return tree, weight
+
     def max_flow_preflowpush(self, source, sink, algo = 'FIFO', display = None):
         '''
         API: max_flow_preflowpush(self, source, sink, algo = 'FIFO',
@@ -1352,56 +3097,99 @@ class Graph(object):
             sink: Sink node name.
             algo: Algorithm choice, 'FIFO', 'SAP' or 'HighestLabel'.
             display: display method.
+        Post:
+            The 'flow' attribute of each arc gives a maximum flow. The
+            problem is kept for reoptimize_max_flow().
+        '''
+        for step in self.max_flow_preflowpush_steps(source, sink, algo,
+                                                    display, None):
+            pass
+
+    def max_flow_preflowpush_steps(self, source, sink, algo = 'FIFO',
+                                   display = None, every = 1, resume = False):
+        '''
+        API: max_flow_preflowpush_steps(self, source, sink, algo = 'FIFO',
+                                        display = None, every = 1,
+                                        resume = False)
+        Description:
+        Generator form of max_flow_preflowpush(). Runs the same algorithm
+        and yields a SolverStep after every 'every' pushes. The objective of
+        a step is the flow that has reached the sink. The last step is
+        yielded when the algorithm finishes.
+        Input:
+            source, sink, algo, display: See max_flow_preflowpush().
+            every: Number of pushes between steps. Only the last step is
+            yielded if None.
+            resume: Starts from the current 'flow' attribute of arcs instead
+            of the zero flow if True, see preflowpush_resume(). 'labels'
+            also keeps 'distance' and 'excess' of nodes from the last run,
+            which is valid only if capacities of arcs leaving source did
+            not decrease since then (see parametric_max_flow()).
+        Pre:
+            See max_flow_preflowpush().
         Post:
             The 'flow' attribute of each arc gives a maximum flow.
+        Return:
+            Yields SolverStep instances, state has the arc ('from', 'to') of
+            the last push.
         '''
         if display == None:
             display = self.attr['display']
         else:
             self.set_display_mode(display)
         nl = self.get_node_list()
-        # set excess of all nodes to 0
-        for n in nl:
-            self.set_node_attr(n, 'excess', 0)
-        # set flow of all edges to 0
-        for e in self.edge_attr:
-            self.edge_attr[e]['flow'] = 0
-            if 'capacity' in self.edge_attr[e]:
-                capacity = self.edge_attr[e]['capacity']
-                self.edge_attr[e]['label'] = str(capacity)+'/0'
-            else:
-                self.edge_attr[e]['capacity'] = INF
-                self.edge_attr[e]['label'] = 'INF/0'
-        self.display()
-        self.set_display_mode('off')
-        self.search(sink, algo = 'UnweightedSPT', reverse = True)
-        self.set_display_mode(display)
-        disconnect = False
-        for n in nl:
-            if self.get_node_attr(n, 'distance') is None:
-                disconnect = True
-                self.set_node_attr(n, 'distance',
-                                   2*len(nl) + 1)
-        if disconnect:
-            print('Warning: graph contains nodes not connected to the sink...')
         if algo == 'FIFO':
             q = Queue()
         elif algo == 'SAP':
             q = Stack()
         elif algo == 'HighestLabel':
             q = PriorityQueue()
-        for n in self.get_neighbors(source):
-            capacity = self.get_edge_attr(source, n, 'capacity')
-            self.set_edge_attr(source, n, 'flow', capacity)
-            self.set_node_attr(n, 'excess', capacity)
-            excess = self.get_node_attr(source, 'excess')
-            self.set_node_attr(source, 'excess', excess - capacity)
-            if algo == 'FIFO' or algo == 'SAP':
-                q.push(n)
-            elif algo == 'HighestLabel':
-                q.push(n, -1)
+        if resume:
+            queued = self.preflowpush_resume(source, sink, algo, q,
+                                             resume == 'labels')
+        else:
+            # set excess of all nodes to 0
+            for n in nl:
+                self.set_node_attr(n, 'excess', 0)
+            # set flow of all edges to 0
+            for e in self.edge_attr:
+                self.edge_attr[e]['flow'] = 0
+                if 'capacity' in self.edge_attr[e]:
+                    capacity = self.edge_attr[e]['capacity']
+                    self.edge_attr[e]['label'] = str(capacity)+'/0'
+                else:
+                    self.edge_attr[e]['capacity'] = INF
+                    self.edge_attr[e]['label'] = 'INF/0'
+            self.display()
+            self.set_display_mode('off')
+            self.search(sink, algo = 'UnweightedSPT', reverse = True)
+            self.set_display_mode(display)
+            disconnect = False
+            for n in nl:
+                if self.get_node_attr(n, 'distance') is None:
+                    disconnect = True
+                    self.set_node_attr(n, 'distance',
+                                       2*len(nl) + 1)
+            if disconnect:
+                print('Warning: graph contains nodes not connected to the '
+                      'sink...')
+            for n in self.get_neighbors(source):
+                capacity = self.get_edge_attr(source, n, 'capacity')
+                self.set_edge_attr(source, n, 'flow', capacity)
+                self.set_node_attr(n, 'excess', capacity)
+                excess = self.get_node_attr(source, 'excess')
+                self.set_node_attr(source, 'excess', excess - capacity)
+                if algo == 'FIFO' or algo == 'SAP':
+                    q.push(n)
+                elif algo == 'HighestLabel':
+                    q.push(n, -1)
+            queued = set(self.get_neighbors(source))
         self.set_node_attr(source, 'distance', len(nl))
-        self.show_flow()
+        # labels and colors are only set once at the end if display is off
+        redraw = display != 'off'
+        if redraw:
+            self.show_flow()
+        pushes = 0
         while not q.isEmpty():
             relabel = True
             current = q.peek()
@@ -1411,14 +3199,22 @@ class Graph(object):
                 pushed = self.process_edge_flow(source, sink, current, n, algo,
                                                 q)
                 if pushed:
-                    self.show_flow()
+                    if redraw:
+                        self.show_flow()
+                    pushes += 1
+                    if every and pushes % every == 0:
+                        yield SolverStep(pushes,
+                                         self.get_node_attr(sink, 'excess'),
+                                         False, True,
+                                         {'from':current, 'to':n})
                     if algo == 'FIFO':
                         '''With FIFO, we need to add the neighbors to the queue
                         before the current is added back in or the nodes will
                         be out of order
                         '''
-                        if q.peek(n) is None and n != source and n != sink:
+                        if n not in queued and n != source and n != sink:
                             q.push(n)
+                            queued.add(n)
                         '''Keep pushing while there is excess'''
                         if self.get_node_attr(current, 'excess') > 0:
                             continue
@@ -1428,21 +3224,107 @@ class Graph(object):
                     relabel = False
                     break
             q.remove(current)
+            queued.discard(current)
             if current != sink:
                 if relabel:
                     self.relabel(current)
-                    self.show_flow()
+                    if redraw:
+                        self.show_flow()
                 if self.get_node_attr(current, 'excess') > 0:
                     if algo == 'FIFO' or algo == 'SAP':
                         q.push(current)
                     elif algo == 'HighestLabel':
                         q.push(current, -self.get_node_attr(current,
                                                             'distance'))
-            if pushed and q.peek(n) is None and n != source:
+                    queued.add(current)
+            if (pushed and n not in queued and n != source and
+                algo != 'FIFO'):
                 if algo == 'SAP':
                     q.push(n)
                 elif algo == 'HighestLabel':
                     q.push(n, -self.get_node_attr(n, 'distance'))
+                queued.add(n)
+        if not redraw:
+            self.show_flow()
+        self.max_flow_state = (source, sink, algo, self.structure_version)
+        yield SolverStep(pushes, self.get_node_attr(sink, 'excess'), True)
+
+    def preflowpush_resume(self, source, sink, algo, q, labels = False):
+        '''
+        API: preflowpush_resume(self, source, sink, algo, q, labels = False)
+        Description:
+        Used by max_flow_preflowpush_steps() to start from the current flow
+        of arcs. Saturates the residual arcs leaving source, sets 'excess'
+        of nodes and sets 'distance' labels to distances to sink in the
+        residual graph (distances to source plus number of nodes for the
+        nodes that can not reach sink). Nodes with excess are pushed to q,
+        the set of them is returned. If labels is True 'excess' and
+        'distance' of the last run are kept and only arcs (source, n) with
+        'distance' of n less than the number of nodes are saturated, as in
+        the parametric algorithm of Gallo, Grigoriadis and Tarjan. Should
+        not be called by user directly.
+        Pre:
+            'flow' attribute of arcs is a feasible flow (a preflow left by
+            the last run if labels is True).
+        '''
+        nl = self.get_node_list()
+        edge_attr = self.edge_attr
+        if labels:
+            # nodes that can not reach sink keep their residual source arcs
+            for n in self.neighbors[source]:
+                if self.nodes[n].attr['distance'] >= len(nl):
+                    continue
+                attr = edge_attr[(source, n)]
+                amount = attr['capacity'] - attr['flow']
+                attr['flow'] = attr['capacity']
+                self.nodes[n].attr['excess'] += amount
+                self.nodes[source].attr['excess'] -= amount
+        else:
+            excess = dict.fromkeys(nl, 0)
+            for (i, j), attr in edge_attr.items():
+                excess[i] -= attr['flow']
+                excess[j] += attr['flow']
+            for n in self.neighbors[source]:
+                attr = edge_attr[(source, n)]
+                excess[n] += attr['capacity'] - attr['flow']
+                excess[source] -= attr['capacity'] - attr['flow']
+                attr['flow'] = attr['capacity']
+            for n in self.in_neighbors[source]:
+                attr = edge_attr[(n, source)]
+                excess[n] += attr['flow']
+                excess[source] -= attr['flow']
+                attr['flow'] = 0
+            # reverse breadth first search on residual arcs, sink first
+            distance = {}
+            for root, label in ((sink, 0), (source, len(nl))):
+                distance[root] = label
+                bfs = [root]
+                for current in bfs:
+                    for m in self.in_neighbors[current]:
+                        attr = edge_attr[(m, current)]
+                        if (m not in distance and
+                            attr['flow'] < attr['capacity']):
+                            distance[m] = distance[current] + 1
+                            bfs.append(m)
+                    for m in self.neighbors[current]:
+                        attr = edge_attr[(current, m)]
+                        if m not in distance and attr['flow'] > 0:
+                            distance[m] = distance[current] + 1
+                            bfs.append(m)
+            for n in nl:
+                self.set_node_attr(n, 'excess', excess[n])
+                self.set_node_attr(n, 'distance',
+                                   distance.get(n, 2*len(nl) + 1))
+        queued = set()
+        for n in nl:
+            if (self.get_node_attr(n, 'excess') > 0 and n != source and
+                n != sink):
+                if algo == 'FIFO' or algo == 'SAP':
+                    q.push(n)
+                elif algo == 'HighestLabel':
+                    q.push(n, -self.get_node_attr(n, 'distance'))
+                queued.add(n)
+        return queued
 
     def process_edge_flow(self, source, sink, i, j, algo, q):
         '''
@@ -1577,31 +3459,66 @@ class Graph(object):
             (2) Nodes should have 'demand' attribute, this value should be
             positive if the node is a supply node, negative if it is demand
             node and 0 if it is transhipment node.
-            (3) graph should not have node 's' and 't'.
         Post:
             Changes 'flow' attributes of arcs.
         Return:
             Returns True when an optimal solution is found, returns False
             otherwise.
         '''
+        for step in self.cycle_canceling_steps(display, None):
+            pass
+        return step.feasible
+
+    def cycle_canceling_steps(self, display, every = 1):
+        '''
+        API:
+            cycle_canceling_steps(self, display, every = 1)
+        Description:
+            Generator form of cycle_canceling(). Runs the same algorithm and
+            yields a SolverStep after every 'every' canceled cycles. Steps of
+            the search for an initial feasible flow are yielded first, see
+            find_feasible_flow_steps(). The last step is yielded when the
+            algorithm finishes, its feasible attribute is the return value
+            of cycle_canceling().
+        Input:
+            display: Display method.
+            every: Number of canceled cycles (pushes while searching for a
+            feasible flow) between steps. Only the last step is yielded if
+            None.
+        Pre:
+            See cycle_canceling().
+        Post:
+            Changes 'flow' attributes of arcs.
+        Return:
+            Yields SolverStep instances, state has the last canceled 'cycle'
+            and the 'amount' of flow augmented along it (see
+            find_feasible_flow_steps() for the first steps).
+        '''
         # find a feasible solution to flow problem
-        if not self.find_feasible_flow():
-            return False
-        # create residual graph
-        residual_g = self.create_residual_graph()
+        for step in self.find_feasible_flow_steps(every):
+            if not step.done:
+                yield step
+        if not step.feasible:
+            yield SolverStep(0, None, True, False)
+            return
+        # residual graph view, it follows the flow changes
+        residual_g = self.residual_view()
         # identify a negative cycle in residual graph
         ncycle = residual_g.get_negative_cycle()
+        canceled = 0
         # loop while residual graph has a negative cycle
         while ncycle is not None:
             # find capacity of cycle
             cap = residual_g.find_cycle_capacity(ncycle)
             # augment capacity amount along the cycle
             self.augment_cycle(cap, ncycle)
-            # create residual graph
-            residual_g = self.create_residual_graph()
+            canceled += 1
+            if every and canceled % every == 0:
+                yield SolverStep(canceled, self.get_flow_cost(), False, True,
+                                 {'cycle':ncycle, 'amount':cap})
             # identify next negative cycle
             ncycle = residual_g.get_negative_cycle()
-        return True
+        yield SolverStep(canceled, self.get_flow_cost(), True)
 
     def find_feasible_flow(self):
         '''
@@ -1610,10 +3527,10 @@ class Graph(object):
         Description:
             Solves feasible flow problem, stores solution in 'flow' attribute
             or arcs. This method is used to get an initial feasible flow for
-            simplex and cycle canceling algorithms. Uses max_flow() method.
-            Other max flow methods can also be used. Returns True if a feasible
-            flow is found, returns False, if the problem is infeasible. When
-            the problem is infeasible 'flow' attributes of arcs should be
+            simplex and cycle canceling algorithms. Uses
+            find_feasible_flow_steps(). Returns True if a feasible flow is
+            found, returns False, if the problem is infeasible. When the
+            problem is infeasible 'flow' attributes of arcs should be
             considered as junk.
         Pre:
             (1) 'capacity' attribute of arcs
@@ -1624,32 +3541,63 @@ class Graph(object):
             Returns True if a feasible flow is found, returns False, if the
             problem is infeasible
         '''
-        # establish a feasible flow in the network, to do this add nodes s and
-        # t and solve a max flow problem.
+        for step in self.find_feasible_flow_steps(None):
+            pass
+        return step.feasible
+
+    def find_feasible_flow_steps(self, every = 1):
+        '''
+        API:
+            find_feasible_flow_steps(self, every = 1)
+        Description:
+            Generator form of find_feasible_flow(). Adds a source s with
+            arcs to supply nodes and a sink t with arcs from demand nodes to
+            an overlay of the graph and solves the max flow problem from s
+            to t with max_flow_preflowpush_steps(), yielding its steps. The
+            problem is feasible if the max flow saturates all arcs leaving
+            s. The last step is yielded when the max flow is found, its
+            feasible attribute is the return value of find_feasible_flow().
+        Input:
+            every: Number of pushes between steps. Only the last step is
+            yielded if None.
+        Pre:
+            See find_feasible_flow().
+        Post:
+            Keeps solution in 'flow' attribute of arcs.
+        Return:
+            Yields SolverStep instances, objective is None and state has
+            the arc ('from', 'to') of the last push.
+        '''
+        # s and t are added to an overlay, so nothing is removed from the
+        # graph afterwards.
+        overlay = self.overlay()
+        s = overlay.unused_name('s')
+        overlay.add_node(s)
+        t = overlay.unused_name('t')
+        overlay.add_node(t)
         nl = self.get_node_list()
         for i in nl:
             b_i = self.get_node(i).get_attr('demand')
             if b_i > 0:
                 # i is a supply node, add (s,i) arc
-                self.add_edge('s', i, capacity=b_i)
+                overlay.add_edge(s, i, capacity=b_i)
             elif b_i < 0:
                 # i is a demand node, add (i,t) arc
-                self.add_edge(i, 't', capacity=-1*b_i)
-        # solve max flow on this modified graph
-        self.max_flow('s', 't', 'off')
+                overlay.add_edge(i, t, capacity=-1*b_i)
+        for step in overlay.max_flow_preflowpush_steps(s, t, 'FIFO', 'off',
+                                                       every):
+            if not step.done:
+                yield SolverStep(step.iteration, None, False, True,
+                                 step.state)
         # check if all demand is satisfied, i.e. the min cost problem is
         # feasible or not
-        for i in self.neighbors['s']:
-            flow = self.get_edge_attr('s', i, 'flow')
-            capacity = self.get_edge_attr('s', i, 'capacity')
+        feasible = True
+        for i in overlay.neighbors[s]:
+            flow = overlay.get_edge_attr(s, i, 'flow')
+            capacity = overlay.get_edge_attr(s, i, 'capacity')
             if flow != capacity:
-                self.del_node('s')
-                self.del_node('t')
-                return False
-        # remove node 's' and node 't'
-        self.del_node('s')
-        self.del_node('t')
-        return True
+                feasible = False
+        yield SolverStep(step.iteration, None, True, feasible)
 
     def get_layout(self):
         '''
@@ -1877,9 +3825,11 @@ After installation, ensure that the PATH variable is properly set.''')
         '''
         self.attr['display'] = value
 
-    def max_flow(self, source, sink, display = None, algo = 'DFS'):
+    def max_flow(self, source, sink, display = None, algo = 'DFS',
+                 store = 'attrs'):
         '''
-        API: max_flow(self, source, sink, display=None)
+        API: max_flow(self, source, sink, display=None, algo = 'DFS',
+                      store = 'attrs')
         Description:
         Finds maximum flow from source to sink by a depth-first search based
         augmenting path algorithm.
@@ -1891,13 +3841,26 @@ After installation, ensure that the PATH variable is properly set.''')
             source: Source node name.
             sink: Sink node name.
             display: Display mode.
+            algo: Search algorithm for augmenting paths, 'DFS' or 'BFS'.
+            store: 'attrs' writes results to arc attributes, 'result'
+            returns a FlowResult and does not change the graph.
         Post:
-            The 'flow" attribute of each arc gives a maximum flow.
-        '''
+            The 'flow" attribute of each arc gives a maximum flow. The
+            problem is kept for reoptimize_max_flow(). Nothing changes if
+            store is 'result'.
+        Return:
+            Returns a FlowResult if store is 'result'.
+        '''
+        if store == 'result':
+            flow = self.max_flow_result(source, sink, algo)
+            value = (sum(flow[(source, m)] for m in self.neighbors[source]) -
+                     sum(flow[(m, source)] for m in self.in_neighbors[source]))
+            return FlowResult(flow, value)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
         if display is not None:
             old_display =  self.attr['display']
             self.attr['display'] = display
-        nl = self.get_node_list()
         # set flow of all edges to 0
         for e in self.edge_attr:
             self.edge_attr[e]['flow'] = 0
@@ -1907,6 +3870,74 @@ After installation, ensure that the PATH variable is properly set.''')
             else:
                 self.edge_attr[e]['capacity'] = INF
                 self.edge_attr[e]['label'] = 'INF/0'
+        self.max_flow_augment(source, sink, algo)
+        self.max_flow_state = (source, sink, algo, self.structure_version)
+        if display is not None:
+            self.attr['display'] = old_display
+
+    def max_flow_result(self, source, sink, algo):
+        '''
+        API: max_flow_result(self, source, sink, algo)
+        Description:
+        Used by max_flow() method if store is 'result'. Augments flow along
+        the same paths as max_flow_augment() but keeps flows in a local
+        dictionary instead of arc attributes and does not display. Should
+        not be called by user directly.
+        Return:
+            Returns dictionary of arc flows.
+        '''
+        capacity = dict((e, a.get('capacity', INF))
+                        for (e, a) in self.edge_attr.items())
+        flow = dict.fromkeys(capacity, 0)
+        while True:
+            if algo == 'DFS':
+                q = Stack()
+            elif algo == 'BFS':
+                q = Queue()
+            q.push(source)
+            pred = {source:None}
+            while not q.isEmpty():
+                current = q.peek()
+                q.remove(current)
+                if current == sink:
+                    break
+                for m in self.neighbors[current]+self.in_neighbors[current]:
+                    if m in pred:
+                        continue
+                    if (current, m) in capacity:
+                        available_capacity = (capacity[(current, m)] -
+                                              flow[(current, m)])
+                    else:
+                        available_capacity = flow[(m, current)]
+                    if available_capacity > 0:
+                        pred[m] = current
+                        q.push(m)
+            if sink not in pred:
+                return flow
+            path = []
+            current = sink
+            while current != source:
+                m = pred[current]
+                if (m, current) in capacity:
+                    path.append(((m, current), 1))
+                else:
+                    path.append(((current, m), -1))
+                current = m
+            min_capacity = min(capacity[e] - flow[e] if sign > 0 else flow[e]
+                               for (e, sign) in path)
+            for (e, sign) in path:
+                flow[e] += sign*min_capacity
+
+    def max_flow_augment(self, source, sink, algo):
+        '''
+        API: max_flow_augment(self, source, sink, algo)
+        Description:
+        Used by max_flow() and reoptimize_max_flow(). Augments flow along
+        paths found by algo until no augmenting path exists, starts from
+        the current 'flow' attribute of arcs. Should not be called by user
+        directly.
+        '''
+        nl = self.get_node_list()
         while True:
             # find an augmenting path from source to sink using DFS
             if algo == 'DFS':
@@ -2039,31 +4070,435 @@ After installation, ensure that the PATH variable is properly set.''')
                 if m == source:
                     break
                 current = m
-        if display is not None:
-            self.attr['display'] = old_display
-
-    def get_negative_cycle(self):
+    def min_cut(self, source, sink, display = None, algo = 'DFS'):
         '''
-        API:
-            get_negative_cycle(self)
+        API: min_cut(self, source, sink, display = None, algo = 'DFS')
         Description:
-            Finds and returns negative cost cycle using 'cost' attribute of
-            arcs. Return value is a list of nodes representing cycle it is in
-            the following form; n_1-n_2-...-n_k, when the cycle has k nodes.
+        Finds a minimum source-sink cut. Solves max flow problem with
+        max_flow() and returns nodes reachable from source in the residual
+        graph. The residual graph is a view (see residual_view()), it is
+        not built.
+        Input:
+            source: Source node name.
+            sink: Sink node name.
+            display: Display mode.
+            algo: Search algorithm of max_flow(), 'DFS' or 'BFS'.
         Pre:
-            Arcs should have 'cost' attribute.
+            See max_flow().
+        Post:
+            The 'flow' attribute of each arc gives a maximum flow.
         Return:
-            Returns a list of nodes in the cycle if a negative cycle exists,
-            returns None otherwise.
+            Returns a tuple (nodes, arcs, capacity) where nodes is the list of
+            nodes on the source side of the cut, arcs is the list of arcs
+            from source side to sink side and capacity is the capacity of the
+            cut (value of the maximum flow).
+        '''
+        self.max_flow(source, sink, display, algo)
+        reached = self.residual_reach(source)
+        arcs = [e for e in self.edge_attr
+                if e[0] in reached and e[1] not in reached]
+        capacity = sum(self.edge_attr[e]['capacity'] for e in arcs)
+        return [n for n in self.neighbors if n in reached], arcs, capacity
+
+    def residual_reach(self, source):
         '''
-        nl = self.get_node_list()
-        i = nl[0]
-        (valid, distance, nextn) = self.floyd_warshall()
-        if not valid:
-            cycle = self.floyd_warshall_get_cycle(distance, nextn)
-            return cycle
+        API: residual_reach(self, source)
+        Description:
+        Returns set of nodes reachable from source in the residual graph of
+        the 'flow' attribute of arcs (see residual_view()).
+        Input:
+            source: Source node name.
+        Return:
+            Returns a set of node names.
+        '''
+        residual = self.residual_view()
+        reached = set([source])
+        q = [source]
+        while q:
+            n = q.pop()
+            for m in residual.neighbors[n]:
+                if m not in reached:
+                    reached.add(m)
+                    q.append(m)
+        return reached
+
+    def update_capacities(self, capacities):
+        '''
+        API: update_capacities(self, capacities)
+        Description:
+        Sets 'capacity' attribute of arcs. Flows are not changed, arcs may
+        carry more flow than their new capacity until reoptimize_max_flow()
+        is called.
+        Input:
+            capacities: Dictionary of new capacities keyed by arcs (i, j).
+        Post:
+            'capacity' attribute of arcs are updated.
+        '''
+        for e, capacity in capacities.items():
+            if e not in self.edge_attr:
+                raise Exception('Edge %s does not exists!' %str(e))
+            self.set_edge_attr(e[0], e[1], 'capacity', capacity)
+
+    def reoptimize_max_flow(self, display = None):
+        '''
+        API: reoptimize_max_flow(self, display = None)
+        Description:
+        Solves the last max flow problem solved by max_flow() or
+        max_flow_preflowpush() again after arc capacities are changed (see
+        update_capacities()). Starts from the current flow instead of the
+        zero flow. Flow of arcs above their new capacity is lowered to the
+        capacity and the flow this leaves unbalanced at their end nodes is
+        pushed back along flow carrying paths (see max_flow_repair()), then
+        the algorithm of the last solve resumes from the repaired flow.
+        Solves from scratch if nodes or arcs are added or removed since the
+        last solve.
+        Input:
+            display: Display mode.
+        Pre:
+            max_flow() or max_flow_preflowpush() is called before.
+        Post:
+            The 'flow' attribute of each arc gives a maximum flow.
+        Return:
+            Returns value of the maximum flow.
+        '''
+        if self.max_flow_state is None:
+            raise Exception('No max flow to reoptimize!')
+        source, sink, algo, version = self.max_flow_state
+        resume = version == self.structure_version
+        if resume:
+            self.max_flow_repair(source, sink)
+        if algo not in ('DFS', 'BFS'):
+            for step in self.max_flow_preflowpush_steps(source, sink, algo,
+                                                        display, None,
+                                                        resume):
+                pass
+        elif not resume:
+            self.max_flow(source, sink, display, algo)
         else:
-            return None
+            if display is not None:
+                old_display = self.attr['display']
+                self.attr['display'] = display
+            self.max_flow_augment(source, sink, algo)
+            if display is not None:
+                self.attr['display'] = old_display
+        edge_attr = self.edge_attr
+        return (sum(edge_attr[(source, m)]['flow']
+                    for m in self.neighbors[source]) -
+                sum(edge_attr[(m, source)]['flow']
+                    for m in self.in_neighbors[source]))
+
+    def max_flow_repair(self, source, sink):
+        '''
+        API: max_flow_repair(self, source, sink)
+        Description:
+        Used by reoptimize_max_flow(). Lowers flow of arcs above their
+        capacity. The tail of such an arc is left with excess and the head
+        with deficit, an excess is canceled on a flow carrying path from a
+        node with deficit (or source), a deficit on a flow carrying path to
+        a node with excess (or sink). Should not be called by user directly.
+        Post:
+            'flow' attribute of arcs is a feasible flow.
+        '''
+        edge_attr = self.edge_attr
+        imbalance = {}
+        for (i, j), attr in edge_attr.items():
+            if attr['flow'] > attr['capacity']:
+                amount = attr['flow'] - attr['capacity']
+                attr['flow'] = attr['capacity']
+                imbalance[i] = imbalance.get(i, 0) + amount
+                imbalance[j] = imbalance.get(j, 0) - amount
+        if not imbalance:
+            return
+        for n in (source, sink):
+            imbalance[n] = (sum(edge_attr[(m, n)]['flow']
+                                for m in self.in_neighbors[n]) -
+                            sum(edge_attr[(n, m)]['flow']
+                                for m in self.neighbors[n]))
+        # excesses first, deficits are then canceled to sink
+        for reverse in (True, False):
+            for n in list(imbalance):
+                if n == source or n == sink:
+                    continue
+                while ((reverse and imbalance[n] > 0) or
+                       (not reverse and imbalance[n] < 0)):
+                    self.cancel_flow_path(n, imbalance, reverse)
+
+    def cancel_flow_path(self, n, imbalance, reverse):
+        '''
+        API: cancel_flow_path(self, n, imbalance, reverse)
+        Description:
+        Used by max_flow_repair(). Finds a path of arcs with positive flow
+        that ends at node n (starts at n if reverse is False) and starts at
+        a node with negative imbalance (ends at a node with positive
+        imbalance), lowers flow on it as much as possible. Should not be
+        called by user directly.
+        Input:
+            n: Node name.
+            imbalance: Dictionary of inflow minus outflow of unbalanced
+            nodes, updated.
+            reverse: True to cancel excess of n, False for deficit.
+        '''
+        sign = -1 if reverse else 1
+        pred = {n:None}
+        q = [n]
+        target = None
+        while q:
+            current = q.pop()
+            if current != n and sign*imbalance.get(current, 0) > 0:
+                target = current
+                break
+            if reverse:
+                arcs = [(m, current) for m in self.in_neighbors[current]]
+            else:
+                arcs = [(current, m) for m in self.neighbors[current]]
+            for e in arcs:
+                m = e[0] if reverse else e[1]
+                if m not in pred and self.edge_attr[e]['flow'] > 0:
+                    pred[m] = e
+                    q.append(m)
+        if target is None:
+            raise Exception('Flow can not be repaired!')
+        path = []
+        m = target
+        while m != n:
+            path.append(pred[m])
+            m = pred[m][1] if reverse else pred[m][0]
+        amount = min([self.edge_attr[e]['flow'] for e in path] +
+                     [abs(imbalance[n]), abs(imbalance[target])])
+        for e in path:
+            self.edge_attr[e]['flow'] -= amount
+        imbalance[n] += sign*amount
+        imbalance[target] -= sign*amount
+
+    def parametric_max_flow(self, source, sink, parameters, algo = 'FIFO',
+                            display = None):
+        '''
+        API: parametric_max_flow(self, source, sink, parameters,
+                                 algo = 'FIFO', display = None)
+        Description:
+        Solves max flow problems in which capacity of arcs leaving source is
+        multiplied by a parameter, for a nondecreasing sequence of
+        parameters (parametric preflow push of Gallo, Grigoriadis and
+        Tarjan). Capacities of arcs leaving source only grow, so the
+        preflow and the distance labels of a run stay valid and preflow
+        push resumes from them (see preflowpush_resume()), distance labels
+        never decrease and total work is close to a single run. Minimum
+        cuts (nodes reachable from source in the residual graph) grow with
+        the parameter. Capacity of a cut is a linear function of the
+        parameter; when the cut changes between two parameters, the
+        parameter where capacities of the two cuts are equal is solved. It
+        is a breakpoint if one of the two cuts is minimum there, otherwise
+        the cut found is between the two and is searched the same way (see
+        parametric_breakpoints()).
+        Input:
+            source: Source node name.
+            sink: Sink node name.
+            parameters: Nondecreasing sequence of nonnegative multipliers.
+            algo: Algorithm choice, 'FIFO', 'SAP' or 'HighestLabel'.
+            display: Display mode.
+        Pre:
+            (1) See max_flow_preflowpush().
+            (2) Arcs leaving source have 'capacity' attribute.
+        Post:
+            The 'flow' attribute of each arc gives a maximum flow for the
+            last parameter. 'capacity' attributes are not changed.
+        Return:
+            Returns a ParametricFlowResult. All breakpoints between the
+            first and the last parameter are found.
+        '''
+        parameters = list(parameters)
+        if not parameters or parameters[0] < 0:
+            raise Exception('Parameters should be nonnegative!')
+        for k in range(len(parameters)-1):
+            if parameters[k] > parameters[k+1]:
+                raise Exception('Parameters should be nondecreasing!')
+        edge_attr = self.edge_attr
+        base = dict((n, edge_attr[(source, n)]['capacity'])
+                    for n in self.neighbors[source])
+        values = []
+        cuts = []
+        breakpoints = []
+        cut_index = []
+        try:
+            for parameter in parameters:
+                if not cuts:
+                    value = self.parametric_solve(source, sink, algo, display,
+                                                  base, parameter, False)
+                    cuts.append(frozenset(self.residual_reach(source)))
+                else:
+                    state = self.parametric_save()
+                    value = self.parametric_solve(source, sink, algo, display,
+                                                  base, parameter, 'labels')
+                    cut = frozenset(self.residual_reach(source))
+                    if cut != cuts[-1]:
+                        self.parametric_breakpoints(source, sink, algo,
+                                                    display, base, state,
+                                                    cut, cuts, breakpoints)
+                        # flow is left at the last breakpoint
+                        value = self.parametric_solve(source, sink, algo,
+                                                      display, base,
+                                                      parameter, 'labels')
+                values.append(value)
+                cut_index.append(len(cuts)-1)
+        finally:
+            for n in base:
+                edge_attr[(source, n)]['capacity'] = base[n]
+        nl = self.get_node_list()
+        cuts = [[n for n in nl if n in cut] for cut in cuts]
+        return ParametricFlowResult(parameters, values, cuts, breakpoints,
+                                    cut_index)
+
+    def parametric_breakpoints(self, source, sink, algo, display, base,
+                               state, right, cuts, breakpoints):
+        '''
+        API: parametric_breakpoints(self, source, sink, algo, display, base,
+                                    state, right, cuts, breakpoints)
+        Description:
+        Used by parametric_max_flow(). Finds breakpoints between the last
+        cut of cuts, minimum for the parameter of state, and cut right.
+        Solves are started from state or from the last breakpoint found,
+        parameters solved are never smaller than the parameter of the
+        starting flow. Should not be called by user directly.
+        Input:
+            state: Flow and labels saved by parametric_save().
+            right: Minimum cut of a larger parameter, frozenset of nodes.
+            cuts, breakpoints: Lists of parametric_max_flow(), updated.
+        Post:
+            Cuts in between and right are appended to cuts, breakpoints are
+            appended to breakpoints. Flow is a maximum flow for the last
+            breakpoint.
+        '''
+        left = cuts[-1]
+        pending = [right]
+        while pending:
+            slope, constant = self.parametric_line(source, base, left)
+            right_slope, right_constant = self.parametric_line(source, base,
+                                                               pending[-1])
+            # right has less source capacity, lines cross once
+            numerator = right_constant - constant
+            denominator = slope - right_slope
+            if isinstance(numerator, int) and isinstance(denominator, int):
+                parameter = fractions.Fraction(numerator, denominator)
+            else:
+                parameter = numerator/denominator
+            self.parametric_restore(state)
+            self.parametric_solve(source, sink, algo, display, base,
+                                  parameter, 'labels')
+            cut = frozenset(self.residual_reach(source))
+            if cut == left or cut == pending[-1]:
+                breakpoints.append(parameter)
+                left = pending.pop()
+                cuts.append(left)
+                state = self.parametric_save()
+            else:
+                pending.append(cut)
+
+    def parametric_solve(self, source, sink, algo, display, base, parameter,
+                         resume):
+        '''
+        API: parametric_solve(self, source, sink, algo, display, base,
+                              parameter, resume)
+        Description:
+        Used by parametric_max_flow(). Sets capacity of arcs leaving source
+        to parameter times their capacity in base and solves max flow with
+        max_flow_preflowpush_steps(). Returns the flow value. Should not be
+        called by user directly.
+        '''
+        for n in base:
+            self.edge_attr[(source, n)]['capacity'] = parameter*base[n]
+        for step in self.max_flow_preflowpush_steps(source, sink, algo,
+                                                    display, None, resume):
+            pass
+        return step.objective
+
+    def parametric_line(self, source, base, cut):
+        '''
+        API: parametric_line(self, source, base, cut)
+        Description:
+        Used by parametric_max_flow(). Returns capacity of cut as a tuple
+        (slope, constant), capacity is slope*parameter+constant. Should not
+        be called by user directly.
+        '''
+        slope = sum(base[n] for n in base if n not in cut)
+        constant = 0
+        for n in cut:
+            if n == source:
+                continue
+            for m in self.neighbors[n]:
+                if m not in cut:
+                    constant += self.edge_attr[(n, m)]['capacity']
+        return slope, constant
+
+    def parametric_save(self):
+        '''
+        API: parametric_save(self)
+        Description:
+        Used by parametric_max_flow(). Returns 'flow' of arcs and
+        'distance', 'excess' of nodes. Should not be called by user
+        directly.
+        '''
+        flow = dict((e, attr['flow']) for e, attr in self.edge_attr.items())
+        labels = dict((n, (node.attr['distance'], node.attr['excess']))
+                      for n, node in self.nodes.items())
+        return flow, labels
+
+    def parametric_restore(self, state):
+        '''
+        API: parametric_restore(self, state)
+        Description:
+        Used by parametric_max_flow(). Sets attributes saved by
+        parametric_save(). Should not be called by user directly.
+        '''
+        flow, labels = state
+        for e, attr in self.edge_attr.items():
+            attr['flow'] = flow[e]
+        for n, node in self.nodes.items():
+            node.attr['distance'], node.attr['excess'] = labels[n]
+
+    def get_negative_cycle(self):
+        '''
+        API:
+            get_negative_cycle(self)
+        Description:
+            Finds and returns negative cost cycle using 'cost' attribute of
+            arcs. Return value is a list of nodes representing cycle it is in
+            the following form; n_1-n_2-...-n_k, when the cycle has k nodes.
+            Uses Bellman-Ford algorithm started from all nodes at once, if
+            some distance still decreases in the n-th pass the predecessor
+            graph has a cycle and every such cycle is negative. (Cycles
+            read from floyd_warshall() predecessors may be wrong once
+            distances are not valid.)
+        Pre:
+            Arcs should have 'cost' attribute.
+        Return:
+            Returns a list of nodes in the cycle if a negative cycle exists,
+            returns None otherwise.
+        '''
+        nl = self.get_node_list()
+        arcs = [(e[0], e[1], self.get_edge_cost(e))
+                for e in self.get_edge_list()]
+        distance = dict.fromkeys(nl, 0)
+        pred = dict.fromkeys(nl)
+        for _ in range(len(nl)):
+            changed = None
+            for (i, j, cost) in arcs:
+                if distance[i] + cost < distance[j]:
+                    distance[j] = distance[i] + cost
+                    pred[j] = i
+                    changed = j
+            if changed is None:
+                return None
+        # go back n arcs from the node changed last to reach the cycle
+        k = changed
+        for _ in range(len(nl)):
+            k = pred[k]
+        cycle = [k]
+        j = pred[k]
+        while j != k:
+            cycle.append(j)
+            j = pred[j]
+        cycle.reverse()
+        return cycle
 
     def floyd_warshall(self):
         '''
@@ -2214,10 +4649,10 @@ After installation, ensure that the PATH variable is properly set.''')
             index += 1
         return capacity
 
-    def fifo_label_correcting(self, source):
+    def fifo_label_correcting(self, source, store = 'attrs'):
         '''
         API:
-            fifo_label_correcting(self, source)
+            fifo_label_correcting(self, source, store = 'attrs')
         Description:
             finds shortest path from source to every other node. Returns
             predecessor dictionary. If graph has a negative cycle, detects it
@@ -2227,30 +4662,57 @@ After installation, ensure that the PATH variable is properly set.''')
             path.
         Input:
             source: source node
+            store: 'attrs' writes results to node attributes, 'result'
+            returns a ShortestPathResult and does not change the graph.
         Post:
-            Modifies 'distance' attribute of nodes.
+            Modifies 'distance' attribute of nodes. Nothing changes if store
+            is 'result'.
         Return:
             If there is no negative cycle returns to (True, pred), otherwise
             returns to (False, cycle) where pred is the predecessor dictionary
             and cycle is a list of nodes that represents cycle. It is in
-            [n_1, n_2, ..., n_k] form where the cycle has k nodes.
+            [n_1, n_2, ..., n_k] form where the cycle has k nodes. Returns a
+            ShortestPathResult if store is 'result'.
+        '''
+        distance = {}
+        valid, found = self.fifo_label_correcting_distances(source, distance)
+        if store == 'result':
+            if not valid:
+                return ShortestPathResult(False, None, None, found)
+            return ShortestPathResult(True, found, dict((n, distance[n])
+                                                        for n in found), None)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
+        for n in self.neighbors:
+            self.get_node(n).set_attr('distance', distance[n])
+        return (valid, found)
+
+    def fifo_label_correcting_distances(self, source, distance):
+        '''
+        API: fifo_label_correcting_distances(self, source, distance)
+        Description:
+            Used by fifo_label_correcting(). Runs the FIFO label correcting
+            algorithm keeping distance labels in distance dictionary. A
+            node is appended to the queue if it is not in the queue already.
+            Should not be called by user directly.
+        Return:
+            Returns (True, pred) or (False, cycle), see
+            fifo_label_correcting().
         '''
         pred = {}
-        self.get_node(source).set_attr('distance', 0)
-        pred[source] = None
         for n in self.neighbors:
-            if n!=source:
-                self.get_node(n).set_attr('distance', 'inf')
-        q = [source]
+            distance[n] = float('inf')
+        distance[source] = 0
+        pred[source] = None
+        q = collections.deque([source])
+        queued = set(q)
         while q:
-            i = q[0]
-            q = q[1:]
+            i = q.popleft()
+            queued.remove(i)
             for j in self.neighbors[i]:
-                distance_j = self.get_node(j).get_attr('distance')
-                distance_i = self.get_node(i).get_attr('distance')
                 c_ij = self.get_edge_attr(i, j, 'cost')
-                if distance_j > distance_i + c_ij:
-                    self.get_node(j).set_attr('distance', distance_i+c_ij)
+                if distance[j] > distance[i] + c_ij:
+                    distance[j] = distance[i] + c_ij
                     if j in pred:
                         pred[j] = i
                         cycle = self.label_correcting_check_cycle(j, pred)
@@ -2258,8 +4720,9 @@ After installation, ensure that the PATH variable is properly set.''')
                             return (False, cycle)
                     else:
                         pred[j] = i
-                    if j not in q:
+                    if j not in queued:
                         q.append(j)
+                        queued.add(j)
         return (True, pred)
 
     def label_correcting_check_cycle(self, j, pred):
@@ -2353,10 +4816,10 @@ After installation, ensure that the PATH variable is properly set.''')
             flow_ji = self.edge_attr[(j,i)]['flow']
             self.edge_attr[(j,i)]['flow'] = flow_ji-amount
 
-    def network_simplex(self, display, pivot, root):
+    def network_simplex(self, display, pivot, root, warm_start = True):
         '''
         API:
-            network_simplex(self, display, pivot, root)
+            network_simplex(self, display, pivot, root, warm_start = True)
         Description:
             Solves minimum cost feasible flow problem using network simplex
             algorithm. It is recommended to use min_cost_flow(algo='simplex')
@@ -2371,22 +4834,72 @@ After installation, ensure that the PATH variable is properly set.''')
             spanning tree.
             root: Root node for the underlying spanning trees that will be
             generated by network simplex algorthm.
+            warm_start: Starts from the spanning tree basis of the previous
+            solve if True and nodes and arcs did not change since, see
+            simplex_warm_start(). Costs, capacities and demands may change.
         Post:
             (1) Changes 'flow' attribute of edges.
+            (2) Keeps the final spanning tree basis in self.simplex_basis.
         Return:
             Returns True when an optimal solution is found, returns
             False otherwise.
         '''
+        for step in self.network_simplex_steps(display, pivot, root, None,
+                                               warm_start):
+            pass
+        return step.feasible
+
+    def network_simplex_steps(self, display, pivot, root, every = 1,
+                              warm_start = True):
+        '''
+        API:
+            network_simplex_steps(self, display, pivot, root, every = 1,
+                                  warm_start = True)
+        Description:
+            Generator form of network_simplex(). Runs the same algorithm and
+            yields a SolverStep after every 'every' pivots, so a long solve
+            can be interleaved with other work (see aio.py) or displayed
+            step by step. The last step is yielded when the algorithm
+            finishes, its feasible attribute is the return value of
+            network_simplex(). Without a usable warm start basis, steps of
+            the search for an initial feasible flow are yielded first, see
+            find_feasible_flow_steps().
+        Input:
+            display, pivot, root, warm_start: See network_simplex().
+            every: Number of pivots (pushes while searching for a feasible
+            flow) between steps. Only the last step is yielded if None.
+        Post:
+            (1) Changes 'flow' attribute of edges.
+            (2) Keeps the final spanning tree basis in self.simplex_basis.
+        Return:
+            Yields SolverStep instances, state has the 'entering' and
+            'leaving' arcs of the last pivot (see find_feasible_flow_steps()
+            for the first steps).
+        '''
         # ==== determine an initial tree structure (T,L,U)
-        # find a feasible flow
-        if not self.find_feasible_flow():
-            return False
-        t = self.simplex_find_tree()
+        t = None
+        if warm_start:
+            # start from the basis of the previous solve if it is usable
+            t = self.simplex_warm_start(root)
+        if t is None:
+            # find a feasible flow
+            for step in self.find_feasible_flow_steps(every):
+                if not step.done:
+                    yield step
+            if step.feasible:
+                t = self.simplex_find_tree()
+            else:
+                t = False
+        if t is False:
+            self.simplex_basis = None
+            yield SolverStep(0, None, True, False)
+            return
         self.set_display_mode(display)
         # mark spanning tree arcs
         self.simplex_mark_st_arcs(t)
         # display initial spanning tree
-        t.simplex_redraw(display, root)
+        if display != 'off':
+            t.simplex_redraw(display, root)
         t.set_display_mode(display)
         #t.display()
         self.display()
@@ -2394,6 +4907,7 @@ After installation, ensure that the PATH variable is properly set.''')
         t.simplex_search(root, 1)
         # compute potentials
         self.simplex_compute_potentials(t, root)
+        pivots = 0
         # while some nontree arc violates optimality conditions
         while not self.simplex_optimal(t):
             self.display()
@@ -2412,12 +4926,21 @@ After installation, ensure that the PATH variable is properly set.''')
             self.simplex_mark_st_arcs(t)
             self.display()
             # set predecessor, depth and thread indexes
-            t.simplex_redraw(display, root)
+            if display != 'off':
+                t.simplex_redraw(display, root)
             #t.display()
             t.simplex_search(root, 1)
             # compute potentials
             self.simplex_compute_potentials(t, root)
-        return True
+            pivots += 1
+            if every and pivots % every == 0:
+                yield SolverStep(pivots, self.get_flow_cost(), False, True,
+                                 {'entering':(k,l), 'leaving':(p,q)})
+        # keep the basis (tree arcs and nontree arcs at upper bound)
+        upper = set(e for e in self.edge_attr if e not in t.edge_attr and
+                    self.edge_attr[e]['flow'] > 0)
+        self.simplex_basis = (t, upper, self.structure_version)
+        yield SolverStep(pivots, self.get_flow_cost(), True)
 
     def simplex_mark_leaving_arc(self, p, q):
         '''
@@ -2460,7 +4983,7 @@ After installation, ensure that the PATH variable is properly set.''')
         index = 0
         # determine last blocking arc
         t.add_edge(k, l)
-        tel = t.get_edge_list()
+        tel = t.edge_attr
         while index < (n-1):
             if (cycle[index], cycle[index+1]) in tel:
                 flow = self.edge_attr[(cycle[index], cycle[index+1])]['flow']
@@ -2519,7 +5042,7 @@ After installation, ensure that the PATH variable is properly set.''')
         Post:
             (1) color attribute of edges.
         '''
-        tel = list(t.edge_attr.keys())
+        tel = t.edge_attr
         for e in self.get_edge_list():
             flow_e = self.edge_attr[e]['flow']
             capacity_e = self.edge_attr[e]['capacity']
@@ -2553,6 +5076,17 @@ After installation, ensure that the PATH variable is properly set.''')
                 print(e, str(self.edge_attr[e]['flow']).ljust(4), end=' ')
                 print(str(self.edge_attr[e]['capacity']).ljust(4))
 
+    def get_flow_cost(self):
+        '''
+        API:
+            get_flow_cost(self)
+        Description:
+            Returns total cost of the flow, sum of 'flow' times 'cost'
+            attributes of arcs. Arcs without flow are skipped.
+        '''
+        return sum(a['flow']*a['cost'] for a in self.edge_attr.values()
+                   if a.get('flow'))
+
     def simplex_redraw(self, display, root):
         '''
         API:
@@ -2623,7 +5157,7 @@ After installation, ensure that the PATH variable is properly set.''')
         '''
         # augment min_capacity along cycle
         n = len(cycle)
-        tel = list(t.edge_attr.keys())
+        tel = t.edge_attr
         index = 0
         while index < (n-1):
             if (cycle[index], cycle[index+1]) in tel:
@@ -2897,7 +5431,7 @@ After installation, ensure that the PATH variable is properly set.''')
         # find amount to augment
         index = 0
         k = len(cycle)
-        el = list(self.edge_attr.keys())
+        el = self.edge_attr
         # check arc (cycle[k-1], cycle[0])
         if (cycle[k-1], cycle[0]) in el:
             min_capacity = self.edge_attr[(cycle[k-1], cycle[0])]['capacity']-\
@@ -3032,7 +5566,7 @@ After installation, ensure that the PATH variable is properly set.''')
         '''
         self.get_node(root).set_attr('potential', 0)
         j = t.get_node(root).get_attr('thread')
-        while j is not root:
+        while j != root:
             i = t.get_node(j).get_attr('pred')
             potential_i = self.get_node(i).get_attr('potential')
             if (i,j) in self.edge_attr:
@@ -3064,7 +5598,7 @@ After installation, ensure that the PATH variable is properly set.''')
         cycle = []
         li = [k]
         lj = [j]
-        while i is not j:
+        while i != j:
             depth_i = t.get_node(i).get_attr('depth')
             depth_j = t.get_node(j).get_attr('depth')
             if depth_i > depth_j:
@@ -3085,6 +5619,174 @@ After installation, ensure that the PATH variable is properly set.''')
         # l is beginning k is end
         return cycle
 
+    def simplex_warm_start(self, root):
+        '''
+        API:
+            simplex_warm_start(self, root)
+        Description:
+            Used by network_simplex_steps(). Restores the spanning tree basis
+            of the previous solve (self.simplex_basis) if nodes and arcs did
+            not change since. Nontree arcs get the bounds they had (0 or
+            capacity) and flows of tree arcs are computed from node demands.
+            If only costs changed the basis stays feasible and only
+            potentials are computed again. If demand or capacity changes
+            make some tree arc flows infeasible and reduced costs are still
+            optimal, dual simplex pivots (see simplex_dual_pivot()) restore
+            feasibility. Should not be called by user directly.
+        Input:
+            root: Root node of the spanning tree.
+        Post:
+            'flow' attributes of arcs and 'potential' attributes of nodes
+            are changed.
+        Return:
+            Returns the spanning tree (a Graph instance) of a feasible basis.
+            Returns None if the basis can not be used (no basis, nodes or
+            arcs changed, or the basis is neither primal nor dual feasible)
+            and False if the problem is infeasible.
+        '''
+        if self.simplex_basis is None:
+            return None
+        t, upper, version = self.simplex_basis
+        if version != self.structure_version:
+            return None
+        for e in self.edge_attr:
+            if e not in t.edge_attr:
+                if e in upper:
+                    self.edge_attr[e]['flow'] = self.edge_attr[e]['capacity']
+                else:
+                    self.edge_attr[e]['flow'] = 0
+        t.simplex_search(root, 1)
+        self.simplex_compute_potentials(t, root)
+        if not self.simplex_tree_flows(t):
+            return False
+        dual_feasible = None
+        while True:
+            # pick the tree arc with the largest bound violation
+            leaving = None
+            violation = 0
+            for e in t.edge_attr:
+                flow = self.edge_attr[e]['flow']
+                excess = max(-flow, flow - self.edge_attr[e]['capacity'])
+                if excess > violation:
+                    leaving = e
+                    violation = excess
+            if leaving is None:
+                return t
+            if dual_feasible is None:
+                dual_feasible = self.simplex_optimal(t)
+            if not dual_feasible:
+                return None
+            if not self.simplex_dual_pivot(t, leaving, root):
+                return False
+
+    def simplex_tree_flows(self, t):
+        '''
+        API:
+            simplex_tree_flows(self, t)
+        Description:
+            Used by simplex_warm_start(). Computes flows of the arcs of
+            spanning tree t from node demands and flows of nontree arcs,
+            going from the leaves to the root. Flows may be out of bounds.
+        Pre:
+            'pred' and 'depth' attributes of nodes of t are set, see
+            simplex_search().
+        Return:
+            Returns False if total supply and total demand differ, True
+            otherwise.
+        '''
+        excess = {}
+        for n in self.neighbors:
+            excess[n] = self.get_node(n).get_attr('demand')
+        for e in self.edge_attr:
+            if e not in t.edge_attr:
+                flow = self.edge_attr[e]['flow']
+                excess[e[0]] -= flow
+                excess[e[1]] += flow
+        order = sorted(t.nodes, key = lambda n: -t.nodes[n].attr['depth'])
+        for j in order:
+            i = t.nodes[j].attr['pred']
+            if i is None:
+                return excess[j] == 0
+            # supply of the subtree of j leaves it through the tree arc
+            if (i, j) in t.edge_attr:
+                self.edge_attr[(i, j)]['flow'] = -excess[j]
+            else:
+                self.edge_attr[(j, i)]['flow'] = excess[j]
+            excess[i] += excess[j]
+        return True
+
+    def simplex_dual_pivot(self, t, leaving, root):
+        '''
+        API:
+            simplex_dual_pivot(self, t, leaving, root)
+        Description:
+            Used by simplex_warm_start(). Dual simplex pivot of network
+            simplex. Tree arc leaving is set to the bound it violates and
+            leaves the tree, which splits the tree in two. The arc that
+            enters is the nontree arc across the cut that can carry the flow
+            the leaving arc can not, with the smallest absolute reduced
+            cost, so reduced costs stay optimal. Tree flows, potentials and
+            'pred', 'thread', 'depth' attributes of t are updated.
+        Input:
+            t: Current spanning tree.
+            leaving: Tree arc whose flow is out of bounds.
+            root: Root node of the spanning tree.
+        Return:
+            Returns False if no arc can enter (the problem is infeasible),
+            True otherwise.
+        '''
+        p, q = leaving
+        flow = self.edge_attr[leaving]['flow']
+        bound = 0 if flow < 0 else self.edge_attr[leaving]['capacity']
+        # nodes of the subtree below the leaving arc
+        if t.get_node(p).get_attr('pred') == q:
+            d, other = p, q
+        else:
+            d, other = q, p
+        subtree = set([d])
+        stack = [d]
+        while stack:
+            i = stack.pop()
+            for j in t.neighbors[i] + t.in_neighbors[i]:
+                if j not in subtree and not (i == d and j == other):
+                    subtree.add(j)
+                    stack.append(j)
+        # flow that has to leave the subtree through the entering arc
+        if p == d:
+            need = flow - bound
+        else:
+            need = bound - flow
+        entering = None
+        best = None
+        for e in self.edge_attr:
+            if e in t.edge_attr or e == leaving:
+                continue
+            tail_in = e[0] in subtree
+            if tail_in == (e[1] in subtree):
+                continue
+            if self.edge_attr[e]['capacity'] == 0:
+                continue
+            at_lower = self.edge_attr[e]['flow'] == 0
+            # increase flow on arcs leaving the subtree or decrease it on
+            # arcs entering it, the other way around if need is negative
+            if (need > 0) != (tail_in == at_lower):
+                continue
+            reduced = abs(self.edge_attr[e]['cost'] -
+                          self.get_node(e[0]).get_attr('potential') +
+                          self.get_node(e[1]).get_attr('potential'))
+            if best is None or reduced < best:
+                entering = e
+                best = reduced
+        if entering is None:
+            return False
+        self.edge_attr[leaving]['flow'] = bound
+        t.del_edge(leaving)
+        t.add_edge(entering[0], entering[1])
+        t.simplex_search(root, 1)
+        self.simplex_compute_potentials(t, root)
+        self.simplex_tree_flows(t)
+        return True
+
     def min_cost_flow(self, display = None, **args):
         '''
         API:
@@ -3120,10 +5822,20 @@ After installation, ensure that the PATH variable is properly set.''')
                 root: valid if algo is 'simlex', specifies the root node for
                     simplex algorithm. It is name of the one of the nodes. It
                     will be chosen randomly if not provided.
+                warm_start: valid if algo is 'simplex', starts from the
+                    spanning tree basis of the previous simplex solve if
+                    True (default) and nodes and arcs did not change since.
+                    See simplex_warm_start().
+                store: 'attrs' writes results to node and arc attributes,
+                    'result' returns a FlowResult (value is the total cost)
+                    and does not change the graph.
         Post:
             The 'flow' attribute of each arc gives the optimal flows.
             'distance' attribute of the nodes are also changed during max flow
-            solution process.
+            solution process. Nothing changes if store is 'result'.
+        Return:
+            Returns True if the problem is feasible, False otherwise. Returns
+            a FlowResult if store is 'result'.
         Examples:
             g.min_cost_flow():
                 solves minimum cost feasible flow problem using simplex
@@ -3138,6 +5850,11 @@ After installation, ensure that the PATH variable is properly set.''')
         '''
         if display is None:
             display = self.attr['display']
+        store = args.pop('store', 'attrs')
+        if store == 'result':
+            return self.min_cost_flow_result(args)
+        elif store != 'attrs':
+            raise Exception('Unknown store option %s' %str(store))
         if 'algo' in args:
             algorithm = args['algo']
         else:
@@ -3149,18 +5866,44 @@ After installation, ensure that the PATH variable is properly set.''')
                 for k in self.neighbors:
                     root = k
                     break
-            if 'pivot' in args:
-                if not self.network_simplex(display, args['pivot'], root):
-                    print('problem is infeasible')
-            else:
-                if not self.network_simplex(display, 'dantzig', root):
-                    print('problem is infeasible')
+            feasible = self.network_simplex(display,
+                                            args.get('pivot', 'dantzig'), root,
+                                            args.get('warm_start', True))
         elif algorithm == 'cycle_canceling':
-            if not self.cycle_canceling(display):
-                print('problem is infeasible')
+            feasible = self.cycle_canceling(display)
         else:
             print(args['algo'], 'is not a defined algorithm. Exiting.')
             return
+        if not feasible:
+            print('problem is infeasible')
+        return feasible
+
+    def min_cost_flow_result(self, args):
+        '''
+        API: min_cost_flow_result(self, args)
+        Description:
+        Used by min_cost_flow() method if store is 'result'. The network
+        simplex and cycle canceling methods keep their state in node and
+        arc attributes, so the problem is packed into arrays of capacities,
+        costs and demands as in solve_batch() and solved on a graph built
+        from these arrays (see batch.py). Nodes of that graph are numbered
+        in the order of get_node_list(), so the same arcs are visited in the
+        same order. Does not display. Should not be called by user
+        directly.
+        Return:
+            Returns a FlowResult.
+        '''
+        from .batch import pack_instance, unpack_instance
+        packed, edges = pack_instance(self)
+        g = unpack_instance(packed)
+        index = dict(zip(self.neighbors, range(len(self.neighbors))))
+        if 'root' in args:
+            args = dict(args, root = index[args['root']])
+        feasible = g.min_cost_flow('off', **args)
+        flow = dict((e, g.edge_attr[(index[e[0]], index[e[1]])]['flow'])
+                    for e in edges)
+        cost = sum(flow[e]*self.edge_attr[e]['cost'] for e in flow)
+        return FlowResult(flow, cost, feasible)
 
     def random(self, numnodes = 10, degree_range = (2, 4), length_range = (1, 10),
                density = None, edge_format = None, node_format = None,
@@ -3181,12 +5924,17 @@ After installation, ensure that the PATH variable is properly set.''')
             length_range: A tuple that has lower and upper bounds for 'cost'
             attribute of edges.
             density: Density of edges, ie. 0.5 indicates a node will
-            approximately have edge to half of the other nodes.
+            approximately have edge to half of the other nodes. Edges are
+            sampled with the skip method of gnp_pairs() in O(n + m) time
+            and added with add_edges().
             edge_format: Dictionary that specifies attribute values for edges.
             node_format: Dictionary that specifies attribute values for nodes.
             Euclidean: Creates an Euclidean graph (Euclidean distance between
             nodes) if True.
             seedInput: Seed that will be used for random number generation.
+            node_selection: Used with Euclidean and degree_range. 'closest'
+            connects every node to its nearest nodes, which are found with
+            a SpatialIndex. 'random' connects every node to random nodes.
         Pre:
             It is recommended to call this method on empty Graph objects.
         Post:
@@ -3205,8 +5953,7 @@ After installation, ensure that the PATH variable is properly set.''')
                            'shape':'circle',
                            }
         if Euclidean == False:
-            for m in range(numnodes):
-                self.add_node(m, **node_format)
+            self.add_nodes(range(numnodes), **node_format)
             if degree_range is not None and density is None:
                 for m in range(numnodes):
                     degree = random.randint(degree_range[0], degree_range[1])
@@ -3225,64 +5972,57 @@ After installation, ensure that the PATH variable is properly set.''')
                                     self.add_edge(m, n, **edge_format)
                         i += 1
             elif density != None:
-                for m in range(numnodes):
-                    if self.graph_type == DIRECTED_GRAPH:
-                        numnodes2 = numnodes
-                    else:
-                        numnodes2 = m
-                    for n in range(numnodes2):
-                        if ((parallel_allowed or (n, m) not in self.edge_attr)
-                            and m != n):
-                            if random.random() < density:
-                                if length_range is not None:
-                                    length = random.randint(length_range[0],
-                                                     length_range[1])
-                                    self.add_edge(m, n, cost = length,
-                                                  **edge_format)
-                                    if add_labels:
-                                        self.set_edge_attr(m, n, 'label', str(length))
-                                else:
-                                    self.add_edge(m, n, **edge_format)
+                pairs = gnp_pairs(numnodes, density,
+                                  self.graph_type is DIRECTED_GRAPH,
+                                  parallel_allowed)
+                if length_range is not None:
+                    edges = ((m, n, random.randint(length_range[0],
+                                                   length_range[1]))
+                             for (m, n) in pairs)
+                    if add_labels:
+                        edges = ((m, n, length, str(length))
+                                 for (m, n, length) in edges)
+                    self.add_edges(edges, ('cost', 'label'), **edge_format)
+                else:
+                    self.add_edges(pairs, **edge_format)
             else:
                 print("Must set either degree range or density")
         else:
+            xs = []
+            ys = []
             for m in range(numnodes):
                 ''' Assigns random coordinates (between 1 and 20) to the nodes
                 '''
                 x = random.random()*scale
                 y = random.random()*scale
-                self.add_node(m, locationx = x, locationy = y,
-                              pos = '"'+str(x) + "," + str(y)+'!"',
-                              **node_format)
+                xs.append(x)
+                ys.append(y)
+            self.add_nodes(((m, xs[m], ys[m],
+                             '"'+str(xs[m]) + "," + str(ys[m])+'!"')
+                            for m in range(numnodes)),
+                           ('locationx', 'locationy', 'pos'), **node_format)
             if degree_range is not None and density is None:
+                if node_selection == 'closest':
+                    index = SpatialIndex(xs, ys)
+                    index.prefetch(degree_range[1]+1)
                 for m in range(numnodes):
                     degree = random.randint(degree_range[0], degree_range[1])
                     i = 0
-                    neighbors = []
                     if node_selection == 'random':
                         while i < degree:
-                            length = round((((self.get_node(n).get_attr('locationx') -
-                                              self.get_node(m).get_attr('locationx')) ** 2 +
-                                             (self.get_node(n).get_attr('locationy') -
-                                              self.get_node(m).get_attr('locationy')) ** 2) ** 0.5)*scale_cost,
+                            n = random.randint(0, numnodes-1)
+                            length = round((((xs[n] - xs[m]) ** 2 +
+                                             (ys[n] - ys[m]) ** 2) ** 0.5)*scale_cost,
                                            0)
                             if (((m,n) not in self.edge_attr and m != n) and
                                 (parallel_allowed or (n, m) not in self.edge_attr)):
-                                neighbors.append(random.randint(0, numnodes-1))
                                 self.add_edge(m, n, cost = int(length), **edge_format)
                                 if add_labels:
                                     self.set_edge_attr(m, n, 'label', str(int(length)))
                                 i += 1
                     elif node_selection == 'closest':
-                        lengths = []
-                        for n in range(numnodes):
-                            lengths.append((n, round((((self.get_node(n).get_attr('locationx') -
-                                                        self.get_node(m).get_attr('locationx')) ** 2 +
-                                                       (self.get_node(n).get_attr('locationy') -
-                                                        self.get_node(m).get_attr('locationy')) ** 2) ** 0.5)*scale_cost,
-                                                     0)))
-                        lengths.sort(key = lambda l : l[1])
-                        for i in range(degree+1):
+                        lengths = index.closest(m, degree+1, scale_cost)
+                        for i in range(min(degree+1, numnodes)):
                             if not (lengths[i][0] == m or self.check_edge(m, lengths[i][0])):
                                 self.add_edge(m, lengths[i][0], cost = int(lengths[i][1]), **edge_format)
                                 if add_labels:
@@ -3291,73 +6031,177 @@ After installation, ensure that the PATH variable is properly set.''')
                         print("Unknown node selection rule...exiting")
                         return
             elif density != None:
-                for m in range(numnodes):
-                    if self.graph_type == DIRECTED_GRAPH:
-                        numnodes2 = numnodes
-                    else:
-                        numnodes2 = m
-                    for n in range(numnodes2):
-                        if ((parallel_allowed or (n, m) not in self.edge_attr)
-                            and m != n):
-                            if random.random() < density:
-                                if length_range is None:
-                                    ''' calculates the euclidean norm and round it
-                                    to an integer '''
-                                    length = round((((self.get_node(n).get_attr('locationx') -
-                                                      self.get_node(m).get_attr('locationx')) ** 2 +
-                                                     (self.get_node(n).get_attr('locationy') -
-                                                      self.get_node(m).get_attr('locationy')) ** 2) ** 0.5), 0)
-                                    self.add_edge(m, n, cost = int(length), **edge_format)
-                                    if add_labels:
-                                        self.set_edge_attr(m, n, 'label', str(int(length)))
-                                else:
-                                    self.add_edge(m, n, **edge_format)
+                pairs = gnp_pairs(numnodes, density,
+                                  self.graph_type is DIRECTED_GRAPH,
+                                  parallel_allowed)
+                if length_range is None:
+                    ''' calculates the euclidean norm and round it
+                    to an integer '''
+                    edges = ((m, n, int(round((((xs[n] - xs[m]) ** 2 +
+                                                (ys[n] - ys[m]) ** 2) ** 0.5), 0)))
+                             for (m, n) in pairs)
+                    if add_labels:
+                        edges = ((m, n, length, str(length))
+                                 for (m, n, length) in edges)
+                    self.add_edges(edges, ('cost', 'label'), **edge_format)
+                else:
+                    self.add_edges(pairs, **edge_format)
             else:
                 print("Must set either degree range or density")
 
     def page_rank(self, damping_factor=0.85, max_iterations=100,
-                  min_delta=0.00001):
+                  min_delta=0.00001, personalization=None):
         '''
         API:
             page_rank(self, damping_factor=0.85, max_iterations=100,
-                  min_delta=0.00001)
+                  min_delta=0.00001, personalization=None)
         Description:
-            Compute and return the page-rank of a directed graph.
-            This function was originally taken from here and modified for this
-            graph class: http://code.google.com/p/python-graph/source/browse/
-            trunk/core/pygraph/algorithms/pagerank.py
+            Compute and return the page-rank of a directed graph. Power
+            iteration on the column-stochastic link matrix, which is built
+            once from the CSR representation of the graph (see to_csr()).
+            Rank of dangling nodes (nodes without out-neighbors) is
+            redistributed according to the personalization vector, so ranks
+            sum up to 1. Uses page_rank_batch() if NumPy is installed.
+            Edges of an undirected graph are followed in both directions.
         Input:
             damping_factor: Damping factor.
             max_iterations: Maximum number of iterations.
             min_delta: Smallest variation required to have a new iteration.
-        Pre:
-            Graph should be a directed graph.
+            personalization: Dictionary of teleport weights, keys are node
+            names. Uniform if None.
         Return:
             Returns dictionary of page-ranks. Keys are node names, values are
-            corresponding page-ranks.
+            corresponding page-ranks. Results are cached if caching is
+            enabled, see enable_cache().
+        '''
+        teleport = None
+        if personalization is not None:
+            teleport = frozenset(personalization.items())
+        return self.cached('page_rank', (damping_factor, max_iterations,
+                                         min_delta, teleport),
+                           lambda: self.compute_page_rank(
+                               damping_factor, max_iterations, min_delta,
+                               personalization))
+
+    def compute_page_rank(self, damping_factor, max_iterations, min_delta,
+                          personalization):
         '''
-        nodes = self.get_node_list()
-        graph_size = len(nodes)
-        if graph_size == 0:
+        API:
+            compute_page_rank(self, damping_factor, max_iterations, min_delta,
+                              personalization)
+        Description:
+            Used by page_rank(). Computes page-ranks without the cache.
+            Should not be called by user directly.
+        '''
+        if self.get_node_num() == 0:
             return {}
-        #value for nodes without inbound links
-        min_value = old_div((1.0-damping_factor),graph_size)
-        # itialize the page rank dict with 1/N for all nodes
-        pagerank = dict.fromkeys(nodes, old_div(1.0,graph_size))
+        if NUMPY_INSTALLED:
+            if personalization is not None:
+                personalization = [personalization]
+            names, ranks = self.page_rank_batch(personalization,
+                                                damping_factor,
+                                                max_iterations, min_delta)
+            return dict(zip(names, ranks[:, 0].tolist()))
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        if personalization is None:
+            teleport = [1.0/n]*n
+        else:
+            total = float(sum(personalization.values()))
+            teleport = [0.0]*n
+            for name in personalization:
+                teleport[index[name]] = personalization[name]/total
+        dangling = [i for i in range(n) if offsets[i] == offsets[i+1]]
+        rank = [1.0/n]*n
         for _ in range(max_iterations):
-            diff = 0 #total difference compared to last iteraction
-            # computes each node PageRank based on inbound links
-            for node in nodes:
-                rank = min_value
-                for referring_page in self.get_in_neighbors(node):
-                    rank += (damping_factor * pagerank[referring_page] /
-                             len(self.get_neighbors(referring_page)))
-                diff += abs(pagerank[node] - rank)
-                pagerank[node] = rank
+            leaked = damping_factor*sum(rank[i] for i in dangling)
+            new_rank = [(1.0 - damping_factor + leaked)*t for t in teleport]
+            for i in range(n):
+                if offsets[i] == offsets[i+1]:
+                    continue
+                share = damping_factor*rank[i]/(offsets[i+1] - offsets[i])
+                for j in targets[offsets[i]:offsets[i+1]]:
+                    new_rank[j] += share
+            diff = sum(abs(new_rank[i] - rank[i]) for i in range(n))
+            rank = new_rank
             #stop if PageRank has converged
             if diff < min_delta:
                 break
-        return pagerank
+        return dict(zip(names, rank))
+
+    def page_rank_batch(self, personalization=None, damping_factor=0.85,
+                        max_iterations=100, min_delta=0.00001):
+        '''
+        API:
+            page_rank_batch(self, personalization=None, damping_factor=0.85,
+                            max_iterations=100, min_delta=0.00001)
+        Description:
+            Computes many personalized page-ranks at once. Builds the
+            column-stochastic link matrix M once (scipy.sparse if installed,
+            NumPy arrays otherwise) and iterates
+            X = d*(M*X + V*(dangling rank of X)) + (1-d)*V
+            where columns of V are personalization vectors, so every
+            iteration is a single sparse-dense matrix product for all
+            columns. Iterates until every column has converged.
+        Input:
+            personalization: A list of dictionaries (keys are node names,
+            values are teleport weights) or a NumPy array with a row for
+            every node in get_node_list() order and a column for every
+            ranking. Uniform teleport (ordinary page-rank) if None.
+            damping_factor: Damping factor.
+            max_iterations: Maximum number of iterations.
+            min_delta: Smallest L1 variation of a column required to have a
+            new iteration.
+        Pre:
+            NumPy should be installed.
+        Return:
+            Returns a tuple (names, ranks) where names is get_node_list() and
+            ranks is a NumPy array with a row for every node and a column
+            for every personalization vector.
+        '''
+        if not NUMPY_INSTALLED:
+            raise Exception('page_rank_batch requires NumPy.')
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        offsets = numpy.asarray(offsets, dtype = numpy.int64)
+        targets = numpy.asarray(targets, dtype = numpy.int64)
+        out_degree = numpy.diff(offsets)
+        tails = numpy.repeat(numpy.arange(n), out_degree)
+        share = 1.0/out_degree[tails]
+        dangling = out_degree == 0
+        if personalization is None:
+            teleport = numpy.full((n, 1), 1.0/n)
+        elif isinstance(personalization, numpy.ndarray):
+            teleport = numpy.array(personalization, dtype = float)
+            if teleport.ndim == 1:
+                teleport = teleport.reshape(n, 1)
+        else:
+            teleport = numpy.zeros((n, len(personalization)))
+            for c, vector in enumerate(personalization):
+                for name in vector:
+                    teleport[index[name], c] = vector[name]
+        totals = teleport.sum(axis = 0)
+        if (totals <= 0).any():
+            raise Exception('Personalization vectors should have positive sum.')
+        teleport /= totals
+        if SCIPY_INSTALLED:
+            link = scipy.sparse.csr_matrix((share, (targets, tails)),
+                                           shape = (n, n))
+        rank = numpy.full(teleport.shape, 1.0/n)
+        for _ in range(max_iterations):
+            if SCIPY_INSTALLED:
+                linked = link.dot(rank)
+            else:
+                linked = numpy.zeros(rank.shape)
+                numpy.add.at(linked, targets, share[:, None]*rank[tails])
+            leaked = rank[dangling].sum(axis = 0)
+            new_rank = (damping_factor*linked +
+                        (damping_factor*leaked + 1.0 - damping_factor)*teleport)
+            diff = numpy.abs(new_rank - rank).sum(axis = 0).max()
+            rank = new_rank
+            if diff < min_delta:
+                break
+        return names, rank
 
     def get_degrees(self):
         '''
@@ -3367,17 +6211,28 @@ After installation, ensure that the PATH variable is properly set.''')
             Returns degrees of nodes in dictionary format.
         Return:
             Returns a dictionary of node degrees. Keys are node names, values
-            are corresponding degrees.
+            are corresponding degrees. Results are cached if caching is
+            enabled, see enable_cache().
+        '''
+        return self.cached('get_degrees', (), self.compute_degrees)
+
+    def compute_degrees(self):
+        '''
+        API:
+            compute_degrees(self)
+        Description:
+            Used by get_degrees(). Computes degrees without the cache. Should
+            not be called by user directly.
         '''
         degree = {}
         if self.attr['type'] is not DIRECTED_GRAPH:
             for n in self.get_node_list():
                 degree[n] = len(self.get_neighbors(n))
-            return degree
         else:
             for n in self.get_node_list():
                 degree[n] = (len(self.get_in_neighbors(n)) +
                              len(self.get_out_neighbors(n)))
+        return degree
 
     def get_in_degrees(self):
         '''
@@ -3415,38 +6270,226 @@ After installation, ensure that the PATH variable is properly set.''')
             degree[n] = len(self.get_out_neighbors(n))
         return degree
 
-    def get_diameter(self):
+    def get_diameter(self, algo = 'bounding', workers = 1):
         '''
         API:
-            get_diameter(self)
+            get_diameter(self, algo = 'bounding', workers = 1)
         Description:
             Returns diameter of the graph. Diameter is defined as follows.
             distance(n,m): shortest unweighted path from n to m
             eccentricity(n) = $\max _m distance(n,m)$
-            diameter = $\min _n eccentricity(n) = \min _n \max _m distance(n,m)$
+            diameter = $\max _n eccentricity(n) = \max _n \max _m distance(n,m)$
+            Does not change node attributes.
+        Input:
+            algo: 'bounding' for bounding eccentricities (see
+            diameter_radius()), 'iFUB' for iterative fringe upper bound
+            (see diameter_ifub()) or 'all' for one breadth-first search per
+            node (see eccentricities()).
+            workers: Valid if algo is 'all'. Number of processes.
         Return:
-            Returns diameter of the graph.
+            Returns diameter of the graph, 'infinity' if the graph is not
+            connected. Results are cached if caching is enabled, see
+            enable_cache().
         '''
+        if self.attr['type'] is not UNDIRECTED_GRAPH:
+            print('This function only works for undirected graphs')
+            return
+        return self.cached('get_diameter', (algo,),
+                           lambda: self.compute_diameter(algo, workers))
+
+    def compute_diameter(self, algo, workers):
+        '''
+        API:
+            compute_diameter(self, algo, workers)
+        Description:
+            Used by get_diameter(). Computes diameter without the cache.
+            Should not be called by user directly.
+        '''
+        if algo == 'bounding':
+            return self.diameter_radius()[0]
+        elif algo == 'iFUB':
+            return self.diameter_ifub()
+        elif algo == 'all':
+            ecc = list(self.eccentricities(workers).values())
+            if 'infinity' in ecc:
+                return 'infinity'
+            return max(ecc) if ecc else 0
+        else:
+            raise Exception('Unknown diameter algorithm %s' %str(algo))
 
+    def get_radius(self, workers = None):
+        '''
+        API:
+            get_radius(self, workers = None)
+        Description:
+            Returns radius of the graph, radius = $\min _n eccentricity(n)$.
+            See get_diameter() for definitions. Does not change node
+            attributes.
+        Input:
+            workers: Computes all eccentricities using this many processes
+            if given (see eccentricities()), uses diameter_radius()
+            otherwise.
+        Return:
+            Returns radius of the graph, 'infinity' if the graph is not
+            connected.
+        '''
         if self.attr['type'] is not UNDIRECTED_GRAPH:
             print('This function only works for undirected graphs')
             return
-        diameter = 'infinity'
-        eccentricity_n = 0
-        for n in self.get_node_list():
-            for m in self.get_node_list():
-                path_n_m = self.search(n, destination = m, algo = 'BFS')
-                if path_n_m is None:
-                    # this indicates there is no path from n to m, no diameter
-                    # is defined, since the graph is not connected, return
-                    # 'infinity'
-                    return 'infinity'
-                distance_n_m = len(path_n_m)-1
-                if distance_n_m > eccentricity_n:
-                    eccentricity_n = distance_n_m
-            if diameter == 'infinity' or eccentricity_n > diameter:
-                diameter = eccentricity_n
-        return diameter
+        if workers is None:
+            return self.diameter_radius()[1]
+        ecc = list(self.eccentricities(workers).values())
+        if 'infinity' in ecc:
+            return 'infinity'
+        return min(ecc) if ecc else 0
+
+    def eccentricities(self, workers = 1, chunksize = 64):
+        '''
+        API:
+            eccentricities(self, workers = 1, chunksize = 64)
+        Description:
+            Computes eccentricity of every node with one headless
+            breadth-first search per node on the CSR representation of the
+            graph (see to_csr()). Searches are distributed to a process pool
+            if workers is greater than 1. Does not change node attributes.
+        Input:
+            workers: Number of processes.
+            chunksize: Number of searches sent to a worker at once.
+        Return:
+            Returns a dictionary, keys are node names, values are
+            eccentricities ('infinity' for nodes that can not reach all
+            other nodes).
+        '''
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        chunks = [(lo, min(lo + chunksize, n)) for lo in range(0, n, chunksize)]
+        with KernelPool({'offsets':offsets, 'targets':targets},
+                        workers) as pool:
+            results = pool.map(eccentricity_scan, chunks)
+        ecc = {}
+        for (lo, hi), values in zip(chunks, results):
+            for v in range(lo, hi):
+                e = values[v - lo]
+                ecc[names[v]] = e if e >= 0 else 'infinity'
+        return ecc
+
+    def diameter_radius(self):
+        '''
+        API:
+            diameter_radius(self)
+        Description:
+            Computes exact diameter and radius of an undirected graph by
+            bounding eccentricities (Takes and Kosters, 2011). Every
+            breadth-first search from a node v gives
+            max(d(v,w), ecc(v)-d(v,w)) <= ecc(w) <= ecc(v)+d(v,w)
+            for all nodes w. Nodes whose bounds can not improve the current
+            diameter and radius bounds are removed from the candidate set
+            and searches alternate between the candidate with the largest
+            upper bound and the one with the smallest lower bound. On sparse
+            real world graphs only a handful of searches are needed. Does
+            not change node attributes.
+        Pre:
+            self.graph_type should be UNDIRECTED_GRAPH.
+        Return:
+            Returns (diameter, radius) tuple, ('infinity', 'infinity') if
+            the graph is not connected.
+        '''
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        if n == 0:
+            return 0, 0
+        lower = [0]*n
+        upper = [n]*n
+        candidates = set(range(n))
+        diameter = 0
+        radius = n
+        high = True
+        while candidates:
+            if high:
+                v = max(candidates, key = lambda w: (upper[w],
+                                                     offsets[w+1]-offsets[w]))
+            else:
+                v = min(candidates, key = lambda w: (lower[w],
+                                                     offsets[w]-offsets[w+1]))
+            high = not high
+            dist = bfs_distances(offsets, targets, v)
+            ecc_v = max(dist)
+            if -1 in dist:
+                return 'infinity', 'infinity'
+            diameter = max(diameter, ecc_v)
+            radius = min(radius, ecc_v)
+            removed = []
+            for w in candidates:
+                d = dist[w]
+                if lower[w] < max(d, ecc_v - d):
+                    lower[w] = max(d, ecc_v - d)
+                if upper[w] > ecc_v + d:
+                    upper[w] = ecc_v + d
+                if lower[w] == upper[w]:
+                    diameter = max(diameter, lower[w])
+                    radius = min(radius, upper[w])
+                    removed.append(w)
+            candidates.difference_update(removed)
+            removed = [w for w in candidates
+                       if upper[w] <= diameter and lower[w] >= radius]
+            candidates.difference_update(removed)
+        return diameter, radius
+
+    def diameter_ifub(self):
+        '''
+        API:
+            diameter_ifub(self)
+        Description:
+            Computes exact diameter of an undirected graph with the
+            iterative fringe upper bound (iFUB) algorithm of Crescenzi et
+            al. Two double sweeps (4-sweep), the first one from the highest
+            degree node, find a long path a-b and the search is rooted at
+            the middle node u of it.
+            Fringe levels of u are processed from the farthest one, the
+            largest eccentricity found so far is a lower bound and twice the
+            current level an upper bound of the diameter. Does not change
+            node attributes.
+        Pre:
+            self.graph_type should be UNDIRECTED_GRAPH.
+        Return:
+            Returns diameter of the graph, 'infinity' if the graph is not
+            connected.
+        '''
+        names, index, offsets, targets, weights = self.to_csr()
+        n = len(names)
+        if n == 0:
+            return 0
+        u = max(range(n), key = lambda w: offsets[w+1]-offsets[w])
+        lb = 0
+        # 4-sweep: two double sweeps, each started from the middle node of
+        # the path found by the previous one
+        for sweep in range(2):
+            dist = bfs_distances(offsets, targets, u)
+            if -1 in dist:
+                return 'infinity'
+            a = dist.index(max(dist))
+            dist_a, pred_a = bfs_distances(offsets, targets, a, pred = True)
+            b = dist_a.index(max(dist_a))
+            lb = max(lb, dist_a[b])
+            u = b
+            for k in range(dist_a[b]//2):
+                u = pred_a[u]
+        dist_u = bfs_distances(offsets, targets, u)
+        i = max(dist_u)
+        fringe = [[] for k in range(i+1)]
+        for w in range(n):
+            fringe[dist_u[w]].append(w)
+        lb = max(lb, i)
+        ub = 2*i
+        while ub > lb:
+            b_i = max(max(bfs_distances(offsets, targets, w))
+                      for w in fringe[i])
+            if max(lb, b_i) > 2*(i-1):
+                return max(lb, b_i)
+            lb = max(lb, b_i)
+            ub = 2*(i-1)
+            i -= 1
+        return lb
 
     def create_cluster(self, node_list, cluster_attrs={}, node_attrs={}):
         '''
@@ -3565,6 +6608,809 @@ class DisjointSet(Graph):
         return current
 
 
+class SpatialIndex(object):
+    '''
+    Index of points in the plane for k-nearest-neighbor and radius queries.
+    Uses a k-d tree (scipy.spatial.cKDTree) if SciPy is installed and a
+    uniform grid with about two points per cell otherwise. Used by random()
+    to generate Euclidean graphs.
+    '''
+    def __init__(self, xs, ys):
+        '''
+        API: __init__(self, xs, ys)
+        Description:
+            Constructor. Builds the index of points (xs[i], ys[i]).
+        '''
+        self.n = len(xs)
+        self.xs = list(xs)
+        self.ys = list(ys)
+        self.knn = None
+        self.points = None
+        self.tree = None
+        self.cells = None
+        if self.n == 0:
+            return
+        # cKDTree needs the points in a NumPy array
+        if NUMPY_INSTALLED and SCIPY_INSTALLED:
+            self.points = numpy.column_stack((numpy.asarray(xs, dtype = float),
+                                              numpy.asarray(ys, dtype = float)))
+            self.tree = scipy.spatial.cKDTree(self.points)
+            return
+        self.size = max(1, int((self.n/2)**0.5))
+        self.low_x = min(self.xs)
+        self.low_y = min(self.ys)
+        span = max(max(self.xs) - self.low_x, max(self.ys) - self.low_y)
+        self.width = span/self.size or 1.0
+        self.cells = {}
+        for i in range(self.n):
+            self.cells.setdefault(self.get_cell(self.xs[i], self.ys[i]),
+                                  []).append(i)
+
+    def get_cell(self, x, y):
+        '''
+        API: get_cell(self, x, y)
+        Description:
+            Returns grid cell of point (x, y).
+        '''
+        return (min(int((x - self.low_x)/self.width), self.size - 1),
+                min(int((y - self.low_y)/self.width), self.size - 1))
+
+    def distance(self, i, j):
+        '''
+        API: distance(self, i, j)
+        Description:
+            Returns Euclidean distance between points i and j.
+        '''
+        return (((self.xs[j] - self.xs[i]) ** 2 +
+                 (self.ys[j] - self.ys[i]) ** 2) ** 0.5)
+
+    def prefetch(self, k):
+        '''
+        API: prefetch(self, k)
+        Description:
+            Computes the k nearest neighbors of all points with one query
+            if the index is a k-d tree, so that later nearest() calls with
+            at most k neighbors are lookups.
+        '''
+        if self.tree is not None:
+            k = min(k, self.n)
+            self.knn = self.tree.query(self.points,
+                                       k = k)[1].reshape(self.n, k).tolist()
+
+    def nearest(self, i, k):
+        '''
+        API: nearest(self, i, k)
+        Description:
+            Returns list of the k points closest to point i (including i)
+            in increasing order of distance.
+        '''
+        k = min(k, self.n)
+        if self.knn is not None and len(self.knn[i]) >= k:
+            return self.knn[i][:k]
+        if self.tree is not None:
+            return [int(j) for j in
+                    numpy.atleast_1d(self.tree.query(self.points[i], k = k)[1])]
+        cx, cy = self.get_cell(self.xs[i], self.ys[i])
+        found = []
+        ring = 0
+        while True:
+            for x in range(cx - ring, cx + ring + 1):
+                for y in range(cy - ring, cy + ring + 1):
+                    if max(abs(x - cx), abs(y - cy)) != ring:
+                        continue
+                    for j in self.cells.get((x, y), []):
+                        found.append((self.distance(i, j), j))
+            found.sort()
+            # points not seen yet are farther than ring cells away
+            if ((len(found) >= k and found[k-1][0] <= ring*self.width) or
+                ring > self.size):
+                return [j for (d, j) in found[:k]]
+            ring += 1
+
+    def within(self, i, r):
+        '''
+        API: within(self, i, r)
+        Description:
+            Returns list of points whose distance to point i is at most r.
+        '''
+        if self.tree is not None:
+            return self.tree.query_ball_point(self.points[i], r)
+        cx, cy = self.get_cell(self.xs[i], self.ys[i])
+        reach = int(r/self.width) + 1
+        result = []
+        for x in range(cx - reach, cx + reach + 1):
+            for y in range(cy - reach, cy + reach + 1):
+                for j in self.cells.get((x, y), []):
+                    if self.distance(i, j) <= r:
+                        result.append(j)
+        return result
+
+    def closest(self, i, count, scale_cost):
+        '''
+        API: closest(self, i, count, scale_cost)
+        Description:
+            Returns list of (point, length) tuples of the count points
+            closest to point i (including i) in increasing order of
+            distance, where length is distance times scale_cost rounded to
+            an integer.
+        '''
+        return [(j, round(self.distance(i, j)*scale_cost, 0))
+                for j in self.nearest(i, count)]
+
+
+class IndexedHeap(object):
+    '''
+    Indexed d-ary min-heap of the integers 0,...,size-1. Keeps the position
+    of every item in the heap, so decrease_key() and membership tests are
+    O(log_d(size)) and O(1). Used by the headless algorithm kernels.
+    '''
+    def __init__(self, size, d = 4):
+        '''
+        API:
+            __init__(self, size, d = 4)
+        Description:
+            Class constructor.
+        Input:
+            size: Items are integers in range(size).
+            d: Arity of the heap.
+        '''
+        self.d = d
+        self.heap = []
+        self.key = [None]*size
+        self.position = [-1]*size
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, i):
+        return self.position[i] >= 0
+
+    def get_priority(self, i):
+        '''
+        API:
+            get_priority(self, i)
+        Description:
+            Returns priority of item i, None if i is not in the heap.
+        '''
+        if self.position[i] < 0:
+            return None
+        return self.key[i]
+
+    def push(self, i, priority):
+        '''
+        API:
+            push(self, i, priority)
+        Description:
+            Inserts item i with given priority. Updates the priority if i is
+            already in the heap.
+        '''
+        if self.position[i] >= 0:
+            old = self.key[i]
+            self.key[i] = priority
+            if priority < old:
+                self.sift_up(self.position[i])
+            else:
+                self.sift_down(self.position[i])
+            return
+        self.key[i] = priority
+        self.position[i] = len(self.heap)
+        self.heap.append(i)
+        self.sift_up(len(self.heap)-1)
+
+    def decrease_key(self, i, priority):
+        '''
+        API:
+            decrease_key(self, i, priority)
+        Description:
+            Decreases priority of item i, which should be in the heap.
+        '''
+        self.key[i] = priority
+        self.sift_up(self.position[i])
+
+    def peek(self):
+        '''
+        API:
+            peek(self)
+        Description:
+            Returns (item, priority) tuple of the minimum item without
+            removing it.
+        '''
+        i = self.heap[0]
+        return i, self.key[i]
+
+    def pop(self):
+        '''
+        API:
+            pop(self)
+        Description:
+            Removes and returns (item, priority) tuple of the minimum item.
+        '''
+        heap = self.heap
+        i = heap[0]
+        last = heap.pop()
+        self.position[i] = -1
+        if heap:
+            heap[0] = last
+            self.position[last] = 0
+            self.sift_down(0)
+        return i, self.key[i]
+
+    def sift_up(self, pos):
+        '''
+        API:
+            sift_up(self, pos)
+        Description:
+            Moves item at position pos towards the root until heap order is
+            restored. Should not be called by user directly.
+        '''
+        heap, key, position, d = self.heap, self.key, self.position, self.d
+        i = heap[pos]
+        k = key[i]
+        while pos > 0:
+            parent = (pos-1)//d
+            p = heap[parent]
+            if key[p] <= k:
+                break
+            heap[pos] = p
+            position[p] = pos
+            pos = parent
+        heap[pos] = i
+        position[i] = pos
+
+    def sift_down(self, pos):
+        '''
+        API:
+            sift_down(self, pos)
+        Description:
+            Moves item at position pos towards the leaves until heap order is
+            restored. Should not be called by user directly.
+        '''
+        heap, key, position, d = self.heap, self.key, self.position, self.d
+        size = len(heap)
+        i = heap[pos]
+        k = key[i]
+        while True:
+            first = d*pos + 1
+            if first >= size:
+                break
+            child = first
+            child_key = key[heap[first]]
+            for c in range(first+1, min(first+d, size)):
+                if key[heap[c]] < child_key:
+                    child = c
+                    child_key = key[heap[c]]
+            if k <= child_key:
+                break
+            heap[pos] = heap[child]
+            position[heap[pos]] = pos
+            pos = child
+        heap[pos] = i
+        position[i] = pos
+
+
+class QueryCache(object):
+    '''
+    Bounded least recently used cache of query results of a graph. Keys are
+    tuples (method, args, version) where version is (structure_version,) or
+    (structure_version, attr_version) of the graph when the result was
+    computed, so results of an older version are never returned. See
+    Graph.cached().
+    '''
+    def __init__(self, maxsize = QUERY_CACHE_SIZE):
+        '''
+        API:
+            __init__(self, maxsize = QUERY_CACHE_SIZE)
+        Description:
+            Class constructor.
+        Input:
+            maxsize: Largest number of results kept. Least recently used
+            results are evicted first.
+        '''
+        self.maxsize = maxsize
+        self.data = collections.OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, compute):
+        '''
+        API:
+            get(self, key, compute)
+        Description:
+            Returns cached value of key. Calls compute() and caches the value
+            it returns if key is not in the cache.
+        '''
+        data = self.data
+        if key in data:
+            # move key to the most recently used end
+            value = data.pop(key)
+            data[key] = value
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        if self.maxsize > 0:
+            data[key] = value
+            while len(data) > self.maxsize:
+                data.popitem(last = False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, version):
+        '''
+        API:
+            invalidate(self, version)
+        Description:
+            Removes results that were computed for a version other than
+            version, a (structure_version, attr_version) tuple. Results that
+            do not depend on attributes stay valid while the structure does
+            not change.
+        '''
+        if version == self.version:
+            return
+        self.version = version
+        stale = [key for key in self.data
+                 if key[-1] != version[:len(key[-1])]]
+        for key in stale:
+            del self.data[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        '''
+        API:
+            clear(self)
+        Description:
+            Removes all results, statistics are kept.
+        '''
+        self.data.clear()
+
+    def info(self):
+        '''
+        API:
+            info(self)
+        Description:
+            Returns statistics of the cache.
+        Return:
+            Returns a dictionary with keys 'hits', 'misses', 'hit_rate',
+            'evictions', 'invalidations', 'size' and 'maxsize'.
+        '''
+        lookups = self.hits + self.misses
+        return {'hits':self.hits, 'misses':self.misses,
+                'hit_rate':float(self.hits)/lookups if lookups else 0.0,
+                'evictions':self.evictions,
+                'invalidations':self.invalidations,
+                'size':len(self.data), 'maxsize':self.maxsize}
+
+
+def gnp_pairs(n, p, directed = False, antiparallel = True):
+    '''
+    Generates the node pairs of a G(n,p) random graph with nodes 0,...,n-1
+    using the geometric skip method of Batagelj and Brandes (2005), in
+    O(n + m) time. Instead of drawing a random number per pair, the number
+    of pairs skipped before the next edge is drawn from the geometric
+    distribution. Pairs are (m, n) with n < m if the graph is undirected and
+    are generated in lexicographic order. If antiparallel is False, pairs
+    are distributed as if (m, n) were dropped when (n, m) is generated
+    before it. To keep memory O(1) generated pairs are not stored;
+    undirected pairs are drawn with probability 1-(1-p)^2 and oriented at
+    random instead, so they come in lexicographic order of the larger
+    node. Uses the random module, so results are
+    reproducible with random.seed().
+    '''
+    if p <= 0 or n < 2:
+        return
+    if directed and not antiparallel:
+        # (w, v) with w < v is generated before (v, w), so it is the arc
+        # kept if it is drawn, with probability p/(1-(1-p)^2)
+        low = 1.0/(2.0 - p)
+        for (v, w) in gnp_pairs(n, p*(2.0 - p)):
+            if random.random() < low:
+                yield (w, v)
+            else:
+                yield (v, w)
+        return
+    if directed:
+        total = n*(n-1)
+    else:
+        total = n*(n-1)//2
+    log_q = math.log(1.0 - p) if p < 1 else None
+    k = -1
+    v = 1
+    w = -1
+    while True:
+        if log_q is None:
+            skip = 0
+        else:
+            skip = int(math.log(1.0 - random.random())/log_q)
+        if directed:
+            k += 1 + skip
+            if k >= total:
+                return
+            v, w = divmod(k, n-1)
+            if w >= v:
+                w += 1
+        else:
+            w += 1 + skip
+            while w >= v and v < n:
+                w -= v
+                v += 1
+            if v >= n:
+                return
+        yield (v, w)
+
+def binary_columns(attrs, kind, arrays):
+    '''
+    Used by save_binary(). Appends (name, typecode, values) tuples of
+    numeric attribute columns of attrs (a list of attribute dictionaries)
+    to arrays. A column is numeric if every dictionary has the key and
+    values are all ints that fit in 64 bits or all floats. Returns a tuple
+    (columns, extra), where columns is a list of [key, block name] pairs
+    (keys encoded with binary_encode()) and extra maps positions in attrs
+    to dictionaries of the remaining attributes. Should not be called by
+    user directly.
+    '''
+    keys = set()
+    for a in attrs:
+        keys.update(a)
+    columns = []
+    numeric = set()
+    for key in sorted(keys, key = repr):
+        values = [a.get(key) for a in attrs]
+        if not values:
+            continue
+        if all(type(v) is float for v in values):
+            typecode = 'd'
+        elif all(type(v) is int and -2**63 <= v < 2**63 for v in values):
+            typecode = 'q'
+        else:
+            continue
+        block = '%s:%d' %(kind, len(columns))
+        arrays.append((block, typecode, values))
+        columns.append([binary_encode(key), block])
+        numeric.add(key)
+    extra = {}
+    for i, a in enumerate(attrs):
+        rest = dict((k, v) for (k, v) in a.items() if k not in numeric)
+        if rest:
+            extra[i] = rest
+    return columns, extra
+
+def binary_encode(value):
+    '''
+    Used by save_binary(). Returns value as an object that can be written
+    with json.dumps(). None, bool, int, float and str are kept as they
+    are, other values are dictionaries with a single key that names their
+    type, so that binary_decode() restores tuples, sets, bytes and
+    dictionaries whose keys are not strings. Raises exception for other
+    types, which would need pickling. Should not be called by user
+    directly.
+    '''
+    if value is None or type(value) in (bool, int, float):
+        return value
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return {'bytes':value.hex()}
+    if isinstance(value, tuple):
+        return {'tuple':[binary_encode(v) for v in value]}
+    if isinstance(value, list):
+        return {'list':[binary_encode(v) for v in value]}
+    if isinstance(value, frozenset):
+        return {'frozenset':[binary_encode(v) for v in value]}
+    if isinstance(value, set):
+        return {'set':[binary_encode(v) for v in value]}
+    if isinstance(value, dict):
+        return {'dict':[[binary_encode(k), binary_encode(v)]
+                        for (k, v) in value.items()]}
+    if NUMPY_INSTALLED and isinstance(value, numpy.generic):
+        return binary_encode(value.item())
+    raise Exception('%s values can not be saved in binary format!'
+                    %type(value).__name__)
+
+def binary_decode(value):
+    '''
+    Used by read_binary(). Inverse of binary_encode(). Should not be
+    called by user directly.
+    '''
+    if not isinstance(value, dict):
+        return value
+    (kind, items), = value.items()
+    if kind == 'bytes':
+        return bytes.fromhex(items)
+    if kind == 'dict':
+        return dict((binary_decode(k), binary_decode(v)) for (k, v) in items)
+    items = [binary_decode(v) for v in items]
+    if kind == 'tuple':
+        return tuple(items)
+    if kind == 'frozenset':
+        return frozenset(items)
+    if kind == 'set':
+        return set(items)
+    return items
+
+def read_binary(path, mmap = True):
+    '''
+    Reads a file written by Graph.save_binary() without building a Graph.
+    If mmap is True the file is memory mapped and arrays are views of the
+    mapping, so reading is O(1) in the size of arrays (only node names and
+    the JSON block of other attributes are decoded) and processes that map
+    the same file share physical memory pages. Arrays are NumPy arrays if
+    NumPy is installed and memoryviews otherwise. Returns a dictionary
+    with keys 'attr', 'cluster', 'names' (list of node names), 'offsets',
+    'targets' (CSR of edges), 'in_offsets', 'in_sources', 'in_edges'
+    (reverse CSR, in_edges are positions of edges in CSR order),
+    'node_columns' and 'edge_columns' (dictionaries that map attribute
+    names to arrays aligned with names and CSR edge order), 'node_extra'
+    and 'edge_extra' (other attributes by position).
+    '''
+    with open(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise Exception('%s is not a GiMPy binary file!' %path)
+        size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(size).decode('utf-8'))
+        if header['version'] != BINARY_VERSION:
+            raise Exception('Unknown binary format version %s!'
+                            %header['version'])
+        if header['byteorder'] != sys.byteorder:
+            raise Exception('Binary file has a different byte order!')
+        start = len(BINARY_MAGIC) + 8 + size
+        if mmap:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == start:
+                buf = b''
+            else:
+                buf = mmap_module.mmap(f.fileno(), 0,
+                                       access = mmap_module.ACCESS_READ)
+        else:
+            f.seek(0)
+            buf = f.read()
+    view = memoryview(buf)
+    blocks = {}
+    for (key, typecode, position, length) in header['blocks']:
+        lo = start + position
+        if typecode == 'B':
+            blocks[key] = view[lo:lo+length]
+        elif NUMPY_INSTALLED:
+            dtype = numpy.int64 if typecode == 'q' else numpy.float64
+            blocks[key] = numpy.frombuffer(buf, dtype = dtype,
+                                           count = length//8, offset = lo)
+        else:
+            blocks[key] = view[lo:lo+length].cast(typecode)
+    data = binary_decode(json.loads(bytes(blocks['meta']).decode('utf-8')))
+    # graph type is compared by identity
+    attr = data['attr']
+    if attr.get('type') == DIRECTED_GRAPH:
+        attr['type'] = DIRECTED_GRAPH
+    elif 'type' in attr:
+        attr['type'] = UNDIRECTED_GRAPH
+    for key in ('offsets', 'targets', 'in_offsets', 'in_sources',
+                'in_edges'):
+        data[key] = blocks[key]
+    if header['names'] == 'int':
+        data['names'] = blocks['names'].tolist()
+    else:
+        raw = bytes(blocks['names'])
+        bounds = blocks['name_offsets'].tolist()
+        data['names'] = [raw[bounds[i]:bounds[i+1]].decode('utf-8')
+                         for i in range(len(bounds) - 1)]
+        if header['names'] == 'json':
+            data['names'] = [binary_decode(json.loads(n))
+                             for n in data['names']]
+    for kind in ('node', 'edge'):
+        data[kind + '_columns'] = dict((binary_decode(key), blocks[block])
+                                       for (key, block) in
+                                       header[kind + '_columns'])
+    return data
+
+def sort_edge_order(values):
+    '''
+    Returns the permutation that sorts values in nondecreasing order. Ties
+    keep their original order. Uses numpy.argsort if NumPy is installed.
+    '''
+    if NUMPY_INSTALLED and len(values):
+        return numpy.argsort(numpy.asarray(values),
+                             kind = 'stable').tolist()
+    return sorted(range(len(values)), key = values.__getitem__)
+
+def find_root(parent, i):
+    '''
+    Returns the root of i in the union-find array parent. Uses path
+    halving.
+    '''
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def union_roots(parent, rank, i, j):
+    '''
+    Unites the sets of i and j in the union-find arrays parent and rank.
+    Returns False if they are already in the same set, True otherwise.
+    '''
+    i = find_root(parent, i)
+    j = find_root(parent, j)
+    if i == j:
+        return False
+    if rank[i] < rank[j]:
+        i, j = j, i
+    parent[j] = i
+    if rank[i] == rank[j]:
+        rank[i] += 1
+    return True
+
+def bfs_distances(offsets, targets, s, pred = False):
+    '''
+    Headless breadth-first search on the CSR graph (offsets, targets) from
+    node index s. Returns the list of unweighted distances (-1 for nodes
+    not reachable from s). Returns (distances, predecessors) tuple if pred
+    is True.
+    '''
+    dist = [-1]*(len(offsets) - 1)
+    dist[s] = 0
+    p_list = None
+    if pred:
+        p_list = [-1]*(len(offsets) - 1)
+    frontier = [s]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for v in frontier:
+            for w in targets[offsets[v]:offsets[v+1]]:
+                if dist[w] < 0:
+                    dist[w] = level
+                    next_frontier.append(w)
+                    if pred:
+                        p_list[w] = v
+        frontier = next_frontier
+    if pred:
+        return dist, p_list
+    return dist
+
+def eccentricity_scan(args, data):
+    '''
+    Used by eccentricities() through KernelPool. Returns eccentricities of
+    nodes with indices in range(lo, hi), -1 for nodes that can not reach
+    all other nodes. CSR arrays 'offsets' and 'targets' are read from data.
+    '''
+    lo, hi = args
+    offsets = data['offsets']
+    targets = data['targets']
+    ecc = []
+    for s in range(lo, hi):
+        dist = bfs_distances(offsets, targets, s)
+        ecc.append(-1 if -1 in dist else max(dist))
+    return ecc
+
+def kahn_order(offsets, targets):
+    '''
+    Returns node indices of the CSR graph (offsets, targets) in topological
+    order using Kahn's algorithm. Raises an exception if the graph has a
+    cycle.
+    '''
+    n = len(offsets) - 1
+    in_degree = [0]*n
+    for w in targets:
+        in_degree[w] += 1
+    order = [v for v in range(n) if in_degree[v] == 0]
+    # order is extended while it is iterated, it is also the queue
+    for v in order:
+        for p in range(offsets[v], offsets[v+1]):
+            w = targets[p]
+            in_degree[w] -= 1
+            if in_degree[w] == 0:
+                order.append(w)
+    if len(order) < n:
+        raise Exception('Graph has a cycle!')
+    return order
+
+# data kept in worker processes of the process pools used by the headless
+# kernels, see worker_init()
+WORKER_DATA = {}
+
+def worker_init(data):
+    '''
+    Initializer of the process pools used by the headless kernels. Keeps
+    the read-only arrays of the kernel (a dictionary) in the worker process,
+    so they are sent to each worker once instead of once per task. Should
+    only be called in worker processes.
+    '''
+    WORKER_DATA.clear()
+    WORKER_DATA.update(data)
+
+def worker_call(kernel, args):
+    '''
+    Used by KernelPool. Runs kernel on args and the data kept in the worker
+    process. Should not be called by user directly.
+    '''
+    return kernel(args, WORKER_DATA)
+
+class KernelPool(object):
+    '''
+    Runs headless kernels, functions called as kernel(args, data) where data
+    is a dictionary of read-only arrays. If workers is 1 kernels are called
+    in this process with data as an argument, so concurrent calls from
+    threads do not share any state. Otherwise they are run on a process
+    pool that keeps data in WORKER_DATA of each worker (see worker_init()).
+    '''
+    def __init__(self, data, workers = 1):
+        '''
+        API: __init__(self, data, workers = 1)
+        Description:
+            Starts the process pool if workers is greater than 1.
+        Input:
+            data: Dictionary of read-only arrays given to kernels.
+            workers: Number of processes.
+        '''
+        self.data = data
+        self.pool = None
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers = workers,
+                                            initializer = worker_init,
+                                            initargs = (data,))
+
+    def map(self, kernel, tasks):
+        '''
+        API: map(self, kernel, tasks)
+        Description:
+            Runs kernel on every task.
+        Input:
+            kernel: Module level function called as kernel(args, data).
+            tasks: List of args.
+        Return:
+            Returns list of results in the order of tasks.
+        '''
+        if self.pool is None:
+            return [kernel(args, self.data) for args in tasks]
+        return list(self.pool.map(worker_call, [kernel]*len(tasks), tasks))
+
+    def shutdown(self):
+        '''
+        API: shutdown(self)
+        Description:
+            Shuts the process pool down.
+        '''
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+def boruvka_scan(args, data):
+    '''
+    Used by KernelPool. Scans the edges with numbers in range(lo, hi) and
+    returns a dictionary that maps components to the number of their
+    minimum incident edge. Edges are numbered in sorted order, so the first
+    edge seen is the minimum one. Edge arrays 'tails' and 'heads' are read
+    from data.
+    '''
+    comp, lo, hi = args
+    tails = data['tails']
+    heads = data['heads']
+    best = {}
+    for k in range(lo, hi):
+        cu = comp[tails[k]]
+        cv = comp[heads[k]]
+        if cu == cv:
+            continue
+        if cu not in best:
+            best[cu] = k
+        if cv not in best:
+            best[cv] = k
+    return best
+
+
 if __name__ == '__main__':
     G = Graph(type = UNDIRECTED_GRAPH, splines = 'true', K = 1.5)
     #G.random(numnodes = 20, Euclidean = True, seedInput = 11,
@@ -0,0 +1,156 @@
+'''
+Result objects returned by Graph methods called with store = 'result'. In
+this mode methods do not write node and edge attributes of the graph, the
+values they would write are kept in local dictionaries and returned in
+these objects instead. Dictionaries are keyed by
+node names or edge tuples.
+'''
+from builtins import object
+
+class SearchResult(object):
+    '''
+    Result of Graph.search().
+    Attributes:
+        pred: Predecessor dictionary of the search tree (of the path only if
+        destination is reached).
+        path: List of nodes on the path from source to destination, None if
+        destination is not given or not reached.
+        distance: Dictionary of distances of reached nodes (number of arcs
+        from source for BFS, depth for DFS, path length for Dijkstra, arc
+        cost for Prim).
+        component: Dictionary of component numbers of reached nodes, None
+        if no component number is given.
+    '''
+    def __init__(self, pred, path, distance, component):
+        self.pred = pred
+        self.path = path
+        self.distance = distance
+        self.component = component
+
+
+class DFSResult(object):
+    '''
+    Result of Graph.dfs().
+    Attributes:
+        disc_time: Dictionary of discovery times of reached nodes.
+        finish_time: Dictionary of finish times of reached nodes.
+        pred: Predecessor dictionary of the search tree.
+        component: Dictionary of component numbers of reached nodes, None
+        if no component number is given.
+        disc_count: Discovery time of the last node.
+        finish_count: Finish time of the last node.
+    '''
+    def __init__(self, disc_time, finish_time, pred, component, disc_count,
+                 finish_count):
+        self.disc_time = disc_time
+        self.finish_time = finish_time
+        self.pred = pred
+        self.component = component
+        self.disc_count = disc_count
+        self.finish_count = finish_count
+
+
+class ComponentsResult(object):
+    '''
+    Result of Graph.label_components() and Graph.tarjan().
+    Attributes:
+        component: Dictionary of component numbers of nodes.
+        num_components: Number of components.
+    '''
+    def __init__(self, component, num_components):
+        self.component = component
+        self.num_components = num_components
+
+
+class ShortestPathResult(object):
+    '''
+    Result of Graph.fifo_label_correcting().
+    Attributes:
+        valid: False if a negative cycle is found.
+        pred: Predecessor dictionary, None if valid is False.
+        distance: Dictionary of distances of reached nodes, None if valid is
+        False.
+        cycle: List of nodes of the negative cycle, None if valid is True.
+    '''
+    def __init__(self, valid, pred, distance, cycle):
+        self.valid = valid
+        self.pred = pred
+        self.distance = distance
+        self.cycle = cycle
+
+
+class FlowResult(object):
+    '''
+    Result of Graph.max_flow() and Graph.min_cost_flow().
+    Attributes:
+        flow: Dictionary of arc flows.
+        value: Flow value for max flow, total cost for min cost flow.
+        feasible: False if min cost flow problem is infeasible (flow should
+        be considered as junk then).
+    '''
+    def __init__(self, flow, value, feasible = True):
+        self.flow = flow
+        self.value = value
+        self.feasible = feasible
+
+
+class SolverStep(object):
+    '''
+    Progress of a solver, yielded by Graph.network_simplex_steps(),
+    Graph.max_flow_preflowpush_steps(), Graph.cycle_canceling_steps() and
+    Graph.find_feasible_flow_steps().
+    Attributes:
+        iteration: Number of pivots, pushes or canceled cycles so far.
+        objective: Current flow cost (flow value for max flow), None if no
+        feasible flow is found.
+        done: True for the last step.
+        feasible: False if the problem is infeasible (flow should be
+        considered as junk then).
+        state: Dictionary of details of the last iteration (entering and
+        leaving arcs of a pivot, node that pushed, canceled cycle), empty for
+        the last step.
+    '''
+    def __init__(self, iteration, objective, done, feasible = True,
+                 state = None):
+        self.iteration = iteration
+        self.objective = objective
+        self.done = done
+        self.feasible = feasible
+        if state is None:
+            state = {}
+        self.state = state
+
+
+class BatchResult(FlowResult):
+    '''
+    Result of an instance solved by batch.solve_batch().
+    Attributes:
+        index: Position of the instance in the instances given.
+        flow, value, feasible: See FlowResult.
+        time: Seconds spent by the solver.
+    '''
+    def __init__(self, index, flow, value, feasible, time):
+        FlowResult.__init__(self, flow, value, feasible)
+        self.index = index
+        self.time = time
+
+
+class ParametricFlowResult(object):
+    '''
+    Result of Graph.parametric_max_flow().
+    Attributes:
+        parameters: List of parameters solved.
+        values: List of maximum flow values, one for each parameter.
+        cuts: List of minimum cuts (lists of nodes on the source side) that
+        are minimum for some parameter, nested, smallest first.
+        breakpoints: List of parameters where the minimum cut changes,
+        cuts[i] and cuts[i+1] are both minimum at breakpoints[i].
+        cut_index: List of positions in cuts of the minimum cut of each
+        parameter.
+    '''
+    def __init__(self, parameters, values, cuts, breakpoints, cut_index):
+        self.parameters = parameters
+        self.values = values
+        self.cuts = cuts
+        self.breakpoints = breakpoints
+        self.cut_index = cut_index
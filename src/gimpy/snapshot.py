@@ -0,0 +1,344 @@
+'''
+Immutable snapshots of graphs and concurrent read-only queries on them.
+A Snapshot keeps the structure of a graph and one edge weight in the
+compressed sparse row form of Graph.to_csr(), in tuples, so it can not be
+changed and any number of threads can query it without locks. Queries do
+not write node or edge attributes. VersionedSnapshot publishes a new
+snapshot with a single reference swap, so readers never wait for writers,
+and QueryExecutor runs queries on a thread or process pool against the
+snapshot that is current when they are submitted.
+'''
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+
+from .global_constants import *
+from .graph import Graph, worker_init, WORKER_DATA, bfs_distances
+import threading
+import heapq
+
+# methods of Snapshot that can be run by QueryExecutor
+SNAPSHOT_QUERIES = set(['get_neighbors', 'reachable', 'distances',
+                        'shortest_path'])
+
+class Snapshot(object):
+    '''
+    Immutable structure of a graph. See Graph.snapshot().
+    '''
+    def __init__(self, graph, attr = 'cost', default = 1):
+        '''
+        API: __init__(self, graph, attr = 'cost', default = 1)
+        Description:
+            Constructor. Copies structure of graph and attr attribute of its
+            edges.
+        Input:
+            graph: Graph instance.
+            attr: Edge attribute used as weight by shortest_path() and
+            distances().
+            default: Weight of edges that do not have attr.
+        '''
+        names, index, offsets, targets, weights = graph.to_csr(attr,
+                                                               default = default)
+        self.graph_type = graph.graph_type
+        self.attr = attr
+        self.names = tuple(names)
+        self.index = index
+        self.offsets = tuple(offsets)
+        self.targets = tuple(targets)
+        self.weights = tuple(weights)
+
+    def __getstate__(self):
+        # index is rebuilt from names, it is not sent to worker processes
+        state = dict(self.__dict__)
+        del state['index']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index = dict(zip(self.names, range(len(self.names))))
+
+    def get_node_list(self):
+        '''
+        API: get_node_list(self)
+        Description:
+            Returns list of node names.
+        '''
+        return list(self.names)
+
+    def get_node_num(self):
+        '''
+        API: get_node_num(self)
+        Description:
+            Returns number of nodes.
+        '''
+        return len(self.names)
+
+    def get_neighbors(self, name):
+        '''
+        API: get_neighbors(self, name)
+        Description:
+            Returns list of (out-)neighbors of node name.
+        '''
+        i = self.index[name]
+        return [self.names[j] for j in
+                self.targets[self.offsets[i]:self.offsets[i+1]]]
+
+    def reachable(self, source, destination):
+        '''
+        API: reachable(self, source, destination)
+        Description:
+            Returns True if there is a path from source to destination.
+        '''
+        s = self.index[source]
+        t = self.index[destination]
+        offsets = self.offsets
+        targets = self.targets
+        seen = set([s])
+        stack = [s]
+        while stack:
+            v = stack.pop()
+            if v == t:
+                return True
+            for w in targets[offsets[v]:offsets[v+1]]:
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        return False
+
+    def distances(self, source, weighted = True):
+        '''
+        API: distances(self, source, weighted = True)
+        Description:
+            Returns dictionary of shortest path distances from source to the
+            nodes reachable from it. Uses edge weights if weighted is True,
+            number of edges otherwise.
+        Pre:
+            Weights should be nonnegative.
+        '''
+        if not weighted:
+            dist = bfs_distances(self.offsets, self.targets,
+                                 self.index[source])
+            return dict((self.names[v], dist[v]) for v in range(len(dist))
+                        if dist[v] >= 0)
+        dist, pred = self.dijkstra(self.index[source])
+        return dict((self.names[v], d) for v, d in dist.items())
+
+    def shortest_path(self, source, destination):
+        '''
+        API: shortest_path(self, source, destination)
+        Description:
+            Finds a shortest path from source to destination with Dijkstra's
+            algorithm.
+        Pre:
+            Weights should be nonnegative.
+        Return:
+            Returns tuple (path, distance), path is the list of nodes on the
+            path. Returns (None, None) if destination is not reachable.
+        '''
+        t = self.index[destination]
+        dist, pred = self.dijkstra(self.index[source], t)
+        if t not in dist:
+            return None, None
+        path = [t]
+        while pred[path[-1]] is not None:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return [self.names[v] for v in path], dist[t]
+
+    def dijkstra(self, s, t = None):
+        '''
+        API: dijkstra(self, s, t = None)
+        Description:
+            Dijkstra's algorithm with a binary heap on node indices. Stops
+            when node index t is reached if t is given.
+        Return:
+            Returns (dist, pred) dictionaries of final distances and
+            predecessors (None for s) of node indices.
+        '''
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        dist = {}
+        pred = {s:None}
+        best = {s:0}
+        heap = [(0, s)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if v in dist:
+                continue
+            dist[v] = d
+            if v == t:
+                break
+            for p in range(offsets[v], offsets[v+1]):
+                w = targets[p]
+                nd = d + weights[p]
+                if w not in dist and (w not in best or nd < best[w]):
+                    best[w] = nd
+                    pred[w] = v
+                    heapq.heappush(heap, (nd, w))
+        return dist, pred
+
+
+class VersionedSnapshot(object):
+    '''
+    Holder of the current snapshot of a graph. Readers take the current
+    (version, snapshot) pair without locking, publish() replaces it with a
+    single reference assignment, so readers are never blocked and a reader
+    keeps using the snapshot it took until it is done.
+    '''
+    def __init__(self, snapshot = None):
+        '''
+        API: __init__(self, snapshot = None)
+        Description:
+            Constructor.
+        Input:
+            snapshot: Initial Snapshot or Graph instance.
+        '''
+        self.lock = threading.Lock()
+        self.state = (0, None)
+        if snapshot is not None:
+            self.publish(snapshot)
+
+    def publish(self, snapshot):
+        '''
+        API: publish(self, snapshot)
+        Description:
+            Publishes a new snapshot. If a Graph is given its snapshot is
+            taken (the graph should not be changed by other threads while
+            it is taken). Only writers synchronize with each other.
+        Return:
+            Returns the version number of the published snapshot.
+        '''
+        if isinstance(snapshot, Graph):
+            snapshot = snapshot.snapshot()
+        with self.lock:
+            version = self.state[0] + 1
+            self.state = (version, snapshot)
+        return version
+
+    def current(self):
+        '''
+        API: current(self)
+        Description:
+            Returns the current snapshot.
+        '''
+        return self.state[1]
+
+    def get_version(self):
+        '''
+        API: get_version(self)
+        Description:
+            Returns the version number of the current snapshot.
+        '''
+        return self.state[0]
+
+
+class QueryExecutor(object):
+    '''
+    Runs read-only queries (methods of Snapshot listed in SNAPSHOT_QUERIES)
+    on a thread or process pool.
+    '''
+    def __init__(self, source, workers = 4, processes = False):
+        '''
+        API: __init__(self, source, workers = 4, processes = False)
+        Description:
+            Constructor. Threads share the snapshot. Worker processes get a
+            copy of the snapshot once (see worker_init()), the process pool
+            is replaced when a new version is published.
+        Input:
+            source: Snapshot or VersionedSnapshot instance.
+            workers: Number of threads or processes.
+            processes: Uses a process pool if True, a thread pool otherwise.
+        '''
+        if isinstance(source, Snapshot):
+            source = VersionedSnapshot(source)
+        self.source = source
+        self.workers = workers
+        self.processes = processes
+        self.pool = None
+        self.pool_version = None
+        self.lock = threading.Lock()
+
+    def get_pool(self, version, snapshot):
+        '''
+        API: get_pool(self, version, snapshot)
+        Description:
+            Returns the pool for version. Creates it if it does not exist.
+            Old process pools finish their queries in the background.
+        '''
+        with self.lock:
+            # pools are imported here, only executors need them
+            from concurrent.futures import ThreadPoolExecutor
+            from concurrent.futures import ProcessPoolExecutor
+            if not self.processes:
+                if self.pool is None:
+                    self.pool = ThreadPoolExecutor(max_workers = self.workers)
+                return self.pool
+            if self.pool_version != version:
+                if self.pool is not None:
+                    self.pool.shutdown(wait = False)
+                self.pool = ProcessPoolExecutor(max_workers = self.workers,
+                                                initializer = worker_init,
+                                                initargs = ({'snapshot':
+                                                             snapshot},))
+                self.pool_version = version
+            return self.pool
+
+    def submit(self, method, *args):
+        '''
+        API: submit(self, method, *args)
+        Description:
+            Submits query method(*args) on the current snapshot.
+        Input:
+            method: Name of a Snapshot method in SNAPSHOT_QUERIES.
+            args: Arguments of the method.
+        Return:
+            Returns a concurrent.futures.Future of the result.
+        '''
+        if method not in SNAPSHOT_QUERIES:
+            raise Exception('Unknown snapshot query %s' %str(method))
+        version, snapshot = self.source.state
+        pool = self.get_pool(version, snapshot)
+        if self.processes:
+            return pool.submit(snapshot_query, method, args)
+        return pool.submit(getattr(snapshot, method), *args)
+
+    def map(self, queries):
+        '''
+        API: map(self, queries)
+        Description:
+            Runs queries concurrently.
+        Input:
+            queries: Iterable of tuples (method, arg1, arg2, ...).
+        Return:
+            Returns list of results in the order of queries.
+        '''
+        futures = [self.submit(q[0], *q[1:]) for q in queries]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait = True):
+        '''
+        API: shutdown(self, wait = True)
+        Description:
+            Shuts the pool down.
+        '''
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait = wait)
+            self.pool = None
+            self.pool_version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+
+def snapshot_query(method, args):
+    '''
+    Used by QueryExecutor. Runs query on the snapshot kept in WORKER_DATA of
+    the worker process. Should not be called by user directly.
+    '''
+    return getattr(WORKER_DATA['snapshot'], method)(*args)
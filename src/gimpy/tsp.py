@@ -0,0 +1,442 @@
+'''
+Local search heuristics for the symmetric traveling salesman problem on
+GiMPy graphs. A tour is built by (randomized) nearest neighbor construction
+and improved by 2-opt and Or-opt moves. Moves are only searched among
+candidate neighbor lists taken from the adjacency of the graph (for
+instance k-nearest-neighbor graphs built by Graph.random(Euclidean = True,
+node_selection = 'closest')) and nodes whose neighborhood did not change
+are skipped using don't-look bits, so each pass is close to linear in the
+number of nodes. Restarts can be distributed to a process pool.
+'''
+from __future__ import division
+from __future__ import absolute_import
+from builtins import range
+from builtins import object
+
+from .global_constants import *
+from .graph import KernelPool, NUMPY_INSTALLED
+from collections import deque
+import math
+import random
+
+if NUMPY_INSTALLED:
+    import numpy
+
+# improvements smaller than this are ignored to avoid cycling on round-off
+TSP_TOLERANCE = 1e-10
+
+def solve_tsp(graph, restarts = 1, workers = 1, attr = 'cost',
+              coordinates = ('locationx', 'locationy'), neighbors = 10,
+              seed = 0, or_opt = True):
+    '''
+    API:
+        solve_tsp(graph, restarts = 1, workers = 1, attr = 'cost',
+                  coordinates = ('locationx', 'locationy'), neighbors = 10,
+                  seed = 0, or_opt = True)
+    Description:
+        Finds a good tour visiting all nodes of graph. Each restart builds
+        a randomized nearest neighbor tour and improves it with 2-opt and
+        Or-opt until it is locally optimal. The best tour of all restarts
+        is returned. If every node has the coordinate attributes, distance
+        between two nodes is the Euclidean distance of their coordinates,
+        otherwise it is the attr attribute of the edge between them
+        (infinity if there is no edge).
+    Input:
+        graph: Graph instance, treated as undirected.
+        restarts: Number of restarts, restart 0 uses plain nearest
+        neighbor construction.
+        workers: Number of processes restarts are distributed to.
+        attr: Edge attribute that keeps distances.
+        coordinates: Tuple of node attribute names of x and y coordinates,
+        None to always use edge distances.
+        neighbors: Length of candidate lists (closest neighbors in the
+        graph), None to use all neighbors.
+        seed: Seed of the random number generator of restarts.
+        or_opt: Also applies Or-opt (segment insertion) moves if True.
+    Return:
+        Returns (tour, length) tuple, tour is a list of node names, the
+        edge from its last node to its first node closes the tour.
+    '''
+    data = tsp_data(graph, attr, coordinates, neighbors)
+    names = data.pop('names')
+    if len(names) == 0:
+        return [], 0
+    tasks = [(seed + r, r > 0, or_opt) for r in range(restarts)]
+    with KernelPool(data, workers if restarts > 1 else 1) as pool:
+        results = pool.map(tsp_restart, tasks)
+    length, tour = min(results, key = lambda r: r[0])
+    return [names[v] for v in tour], length
+
+def tsp_data(graph, attr = 'cost', coordinates = ('locationx', 'locationy'),
+             neighbors = 10):
+    '''
+    Used by solve_tsp(). Returns a dictionary that keeps node names,
+    coordinates or edge distances and candidate lists of graph with nodes
+    numbered as in graph.to_csr(). Edges without attr cost 1. Should not
+    be called by user directly.
+    '''
+    names, index, offsets, targets, weights = graph.to_csr(attr, default = 1)
+    n = len(names)
+    xs = None
+    ys = None
+    if coordinates is not None:
+        xs = [graph.get_node_attr(v, coordinates[0]) for v in names]
+        ys = [graph.get_node_attr(v, coordinates[1]) for v in names]
+        if None in xs or None in ys:
+            xs = ys = None
+    cost = None
+    if xs is None:
+        cost = {}
+        for i in range(n):
+            for p in range(offsets[i], offsets[i+1]):
+                j = targets[p]
+                if (i, j) not in cost or weights[p] < cost[(i, j)]:
+                    cost[(i, j)] = cost[(j, i)] = weights[p]
+    data = {'n':n, 'xs':xs, 'ys':ys, 'cost':cost}
+    distance = Tour(data, list(range(n))).distance
+    adjacent = [set() for i in range(n)]
+    for i in range(n):
+        for j in targets[offsets[i]:offsets[i+1]]:
+            if i != j:
+                adjacent[i].add(j)
+                adjacent[j].add(i)
+    candidates = []
+    for i in range(n):
+        closest = sorted(adjacent[i], key = lambda j: distance(i, j))
+        if neighbors is not None:
+            closest = closest[:neighbors]
+        candidates.append(closest)
+    data['candidates'] = candidates
+    data['names'] = names
+    return data
+
+def tsp_restart(args, data):
+    '''
+    Used by solve_tsp() through KernelPool. Runs one restart on data and
+    returns (length, tour) tuple. Should not be called by user directly.
+    '''
+    seed, randomized, or_opt = args
+    rand = random.Random(seed)
+    order = nearest_neighbor_order(data, rand, randomized)
+    tour = Tour(data, order)
+    tour.improve(or_opt)
+    return tour.length(), tour.get_order()
+
+def nearest_neighbor_order(data, rand, randomized = False):
+    '''
+    Used by tsp_restart(). Builds a nearest neighbor tour starting from a
+    random node. Next node is the closest unvisited node in the candidate
+    list of the current node, the second closest one with probability 1/3
+    if randomized is True. If all candidates are visited, the tour jumps to
+    the next unvisited node in a strip ordering of the coordinates (in
+    node order if there are no coordinates), so construction stays linear.
+    Should not be called by user directly.
+    '''
+    n = data['n']
+    candidates = data['candidates']
+    xs = data['xs']
+    ys = data['ys']
+    if xs is not None:
+        # boustrophedon strips of about sqrt(n/2) nodes
+        strips = max(1, int(math.sqrt(n/2)))
+        low, high = min(xs), max(xs)
+        width = (high - low)/strips or 1.0
+        def strip_key(v):
+            s = min(int((xs[v] - low)/width), strips - 1)
+            return (s, ys[v] if s % 2 == 0 else -ys[v])
+        fallback = sorted(range(n), key = strip_key)
+    else:
+        fallback = list(range(n))
+    visited = bytearray(n)
+    current = rand.randrange(n)
+    visited[current] = 1
+    order = [current]
+    pointer = 0
+    while len(order) < n:
+        nxt = None
+        second = None
+        for w in candidates[current]:
+            if not visited[w]:
+                if nxt is None:
+                    nxt = w
+                else:
+                    second = w
+                    break
+        if randomized and second is not None and rand.random() < 1/3:
+            nxt = second
+        if nxt is None:
+            while visited[fallback[pointer]]:
+                pointer += 1
+            nxt = fallback[pointer]
+        visited[nxt] = 1
+        order.append(nxt)
+        current = nxt
+    return order
+
+
+class Tour(object):
+    '''
+    Tour stored as an array of nodes and the positions of the nodes in
+    it. Orientation is not meaningful, a segment reversal reverses the
+    shorter side of the tour. Arrays are NumPy arrays if NumPy is
+    installed so that reversals are vectorized, lists otherwise.
+    '''
+    def __init__(self, data, order):
+        '''
+        API: __init__(self, data, order)
+        Description:
+            Constructor. data is a dictionary created by tsp_data(), order
+            is the list of node numbers in the tour.
+        '''
+        self.n = len(order)
+        self.xs = data['xs']
+        self.ys = data['ys']
+        self.cost = data['cost']
+        self.candidates = data.get('candidates')
+        if NUMPY_INSTALLED:
+            self.tour = numpy.array(order, dtype = numpy.int64)
+            self.pos = numpy.empty(self.n, dtype = numpy.int64)
+            self.pos[self.tour] = numpy.arange(self.n)
+        else:
+            self.tour = list(order)
+            self.pos = [0]*self.n
+            for i, v in enumerate(order):
+                self.pos[v] = i
+
+    def distance(self, i, j):
+        '''
+        API: distance(self, i, j)
+        Description:
+            Returns distance between nodes i and j.
+        '''
+        if self.xs is not None:
+            return math.hypot(self.xs[i] - self.xs[j], self.ys[i] - self.ys[j])
+        return self.cost.get((i, j), float('inf'))
+
+    def succ(self, v):
+        '''
+        API: succ(self, v)
+        Description:
+            Returns the node after v in the tour.
+        '''
+        p = int(self.pos[v]) + 1
+        if p == self.n:
+            p = 0
+        return int(self.tour[p])
+
+    def pred(self, v):
+        '''
+        API: pred(self, v)
+        Description:
+            Returns the node before v in the tour.
+        '''
+        return int(self.tour[int(self.pos[v]) - 1])
+
+    def get_order(self):
+        '''
+        API: get_order(self)
+        Description:
+            Returns list of nodes in tour order.
+        '''
+        return [int(v) for v in self.tour]
+
+    def length(self):
+        '''
+        API: length(self)
+        Description:
+            Returns length of the tour.
+        '''
+        order = self.get_order()
+        return sum(self.distance(order[k-1], order[k])
+                   for k in range(self.n)) if self.n > 1 else 0
+
+    def reverse(self, i, j):
+        '''
+        API: reverse(self, i, j)
+        Description:
+            Reverses the tour segment from position i to position j
+            (wrapping around the end of the array), or its complement if
+            that is shorter.
+        '''
+        n = self.n
+        length = (j - i) % n + 1
+        if 2*length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        if length < 2:
+            return
+        tour = self.tour
+        pos = self.pos
+        if NUMPY_INSTALLED:
+            if i <= j:
+                idx = numpy.arange(i, j + 1)
+            else:
+                idx = numpy.arange(i, i + length) % n
+            segment = tour[idx][::-1]
+            tour[idx] = segment
+            pos[segment] = idx
+        else:
+            for k in range(length//2):
+                a = (i + k) % n
+                b = (j - k) % n
+                tour[a], tour[b] = tour[b], tour[a]
+                pos[tour[a]] = a
+                pos[tour[b]] = b
+
+    def move(self, a, b, c, d):
+        '''
+        API: move(self, a, b, c, d)
+        Description:
+            2-opt move, replaces tour edges (a,b) and (c,d) with (a,c) and
+            (b,d).
+        Pre:
+            b and d are on the same side of a and c respectively (both
+            successors or both predecessors).
+        '''
+        if self.succ(a) == b:
+            self.reverse(int(self.pos[b]), int(self.pos[c]))
+        else:
+            self.reverse(int(self.pos[a]), int(self.pos[d]))
+
+    def improve(self, or_opt = True):
+        '''
+        API: improve(self, or_opt = True)
+        Description:
+            Applies improving 2-opt and Or-opt moves until none is found.
+            Nodes are processed from a queue of nodes whose don't-look bit
+            is off, nodes at the ends of changed edges are put back in the
+            queue.
+        Pre:
+            self.candidates should be set.
+        '''
+        if self.n < 5:
+            return
+        queue = deque(self.get_order())
+        active = bytearray([1])*self.n
+        while queue:
+            a = queue.popleft()
+            active[a] = 0
+            touched = self.two_opt_step(a)
+            if touched is None and or_opt:
+                touched = self.or_opt_step(a)
+            if touched is None:
+                continue
+            for v in touched:
+                if not active[v]:
+                    active[v] = 1
+                    queue.append(v)
+
+    def two_opt_step(self, a):
+        '''
+        API: two_opt_step(self, a)
+        Description:
+            Looks for an improving 2-opt move that removes a tour edge at a
+            and adds an edge from a to one of its candidates. Candidates are
+            sorted by distance, so search stops at the first candidate that
+            is not closer than the removed neighbor. Applies the first
+            improving move found.
+        Return:
+            Returns list of endpoints of changed edges, None if no move is
+            applied.
+        '''
+        distance = self.distance
+        for side in (self.succ, self.pred):
+            b = side(a)
+            d_ab = distance(a, b)
+            for c in self.candidates[a]:
+                d_ac = distance(a, c)
+                if d_ac >= d_ab:
+                    break
+                d = side(c)
+                if c == b or d == a:
+                    continue
+                delta = d_ac + distance(b, d) - d_ab - distance(c, d)
+                if delta < -TSP_TOLERANCE:
+                    self.move(a, b, c, d)
+                    return [a, b, c, d]
+        return None
+
+    def or_opt_step(self, a):
+        '''
+        API: or_opt_step(self, a)
+        Description:
+            Looks for an improving Or-opt move that moves the segment of 1,
+            2 or 3 nodes starting at a (in either direction) between two
+            adjacent nodes, one of which is a candidate of an end of the
+            segment. The move is applied as a sequence of 2-opt moves.
+        Return:
+            Returns list of endpoints of changed edges, None if no move is
+            applied.
+        '''
+        distance = self.distance
+        n = self.n
+        for forward in (True, False):
+            side = self.succ if forward else self.pred
+            other = self.pred if forward else self.succ
+            s1 = a
+            s2 = a
+            segment = [a]
+            for k in range(3):
+                if k > 0:
+                    s2 = side(s2)
+                    segment.append(s2)
+                if len(segment) + 3 > n:
+                    break
+                p0 = other(s1)
+                n0 = side(s2)
+                removed = distance(p0, s1) + distance(s2, n0) - distance(p0, n0)
+                if removed <= TSP_TOLERANCE:
+                    continue
+                for end in (s1, s2):
+                    for c in self.candidates[end]:
+                        d_end = distance(end, c)
+                        if d_end >= removed:
+                            break
+                        if c in segment:
+                            continue
+                        for d in (self.succ(c), self.pred(c)):
+                            if d in segment:
+                                continue
+                            added = min(distance(c, s1) + distance(s2, d),
+                                        distance(c, s2) + distance(s1, d))
+                            if added - distance(c, d) < removed - TSP_TOLERANCE:
+                                self.insert_segment(s1, s2, p0, n0, c, d)
+                                return [p0, n0, s1, s2, c, d]
+        return None
+
+    def insert_segment(self, s1, s2, p0, n0, c, d):
+        '''
+        API: insert_segment(self, s1, s2, p0, n0, c, d)
+        Description:
+            Moves the segment s1...s2 (with p0 before s1 and n0 after s2)
+            between adjacent nodes c and d in the orientation that gives
+            the shorter tour. If (c,d) is next to the segment, (n0, after
+            n0) or (before p0, p0), the segment swaps places with n0 or p0.
+        '''
+        # orient (c,d) the same way as (p0,s1)
+        if (self.succ(p0) == s1) != (self.succ(c) == d):
+            c, d = d, c
+        distance = self.distance
+        keep = distance(c, s1) + distance(s2, d) < \
+               distance(c, s2) + distance(s1, d)
+        if c == n0:
+            # p0 s1..s2 n0 d  ->  p0 n0 s2..s1 d
+            self.move(p0, s1, n0, d)
+            if keep:
+                # -> p0 n0 s1..s2 d
+                self.move(n0, s2, s1, d)
+            return
+        if d == p0:
+            # c p0 s1..s2 n0  ->  c s2..s1 p0 n0
+            self.move(c, p0, s2, n0)
+            if keep:
+                # -> c s1..s2 p0 n0
+                self.move(c, s2, s1, p0)
+            return
+        # p0 s1..s2 n0 .. c d  ->  p0 c .. n0 s2..s1 d
+        self.move(p0, s1, c, d)
+        # -> p0 n0 .. c s2..s1 d
+        self.move(p0, c, n0, s2)
+        if keep:
+            # -> p0 n0 .. c s1..s2 d
+            self.move(c, s2, s1, d)
@@ -0,0 +1,680 @@
+'''
+Read-only views of graphs. A view is a Graph whose adjacency lists and edge
+attributes are computed from the underlying graph when they are accessed,
+so creating a view does not copy adjacency lists and a view always reflects
+the current state of its graph. Views can be given to the methods of Graph
+that do not change the structure of the graph (search, components, flow,
+shortest path methods, etc.). Node objects and edge attribute dictionaries
+are shared with the underlying graph, so attributes written by these methods
+are written to the graph (residual views are the exception, their edge
+attributes are computed). Adding or removing nodes and edges of a view
+raises an exception, except for overlays that keep added nodes and edges
+in a scratch layer. Views are created with Graph.reverse_view(),
+Graph.subgraph_view(), Graph.filtered_view(), Graph.residual_view() and
+Graph.overlay(). Binary views are not views of a
+graph, they read adjacency lists and attributes from the arrays of a binary
+file, see Graph.load_binary().
+'''
+from __future__ import absolute_import
+
+from .global_constants import *
+from .graph import Graph, Node
+import copy
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+class GraphView(Graph):
+    '''
+    Base class of graph views. Keeps the graph and shares its type and
+    nodes, subclasses set neighbors, in_neighbors and edge_attr.
+    '''
+    def __init__(self, graph):
+        '''
+        API: __init__(self, graph)
+        Description:
+            Constructor. Graph.__init__() is not called since the structure
+            comes from graph.
+        Input:
+            graph: Underlying graph, can be a view itself.
+        '''
+        self.graph = graph
+        self.attr = dict(graph.attr)
+        self.name = graph.name
+        self.graph_type = graph.graph_type
+        self.edge_connect_symbol = graph.edge_connect_symbol
+        self.nodes = graph.nodes
+        self.cluster = {}
+        # results are not cached, the underlying graph may change
+        self.structure_version = 0
+        self.attr_version = 0
+        self.cache = None
+        self.simplex_basis = None
+        self.max_flow_state = None
+
+    def read_only(self, *args, **kargs):
+        '''
+        API: read_only(self, *args, **kargs)
+        Description:
+            Raises exception, structure of views can not be changed.
+        '''
+        raise Exception('Graph views are read-only, change the underlying '
+                        'graph instead!')
+
+    add_node = read_only
+    del_node = read_only
+    add_nodes = read_only
+    add_edge = read_only
+    del_edge = read_only
+    add_edges = read_only
+    create_cluster = read_only
+
+
+class ReverseView(GraphView):
+    '''
+    View of a graph with all arcs reversed. See Graph.reverse_view().
+    '''
+    def __init__(self, graph):
+        '''
+        API: __init__(self, graph)
+        Description:
+            Constructor. Out-neighbor lists of the view are the in-neighbor
+            lists of graph and vice versa.
+        '''
+        GraphView.__init__(self, graph)
+        if self.graph_type is DIRECTED_GRAPH:
+            self.neighbors = graph.in_neighbors
+            self.in_neighbors = graph.neighbors
+            self.edge_attr = ReversedEdges(graph.edge_attr)
+        else:
+            self.neighbors = graph.neighbors
+            self.edge_attr = graph.edge_attr
+        self.out_neighbors = self.neighbors
+
+
+class ReversedEdges(Mapping):
+    '''
+    Edge attributes of ReverseView, maps (n,m) to attributes of (m,n).
+    '''
+    def __init__(self, edge_attr):
+        self.edge_attr = edge_attr
+
+    def __getitem__(self, e):
+        return self.edge_attr[(e[1], e[0])]
+
+    def __contains__(self, e):
+        return (e[1], e[0]) in self.edge_attr
+
+    def __iter__(self):
+        for (n, m) in self.edge_attr:
+            yield (m, n)
+
+    def __len__(self):
+        return len(self.edge_attr)
+
+
+class SubgraphView(GraphView):
+    '''
+    View of the subgraph induced by a set of nodes and/or of the edges that
+    satisfy a predicate. See Graph.subgraph_view() and
+    Graph.filtered_view().
+    '''
+    def __init__(self, graph, nodes = None, edge_pred = None):
+        '''
+        API: __init__(self, graph, nodes = None, edge_pred = None)
+        Description:
+            Constructor.
+        Input:
+            graph: Underlying graph.
+            nodes: Iterable of node names in the view, all nodes if None.
+            Names that are not in graph are ignored.
+            edge_pred: Function of (name1, name2, attr) where (name1, name2)
+            is an edge of graph and attr is its attribute dictionary, edge
+            is in the view if it returns True. All edges between nodes of
+            the view are in it if None.
+        '''
+        GraphView.__init__(self, graph)
+        self.edge_pred = edge_pred
+        if nodes is None:
+            self.node_set = None
+        else:
+            self.node_set = set(nodes)
+            # keep the node order of graph
+            self.nodes = dict((n, graph.nodes[n]) for n in graph.neighbors
+                              if n in self.node_set)
+        self.neighbors = FilteredNeighbors(self, graph.neighbors, True)
+        if self.graph_type is DIRECTED_GRAPH:
+            self.in_neighbors = FilteredNeighbors(self, graph.in_neighbors,
+                                                  False)
+        self.out_neighbors = self.neighbors
+        self.edge_attr = FilteredEdges(self)
+
+    def keep(self, e):
+        '''
+        API: keep(self, e)
+        Description:
+            Returns True if edge e of the underlying graph (in the
+            orientation it is stored in edge_attr) is in the view.
+        '''
+        if self.node_set is not None and (e[0] not in self.node_set or
+                                          e[1] not in self.node_set):
+            return False
+        if self.edge_pred is None:
+            return True
+        return self.edge_pred(e[0], e[1], self.graph.edge_attr[e])
+
+    def stored_edge(self, n, m):
+        '''
+        API: stored_edge(self, n, m)
+        Description:
+            Returns the key of edge between n and m in edge_attr of the
+            underlying graph, (n,m) or (m,n) for undirected graphs.
+        '''
+        if (self.graph_type is DIRECTED_GRAPH or
+            (n, m) in self.graph.edge_attr):
+            return (n, m)
+        return (m, n)
+
+
+class FilteredNeighbors(Mapping):
+    '''
+    Neighbor lists of SubgraphView, computed when accessed.
+    '''
+    def __init__(self, view, neighbors, out):
+        self.view = view
+        self.neighbors = neighbors
+        self.out = out
+
+    def __getitem__(self, n):
+        if n not in self.view.nodes:
+            raise KeyError(n)
+        keep = self.view.keep
+        if self.out:
+            stored = self.view.stored_edge
+            return [m for m in self.neighbors[n] if keep(stored(n, m))]
+        return [m for m in self.neighbors[n] if keep((m, n))]
+
+    def __contains__(self, n):
+        return n in self.view.nodes
+
+    def __iter__(self):
+        return iter(self.view.nodes)
+
+    def __len__(self):
+        return len(self.view.nodes)
+
+
+class FilteredEdges(Mapping):
+    '''
+    Edge attributes of SubgraphView. Values are the attribute dictionaries
+    of the underlying graph.
+    '''
+    def __init__(self, view):
+        self.view = view
+
+    def __getitem__(self, e):
+        if e not in self:
+            raise KeyError(e)
+        return self.view.graph.edge_attr[e]
+
+    def __contains__(self, e):
+        return e in self.view.graph.edge_attr and self.view.keep(e)
+
+    def __iter__(self):
+        view = self.view
+        edge_attr = view.graph.edge_attr
+        keep = view.keep
+        if view.node_set is None:
+            for e in edge_attr:
+                if keep(e):
+                    yield e
+            return
+        # visit edges of the view nodes only
+        neighbors = view.graph.neighbors
+        for n in view.nodes:
+            for m in neighbors[n]:
+                if (n, m) in edge_attr and keep((n, m)):
+                    yield (n, m)
+
+    def __len__(self):
+        return sum(1 for e in self)
+
+
+class ResidualView(GraphView):
+    '''
+    Residual graph of a flow. See Graph.residual_view().
+    '''
+    def __init__(self, graph, flow_attr = 'flow'):
+        '''
+        API: __init__(self, graph, flow_attr = 'flow')
+        Description:
+            Constructor.
+        Input:
+            graph: Directed graph, arcs should have 'capacity' and flow_attr
+            attributes.
+            flow_attr: Edge attribute that keeps the flow.
+        '''
+        if graph.graph_type is not DIRECTED_GRAPH:
+            raise Exception('residual graph is defined for directed graphs.')
+        GraphView.__init__(self, graph)
+        self.flow_attr = flow_attr
+        self.neighbors = ResidualNeighbors(self, True)
+        self.in_neighbors = ResidualNeighbors(self, False)
+        self.out_neighbors = self.neighbors
+        self.edge_attr = ResidualEdges(self)
+
+    def residual_neighbors(self, n, out):
+        '''
+        API: residual_neighbors(self, n, out)
+        Description:
+            Returns list of out-neighbors (in-neighbors if out is False) of
+            node n in the residual graph.
+        '''
+        graph = self.graph
+        edge_attr = graph.edge_attr
+        flow = self.flow_attr
+        residual = []
+        for m in graph.neighbors[n]:
+            a = edge_attr[(n, m)]
+            if out and a['capacity'] - a[flow] > 0:
+                residual.append(m)
+            elif not out and a[flow] > 0:
+                residual.append(m)
+        for m in graph.in_neighbors[n]:
+            a = edge_attr[(m, n)]
+            if out and a[flow] > 0:
+                residual.append(m)
+            elif not out and a['capacity'] - a[flow] > 0:
+                residual.append(m)
+        return residual
+
+    def residual_attr(self, n, m):
+        '''
+        API: residual_attr(self, n, m)
+        Description:
+            Returns attributes ('capacity' and 'cost' if the arc has cost)
+            of residual arc (n,m), None if there is no such residual arc.
+        '''
+        edge_attr = self.graph.edge_attr
+        if (n, m) in edge_attr:
+            a = edge_attr[(n, m)]
+            residual = a['capacity'] - a[self.flow_attr]
+            if residual > 0:
+                if 'cost' in a:
+                    return {'capacity':residual, 'cost':a['cost']}
+                return {'capacity':residual}
+        elif (m, n) in edge_attr:
+            a = edge_attr[(m, n)]
+            if a[self.flow_attr] > 0:
+                if 'cost' in a:
+                    return {'capacity':a[self.flow_attr], 'cost':-a['cost']}
+                return {'capacity':a[self.flow_attr]}
+        return None
+
+
+class ResidualNeighbors(Mapping):
+    '''
+    Neighbor lists of ResidualView, computed when accessed.
+    '''
+    def __init__(self, view, out):
+        self.view = view
+        self.out = out
+
+    def __getitem__(self, n):
+        if n not in self.view.nodes:
+            raise KeyError(n)
+        return self.view.residual_neighbors(n, self.out)
+
+    def __contains__(self, n):
+        return n in self.view.nodes
+
+    def __iter__(self):
+        return iter(self.view.nodes)
+
+    def __len__(self):
+        return len(self.view.nodes)
+
+
+class ResidualEdges(Mapping):
+    '''
+    Edge attributes of ResidualView. Values are new dictionaries, changing
+    them does not change the graph.
+    '''
+    def __init__(self, view):
+        self.view = view
+
+    def __getitem__(self, e):
+        a = self.view.residual_attr(e[0], e[1])
+        if a is None:
+            raise KeyError(e)
+        return a
+
+    def __contains__(self, e):
+        return self.view.residual_attr(e[0], e[1]) is not None
+
+    def __iter__(self):
+        edge_attr = self.view.graph.edge_attr
+        flow = self.view.flow_attr
+        for (n, m) in edge_attr:
+            a = edge_attr[(n, m)]
+            if a[flow] > 0:
+                yield (m, n)
+            if a['capacity'] - a[flow] > 0:
+                yield (n, m)
+
+    def __len__(self):
+        return sum(1 for e in self)
+
+
+class OverlayView(GraphView):
+    '''
+    Scratch layer on top of a graph. See Graph.overlay().
+    '''
+    def __init__(self, graph):
+        '''
+        API: __init__(self, graph)
+        Description:
+            Constructor. Nodes and edges added to the overlay are kept in
+            dictionaries of the overlay, the graph is not changed.
+        '''
+        GraphView.__init__(self, graph)
+        self.extra_nodes = {}
+        self.extra_edges = {}
+        self.extra_neighbors = {}
+        self.nodes = OverlayMapping(graph.nodes, self.extra_nodes)
+        self.neighbors = OverlayNeighbors(self, graph.neighbors,
+                                          self.extra_neighbors)
+        if self.graph_type is DIRECTED_GRAPH:
+            self.extra_in_neighbors = {}
+            self.in_neighbors = OverlayNeighbors(self, graph.in_neighbors,
+                                                 self.extra_in_neighbors)
+        self.out_neighbors = self.neighbors
+        self.edge_attr = OverlayMapping(graph.edge_attr, self.extra_edges)
+
+    def unused_name(self, name):
+        '''
+        API: unused_name(self, name)
+        Description:
+            Returns name if there is no node with this name, otherwise
+            returns the first of name_1, name_2, ... that is not used.
+        '''
+        k = 0
+        candidate = name
+        while candidate in self.nodes:
+            k += 1
+            candidate = '%s_%d' %(name, k)
+        return candidate
+
+    def add_node(self, name, **attr):
+        '''
+        API: add_node(self, name, **attr)
+        Description:
+            Adds node to the overlay. See Graph.add_node().
+        Return:
+            Node (a Node class instance) added to the overlay.
+        '''
+        if name in self.nodes:
+            raise MultipleNodeException
+        self.extra_nodes[name] = Node(name, **attr)
+        return self.extra_nodes[name]
+
+    def add_edge(self, name1, name2, **attr):
+        '''
+        API: add_edge(self, name1, name2, **attr)
+        Description:
+            Adds edge to the overlay. See Graph.add_edge().
+        '''
+        if self.check_edge(name1, name2):
+            raise MultipleEdgeException
+        a = copy.deepcopy(DEFAULT_EDGE_ATTRIBUTES)
+        a.update(attr)
+        self.extra_edges[(name1, name2)] = a
+        if name1 not in self.nodes:
+            self.add_node(name1)
+        if name2 not in self.nodes:
+            self.add_node(name2)
+        self.extra_neighbors.setdefault(name1, []).append(name2)
+        if self.graph_type is UNDIRECTED_GRAPH:
+            self.extra_neighbors.setdefault(name2, []).append(name1)
+        else:
+            self.extra_in_neighbors.setdefault(name2, []).append(name1)
+
+
+class OverlayMapping(Mapping):
+    '''
+    Nodes and edge attributes of OverlayView, keys of the overlay followed
+    by keys of the graph.
+    '''
+    def __init__(self, base, extra):
+        self.base = base
+        self.extra = extra
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        return self.base[key]
+
+    def __contains__(self, key):
+        return key in self.extra or key in self.base
+
+    def __iter__(self):
+        for key in self.base:
+            yield key
+        for key in self.extra:
+            yield key
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+
+class OverlayNeighbors(Mapping):
+    '''
+    Neighbor lists of OverlayView, neighbors in the graph followed by
+    neighbors through edges of the overlay.
+    '''
+    def __init__(self, view, base, extra):
+        self.view = view
+        self.base = base
+        self.extra = extra
+
+    def __getitem__(self, n):
+        if n in self.view.extra_nodes:
+            return self.extra.get(n, [])
+        if n in self.extra:
+            return self.base[n] + self.extra[n]
+        return self.base[n]
+
+    def __contains__(self, n):
+        return n in self.view.nodes
+
+    def __iter__(self):
+        return iter(self.view.nodes)
+
+    def __len__(self):
+        return len(self.view.nodes)
+
+
+class BinaryView(GraphView):
+    '''
+    Read-only graph on the arrays of a file written by Graph.save_binary().
+    See Graph.load_binary().
+    '''
+    def __init__(self, data):
+        '''
+        API: __init__(self, data)
+        Description:
+            Constructor. data is a dictionary returned by read_binary().
+            GraphView.__init__() is not called since there is no underlying
+            graph. Node objects and edge attribute dictionaries are built
+            from the arrays when they are accessed first and are kept, so
+            attributes written by methods called on the view are kept.
+            Adjacency lists are built when they are accessed.
+        '''
+        self.graph = None
+        self.data = data
+        self.attr = dict(data['attr'])
+        self.name = self.attr.get('name', 'G')
+        self.graph_type = self.attr.get('type', UNDIRECTED_GRAPH)
+        self.edge_connect_symbol = EDGE_CONNECT_SYMBOL[self.graph_type]
+        self.cluster = data['cluster']
+        self.structure_version = 0
+        self.attr_version = 0
+        self.cache = None
+        self.simplex_basis = None
+        self.max_flow_state = None
+        self.names = data['names']
+        # maps names to positions, built on first lookup by name
+        self.index = None
+        self.nodes = BinaryNodes(self)
+        self.neighbors = BinaryNeighbors(self, True)
+        if self.graph_type is DIRECTED_GRAPH:
+            self.in_neighbors = BinaryNeighbors(self, False)
+        self.out_neighbors = self.neighbors
+        self.edge_attr = BinaryEdges(self)
+
+    def position(self, name):
+        '''
+        API: position(self, name)
+        Description:
+            Returns position of node name in the arrays, None if there is
+            no such node.
+        '''
+        if self.index is None:
+            self.index = dict(zip(self.names, range(len(self.names))))
+        return self.index.get(name)
+
+    def edge_position(self, name1, name2):
+        '''
+        API: edge_position(self, name1, name2)
+        Description:
+            Returns position of edge (name1, name2) in CSR order, None if
+            there is no such edge. Takes time linear in the out-degree of
+            name1.
+        '''
+        i = self.position(name1)
+        j = self.position(name2)
+        if i is None or j is None:
+            return None
+        lo, hi = self.data['offsets'][i:i+2].tolist()
+        targets = self.data['targets'][lo:hi].tolist()
+        if j not in targets:
+            return None
+        return lo + targets.index(j)
+
+    def values(self, columns, extra, p):
+        '''
+        API: values(self, columns, extra, p)
+        Description:
+            Returns attribute dictionary of node (edge) at position p.
+        '''
+        a = dict((k, c[p:p+1].tolist()[0]) for (k, c) in columns.items())
+        if p in extra:
+            a.update(extra[p])
+        return a
+
+
+class BinaryNodes(Mapping):
+    '''
+    Nodes of BinaryView, Node objects are built when they are accessed
+    first.
+    '''
+    def __init__(self, view):
+        self.view = view
+        self.built = {}
+
+    def __getitem__(self, name):
+        node = self.built.get(name)
+        if node is None:
+            p = self.view.position(name)
+            if p is None:
+                raise KeyError(name)
+            node = Node(name)
+            node.attr.update(self.view.values(
+                self.view.data['node_columns'], self.view.data['node_extra'],
+                p))
+            self.built[name] = node
+        return node
+
+    def __contains__(self, name):
+        return self.view.position(name) is not None
+
+    def __iter__(self):
+        return iter(self.view.names)
+
+    def __len__(self):
+        return len(self.view.names)
+
+
+class BinaryNeighbors(Mapping):
+    '''
+    Neighbor lists of BinaryView, read from the CSR arrays (out is True) or
+    the reverse CSR arrays (out is False). Neighbors in undirected graphs
+    are read from both.
+    '''
+    def __init__(self, view, out):
+        self.view = view
+        self.out = out
+
+    def __getitem__(self, n):
+        i = self.view.position(n)
+        if i is None:
+            raise KeyError(n)
+        data = self.view.data
+        names = self.view.names
+        result = []
+        if self.out:
+            lo, hi = data['offsets'][i:i+2].tolist()
+            result = [names[j] for j in data['targets'][lo:hi].tolist()]
+        if not self.out or self.view.graph_type is UNDIRECTED_GRAPH:
+            lo, hi = data['in_offsets'][i:i+2].tolist()
+            result.extend(names[j] for j in
+                          data['in_sources'][lo:hi].tolist())
+        return result
+
+    def __contains__(self, n):
+        return self.view.position(n) is not None
+
+    def __iter__(self):
+        return iter(self.view.names)
+
+    def __len__(self):
+        return len(self.view.names)
+
+
+class BinaryEdges(Mapping):
+    '''
+    Edge attributes of BinaryView, dictionaries are built when they are
+    accessed first.
+    '''
+    def __init__(self, view):
+        self.view = view
+        self.built = {}
+
+    def __getitem__(self, e):
+        a = self.built.get(e)
+        if a is None:
+            p = self.view.edge_position(e[0], e[1])
+            if p is None:
+                raise KeyError(e)
+            a = self.built[e] = self.view.values(
+                self.view.data['edge_columns'], self.view.data['edge_extra'],
+                p)
+        return a
+
+    def __contains__(self, e):
+        return (e in self.built or
+                self.view.edge_position(e[0], e[1]) is not None)
+
+    def __iter__(self):
+        data = self.view.data
+        names = self.view.names
+        offsets = data['offsets'].tolist()
+        targets = data['targets']
+        for i in range(len(names)):
+            n = names[i]
+            for j in targets[offsets[i]:offsets[i+1]].tolist():
+                yield (n, names[j])
+
+    def __len__(self):
+        return len(self.view.data['targets'])
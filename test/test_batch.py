@@ -0,0 +1,38 @@
+'''
+tests if solve_batch() solves min cost flow and max flow instances on a
+process pool with the costs and flow values of the methods of Graph and if
+every instance is reported once.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import netgen
+from gimpy.batch import solve_batch
+from test_steps import flow_network
+
+if __name__=='__main__':
+    instances = [netgen(20, 60, sources = 2, sinks = 2, seed = seed)
+                 for seed in range(40)]
+    costs = [g.min_cost_flow(store = 'result').value for g in instances]
+    networks = [(flow_network(seed, 20, 60), 0, 19) for seed in range(40)]
+    values = [g.max_flow(s, t, store = 'result').value
+              for (g, s, t) in networks]
+    print('Algo'.ljust(16), 'Solved'.ljust(7), 'Time')
+    for algo in ['simplex', 'cycle_canceling', 'DFS', 'FIFO']:
+        if algo in ['simplex', 'cycle_canceling']:
+            expected = costs
+            g = instances[0]
+            batch = solve_batch(instances, algo, workers = 2, chunksize = 8)
+        else:
+            expected = values
+            g = networks[0][0]
+            batch = solve_batch(networks, algo, workers = 2, chunksize = 8)
+        results = sorted(batch, key = lambda r: r.index)
+        print(algo.ljust(16), str(len(results)).ljust(7),
+              '%.3f' %sum(r.time for r in results))
+        if [r.index for r in results] != list(range(40)):
+            raise Exception('Instances are missing or repeated!')
+        if [r.value for r in results] != expected:
+            raise Exception('Batch result does not match the solver!')
+        if set(results[0].flow) != set(g.get_edge_list()):
+            raise Exception('Flows are not keyed by arcs of the instance!')
@@ -0,0 +1,106 @@
+'''
+tests if graphs saved with save_binary() are loaded back with the same
+nodes, edges and attributes (numeric columns, big ints, keys that are not
+strings, containers, names that are not strings), with and without memory
+mapping, NumPy and binary views, and if a max flow on a binary view agrees
+with the loaded graph.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH, UNDIRECTED_GRAPH, netgen
+import gimpy.graph
+import os
+import tempfile
+
+def same(h, g):
+    if h.attr != g.attr or h.cluster != g.cluster:
+        return False
+    if sorted(h.get_node_list(), key = repr) != \
+       sorted(g.get_node_list(), key = repr):
+        return False
+    for n in g.get_node_list():
+        if h.get_node(n).attr != g.get_node(n).attr:
+            return False
+        if sorted(h.neighbors[n], key = repr) != \
+           sorted(g.neighbors[n], key = repr):
+            return False
+        if (g.graph_type is DIRECTED_GRAPH and
+            sorted(h.in_neighbors[n], key = repr) !=
+            sorted(g.in_neighbors[n], key = repr)):
+            return False
+    if sorted(h.edge_attr, key = repr) != sorted(g.edge_attr, key = repr):
+        return False
+    for e in g.edge_attr:
+        a = h.edge_attr[e]
+        if a != g.edge_attr[e]:
+            return False
+        if any(type(a[k]) is not type(v) for k, v in g.edge_attr[e].items()):
+            return False
+    return True
+
+def flow_value(g, source):
+    return sum(g.edge_attr[(source, m)]['flow'] for m in g.neighbors[source])
+
+def round_trip(g):
+    handle, path = tempfile.mkstemp(suffix = '.gimpy')
+    os.close(handle)
+    try:
+        g.save_binary(path)
+        for numpy_installed in (True, False):
+            gimpy.graph.NUMPY_INSTALLED = numpy_installed
+            for mmap in (True, False):
+                for view in (False, True):
+                    h = Graph.load_binary(path, mmap, view)
+                    if not same(h, g):
+                        raise Exception('Binary round trip changed the graph!')
+            gimpy.graph.NUMPY_INSTALLED = True
+    finally:
+        os.remove(path)
+
+if __name__=='__main__':
+    g = Graph(type = DIRECTED_GRAPH, name = 'mixed')
+    for n in range(6):
+        g.add_node(n, weight = n*0.5, count = n)
+    g.get_node(0).attr[3] = 'int key'
+    g.get_node(1).attr['big'] = 2**70
+    g.get_node(2).attr['tags'] = set(['a', 'b'])
+    g.add_edge(0, 1, cost = 2**70, capacity = 1.5, pair = (1, 'x'))
+    g.add_edge(1, 2, cost = 3, capacity = 2.5, pair = None)
+    g.add_edge(2, 0, cost = -4, capacity = 0.5, pair = [1, 2])
+    g.add_edge(3, 4, cost = 5, capacity = 1.0, pair = {(1, 2):b'raw'})
+    g.add_edge(4, 3, cost = 6, capacity = 2, pair = True)
+    g.create_cluster([0, 1], {'label':'c'})
+    round_trip(g)
+    # string names, tuple names and an undirected graph
+    for names in (['a', 'b', 'c', 'd'], [('a', 1), ('b', 2), 3, 'd']):
+        g = Graph(type = UNDIRECTED_GRAPH)
+        for i in range(len(names)):
+            for j in range(i):
+                g.add_edge(names[i], names[j], cost = i*j)
+        round_trip(g)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_edge(0, 1, cost = object())
+    try:
+        g.save_binary(os.devnull)
+    except Exception:
+        pass
+    else:
+        raise Exception('Object attribute saved!')
+    # algorithms run on binary views
+    g = netgen(nodes = 60, arcs = 300, sources = 1, sinks = 1,
+               supply = 100, seed = 1)
+    handle, path = tempfile.mkstemp(suffix = '.gimpy')
+    os.close(handle)
+    try:
+        g.save_binary(path)
+        source = [n for n in g.nodes if g.get_node(n).attr['demand'] > 0][0]
+        sink = [n for n in g.nodes if g.get_node(n).attr['demand'] < 0][0]
+        g.max_flow(source, sink)
+        view = Graph.load_binary(path, view = True)
+        view.max_flow(source, sink)
+        if flow_value(view, source) != flow_value(g, source):
+            raise Exception('Max flow on binary view is wrong!')
+    finally:
+        os.remove(path)
+    print('binary ok')
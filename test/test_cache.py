@@ -0,0 +1,93 @@
+'''
+tests if cached results of search() with Dijkstra, get_degrees(),
+get_diameter() and page_rank() match freshly computed ones while the graph
+is changed, if the query cache counts hits and stays bounded, if results
+can be modified by callers and if direct edge_attr changes are seen when
+caching is off.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, UNDIRECTED_GRAPH, netgen
+import random
+
+def uncached(g, source):
+    cache = g.cache
+    g.cache = None
+    values = (g.search(source, algo = 'Dijkstra', store = 'result').distance,
+              g.get_degrees(), g.page_rank())
+    g.cache = cache
+    return values
+
+def cached(g, source):
+    return (g.search(source, algo = 'Dijkstra', store = 'result').distance,
+            g.get_degrees(), g.page_rank())
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Match'.ljust(6), 'Hit rate')
+    for seed in range(5):
+        rand = random.Random(seed)
+        g = netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+        g.enable_cache()
+        source = g.get_node_list()[0]
+        match = True
+        for step in range(10):
+            for _ in range(3):
+                match = match and cached(g, source) == uncached(g, source)
+            u, v = rand.choice(g.get_edge_list())
+            if step % 2:
+                g.set_edge_attr(u, v, 'cost', rand.randint(1, 100))
+            else:
+                g.del_edge((u, v))
+        info = g.cache_info()
+        print(str(seed).ljust(5), str(match).ljust(6),
+              '%.2f' %info['hit_rate'])
+        # Dijkstra misses once per version (10), degrees and page-rank once
+        # per structure version (6), cost changes do not invalidate them
+        if not match or info['hits'] != 68 or info['misses'] != 22:
+            raise Exception('Cached result does not match the graph!')
+    g = Graph(type = UNDIRECTED_GRAPH)
+    g.enable_cache()
+    for i in range(10):
+        g.add_edge(i, i+1, cost = 1)
+    if g.get_diameter() != 10 or g.get_diameter() != 10:
+        raise Exception('Wrong diameter!')
+    g.add_edge(0, 10, cost = 1)
+    if g.get_diameter() != 5 or g.cache_info()['hits'] != 1:
+        raise Exception('Diameter is not recomputed after change!')
+    g.cache.maxsize = 4
+    for i in range(10):
+        g.search(i, algo = 'Dijkstra', store = 'result')
+    if len(g.cache) != 4 or g.cache_info()['evictions'] != 7:
+        raise Exception('Cache is not bounded!')
+    # callers get copies of cached results
+    g.clear_cache()
+    a = g.search(0, algo = 'Dijkstra', store = 'result')
+    a.distance[2] = 99
+    a.pred.clear()
+    degrees = g.get_degrees()
+    degrees[0] = 99
+    b = g.search(0, algo = 'Dijkstra', store = 'result')
+    if (a is b or b.distance[2] != 2 or not b.pred or
+        g.get_degrees()[0] != 2 or g.cache_info()['hits'] < 2):
+        raise Exception('Cached result is modified by a caller!')
+    # direct edge_attr changes are seen without the cache
+    g = Graph(type = UNDIRECTED_GRAPH)
+    if g.cache is not None:
+        raise Exception('Caching is not opt-in!')
+    g.add_edge(0, 1, cost = 1)
+    g.add_edge(1, 2, cost = 1)
+    g.add_edge(0, 2, cost = 5)
+    if g.search(0, algo = 'Dijkstra', store = 'result').distance[2] != 2:
+        raise Exception('Wrong Dijkstra distance!')
+    g.edge_attr[(0, 2)]['cost'] = 0
+    if g.search(0, algo = 'Dijkstra', store = 'result').distance[2] != 0:
+        raise Exception('Direct edge_attr change is not seen!')
+    # with the cache they are seen after clear_cache()
+    g.enable_cache()
+    g.search(0, algo = 'Dijkstra', store = 'result')
+    g.edge_attr[(0, 2)]['cost'] = 3
+    g.clear_cache()
+    if g.search(0, algo = 'Dijkstra', store = 'result').distance[2] != 2:
+        raise Exception('Cache is not cleared!')
+    print('cache ok')
@@ -0,0 +1,62 @@
+'''
+tests critical_path() on a small project with known earliest and latest
+start times and slacks, and dag_paths() shortest and longest paths against
+label correcting (Bellman-Ford) on random DAGs.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH
+import random
+
+def project(lag = 0):
+    g = Graph(type = DIRECTED_GRAPH)
+    for task, duration in [('A', 3), ('B', 2), ('C', 4), ('D', 2), ('E', 3)]:
+        g.add_node(task, duration = duration)
+    for u, v in [('A', 'C'), ('A', 'D'), ('B', 'D'), ('C', 'E')]:
+        g.add_edge(u, v, lag = 0)
+    g.add_edge('D', 'E', lag = lag)
+    return g
+
+def random_dag(seed, n = 30, m = 80):
+    rand = random.Random(seed)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(range(n))
+    while len(g.edge_attr) < m:
+        u, v = sorted(rand.sample(range(n), 2))
+        if (u, v) not in g.edge_attr:
+            g.add_edge(u, v, cost = rand.randint(-5, 10))
+    return g
+
+if __name__=='__main__':
+    earliest, latest, slack, length, path = project().critical_path()
+    if (earliest != {'A':0, 'B':0, 'C':3, 'D':3, 'E':7} or
+        latest != {'A':0, 'B':3, 'C':3, 'D':5, 'E':7} or
+        slack != {'A':0, 'B':3, 'C':0, 'D':2, 'E':0} or
+        length != 10 or path != ['A', 'C', 'E']):
+        raise Exception('Wrong critical path schedule!')
+    earliest, latest, slack, length, path = project(1).critical_path(
+        lag = 'lag')
+    if latest['D'] != 4 or slack['D'] != 1 or length != 10:
+        raise Exception('Lags are not taken into account!')
+    for seed in range(10):
+        g = random_dag(seed)
+        order = dict((n, k) for k, n in enumerate(g.topological_sort()))
+        if any(order[u] > order[v] for u, v in g.edge_attr):
+            raise Exception('Not a topological order!')
+        sources = [0, 5]
+        shortest = g.dag_paths(sources)
+        longest = g.dag_paths(sources, longest = True)
+        expected = dict((s, g.fifo_label_correcting(s, store = 'result'))
+                        for s in sources)
+        for u, v in g.edge_attr:
+            g.set_edge_attr(u, v, 'cost', -g.get_edge_attr(u, v, 'cost'))
+        negated = dict((s, g.fifo_label_correcting(s, store = 'result'))
+                       for s in sources)
+        for s in sources:
+            if shortest[s][0] != expected[s].distance:
+                raise Exception('Wrong shortest DAG paths!')
+            if longest[s][0] != dict((n, -d) for n, d in
+                                     negated[s].distance.items()):
+                raise Exception('Wrong longest DAG paths!')
+    print('dag paths ok')
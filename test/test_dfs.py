@@ -0,0 +1,70 @@
+'''
+tests if the iterative dfs() and the headless depth_first_order() give the
+same discovery and finish times and a valid topological order, and if
+Kosaraju and Tarjan strongly connected components agree.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH
+import random
+
+def random_dag(seed, n = 40, m = 100):
+    rand = random.Random(seed)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(rand.sample(range(n), n))
+    while len(g.edge_attr) < m:
+        u, v = sorted(rand.sample(range(n), 2))
+        if (u, v) not in g.edge_attr:
+            g.add_edge(u, v)
+    return g
+
+def check_times(g):
+    names, disc, finish, pred, order, tree = g.depth_first_order()
+    topological_order = []
+    disc_count, finish_count = 0, 1
+    for n in names:
+        if g.get_node_attr(n, 'disc_time') is None:
+            disc_count, finish_count = g.dfs(n, disc_count, finish_count,
+                                             topological_order)
+    for k, n in enumerate(names):
+        if (g.get_node_attr(n, 'disc_time') != disc[k] or
+            g.get_node_attr(n, 'finish_time') != finish[k]):
+            raise Exception('dfs() and depth_first_order() times differ!')
+    if topological_order != [names[k] for k in order]:
+        raise Exception('dfs() and depth_first_order() orders differ!')
+    return topological_order
+
+if __name__=='__main__':
+    for seed in range(10):
+        g = random_dag(seed)
+        position = dict((n, k) for k, n in enumerate(check_times(g)))
+        for u, v in g.edge_attr:
+            if position[u] > position[v]:
+                raise Exception('Not a topological order!')
+        # add arcs that close cycles
+        rand = random.Random(seed)
+        for _ in range(5):
+            u, v = sorted(rand.sample(range(40), 2))
+            if (v, u) not in g.edge_attr and (u, v) not in g.edge_attr:
+                g.add_edge(v, u)
+        tarjan = g.strong_components()[0]
+        kosaraju = g.strong_components(algo = 'Kosaraju')[0]
+        nl = g.get_node_list()
+        pairs = set(zip(tarjan, kosaraju))
+        if (len(pairs) != len(set(tarjan)) or
+            len(pairs) != len(set(kosaraju))):
+            raise Exception('Kosaraju and Tarjan components differ!')
+        comp = dict(zip(nl, kosaraju))
+        for u, v in g.edge_attr:
+            if comp[u] > comp[v]:
+                raise Exception('Kosaraju components are not in '
+                                'topological order!')
+    # iterative search is not limited by recursion depth
+    g = Graph(type = DIRECTED_GRAPH)
+    for i in range(20000):
+        g.add_edge(i, i + 1)
+    g.dfs(0)
+    if g.get_node_attr(20000, 'disc_time') != 20001:
+        raise Exception('Deep search failed!')
+    print('dfs ok')
@@ -0,0 +1,49 @@
+'''
+tests if DIMACS files written by write_dimacs are read back by read_dimacs
+and the min cost flow solution of the graph read is the same, and if max
+flow problems are read back with their source, sink and max flow value.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import netgen, read_dimacs, write_dimacs
+from test_steps import flow_network
+import io
+
+def flow_cost(g):
+    return sum(g.get_edge_attr(u, v, 'flow')*g.get_edge_attr(u, v, 'cost')
+               for (u, v) in g.get_edge_list())
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Original'.ljust(9), 'Read')
+    for seed in range(5):
+        g = netgen(30, 80, sources = 3, sinks = 4, supply = 200, seed = seed)
+        f = io.StringIO()
+        write_dimacs(g, f)
+        f.seek(0)
+        h = read_dimacs(f)
+        if h.get_edge_num() != g.get_edge_num():
+            raise Exception('Number of arcs do not match!')
+        g.min_cost_flow()
+        h.min_cost_flow()
+        print(str(seed).ljust(5), str(flow_cost(g)).ljust(9), flow_cost(h))
+        if flow_cost(g) != flow_cost(h):
+            raise Exception('Optimal costs do not match!')
+    # max flow problem, nodes 0,...,29 are numbered 1,...,30
+    for seed in range(3):
+        g = flow_network(seed)
+        f = io.StringIO()
+        number = write_dimacs(g, f, 'max', source = 0, sink = 29)
+        lines = f.getvalue().splitlines()
+        if ('n %d s' %number[0] not in lines or
+            'n %d t' %number[29] not in lines):
+            raise Exception('Source and sink lines are missing!')
+        f.seek(0)
+        h, source, sink = read_dimacs(f)
+        if (number[0], number[29]) != (1, 30) or (source, sink) != (1, 30):
+            raise Exception('Source and sink are not read back!')
+        if h.get_edge_num() != g.get_edge_num():
+            raise Exception('Number of arcs do not match!')
+        if (h.max_flow(source, sink, store = 'result').value !=
+            g.max_flow(0, 29, store = 'result').value):
+            raise Exception('Max flow values do not match!')
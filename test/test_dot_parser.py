@@ -0,0 +1,28 @@
+'''
+tests if DOT output of to_string is read back by read_dot into a graph with
+the same DOT output.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, read_dot, DIRECTED_GRAPH, UNDIRECTED_GRAPH
+import io
+
+if __name__=='__main__':
+    print('Type'.ljust(8), 'Seed'.ljust(5), 'Nodes'.ljust(6), 'Edges')
+    for graph_type in (DIRECTED_GRAPH, UNDIRECTED_GRAPH):
+        for seed in range(5):
+            g = Graph(type = graph_type, splines = 'true')
+            g.random(numnodes = 20, degree_range = (1, 4),
+                     length_range = (1, 50), seedInput = seed,
+                     Euclidean = True)
+            if graph_type is DIRECTED_GRAPH:
+                g.create_cluster(g.get_node_list()[:5], {'label':'first'},
+                                 {'shape':'box'})
+            s = g.to_string()
+            # small chunks to split tokens between chunks
+            h = read_dot(io.StringIO(s), chunksize = 16)
+            print(graph_type.ljust(8), str(seed).ljust(5),
+                  str(h.get_node_num()).ljust(6), h.get_edge_num())
+            if h.to_string() != s:
+                raise Exception('DOT output of graph read does not match!')
@@ -0,0 +1,28 @@
+'''
+tests if eccentricities() agrees with the bounding diameter and radius
+computation and with iFUB, and if eccentricities() on a process pool gives
+the same values.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph
+
+if __name__=='__main__':
+    graphs = []
+    for seed in range(6):
+        g = Graph()
+        g.random(numnodes = 80 + 20*seed, density = 0.05, seedInput = seed)
+        graphs.append(g)
+    expected = [g.eccentricities() for g in graphs]
+    for g, ecc in zip(graphs, expected):
+        values = list(ecc.values())
+        if 'infinity' in values:
+            continue
+        if (max(values), min(values)) != g.diameter_radius():
+            raise Exception('Bounding diameter/radius is wrong!')
+        if max(values) != g.diameter_ifub():
+            raise Exception('iFUB diameter is wrong!')
+    if graphs[0].eccentricities(workers = 2, chunksize = 8) != expected[0]:
+        raise Exception('Eccentricities on a process pool are wrong!')
+    print('eccentricities ok')
@@ -0,0 +1,77 @@
+'''
+tests if from_edgelist() reads the same graph as add_edge() calls with
+header rows, given columns, skipped columns, dtypes, chunk sizes that do
+and do not divide the number of rows, and with and without NumPy.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH
+import gimpy.graph
+import io
+import random
+
+def same(h, g):
+    if sorted(h.get_node_list()) != sorted(g.get_node_list()):
+        return False
+    if sorted(h.get_edge_list()) != sorted(g.get_edge_list()):
+        return False
+    for e in g.edge_attr:
+        a = h.edge_attr[e]
+        if a != g.edge_attr[e]:
+            return False
+        if any(type(a[k]) is not type(v) for k, v in g.edge_attr[e].items()):
+            return False
+    return True
+
+if __name__=='__main__':
+    random.seed(0)
+    g = Graph(type = DIRECTED_GRAPH)
+    rows = []
+    for k in range(100):
+        u = random.randint(0, 30)
+        v = random.randint(0, 30)
+        if u == v or (u, v) in g.edge_attr:
+            continue
+        cost = random.randint(-5, 20)
+        capacity = random.random()*10
+        g.add_edge(u, v, cost = cost, capacity = capacity)
+        rows.append('%d,%d,%d,%r,x%d' %(u, v, cost, capacity, k))
+    m = len(rows)
+    text = '\n'.join(rows) + '\n'
+    dtypes = {'tail':int, 'cost':int, 'capacity':float}
+    for numpy_installed in (True, False):
+        gimpy.graph.NUMPY_INSTALLED = numpy_installed
+        for chunksize in (1, 7, m - 1, m, m + 1):
+            # header row names the columns
+            h = Graph.from_edgelist(
+                io.StringIO('tail, head, cost, capacity, note\n' + text),
+                dtypes = dict(dtypes, note = str), chunksize = chunksize,
+                type = DIRECTED_GRAPH)
+            if h.get_edge_num() != m or not all(
+                h.edge_attr[e]['note'].startswith('x') for e in h.edge_attr):
+                raise Exception('Edge list with header is wrong!')
+            for e in h.edge_attr:
+                del h.edge_attr[e]['note']
+            if not same(h, g):
+                raise Exception('Edge list with header is wrong!')
+            # columns given, header skipped, note column dropped
+            h = Graph.from_edgelist(
+                io.StringIO('t,h,c,cap,n\n' + text),
+                columns = ['tail', 'head', 'cost', 'capacity', None],
+                dtypes = dtypes, chunksize = chunksize, header = True,
+                type = DIRECTED_GRAPH)
+            if not same(h, g):
+                raise Exception('Edge list with columns is wrong!')
+            # no header, default dtypes give str names and float attributes
+            h = Graph.from_edgelist(
+                io.StringIO(text),
+                columns = ['tail', 'head', 'cost', None, None],
+                chunksize = chunksize, vectorized = numpy_installed,
+                type = DIRECTED_GRAPH)
+            for (u, v) in g.edge_attr:
+                if h.edge_attr[(str(u), str(v))]['cost'] != \
+                   float(g.edge_attr[(u, v)]['cost']):
+                    raise Exception('Edge list default dtypes are wrong!')
+    gimpy.graph.NUMPY_INSTALLED = True
+    print('edge list ok')
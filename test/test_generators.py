@@ -0,0 +1,32 @@
+'''
+tests if min cost flow instances generated by netgen are feasible and
+network simplex and cycle canceling find the same optimal cost.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import netgen
+
+def flow_cost(g):
+    return sum(g.get_edge_attr(u, v, 'flow')*g.get_edge_attr(u, v, 'cost')
+               for (u, v) in g.get_edge_list())
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Problem'.ljust(15), 'Simplex'.ljust(8),
+          'Cycle canceling')
+    for seed in range(5):
+        for problem in ['min', 'transportation']:
+            cost = {}
+            for algo in ['simplex', 'cycle_canceling']:
+                if problem == 'min':
+                    g = netgen(30, 80, sources = 3, sinks = 4, supply = 200,
+                               seed = seed)
+                else:
+                    g = netgen(0, 20, sources = 4, sinks = 6, supply = 200,
+                               problem = problem, seed = seed)
+                g.min_cost_flow(algo = algo)
+                cost[algo] = flow_cost(g)
+            print(str(seed).ljust(5), problem.ljust(15),
+                  str(cost['simplex']).ljust(8), cost['cycle_canceling'])
+            if cost['simplex'] != cost['cycle_canceling']:
+                raise Exception('Optimal costs do not match!')
@@ -0,0 +1,60 @@
+'''
+tests if gnp_pairs() generates valid pairs in the documented order, all
+pairs if p is 1, and about p times the number of possible pairs otherwise,
+with and without antiparallel pairs.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy.graph import gnp_pairs
+import random
+
+def check_pairs(pairs, n, directed, antiparallel):
+    found = set(pairs)
+    if len(found) != len(pairs):
+        raise Exception('Pair generated twice!')
+    for (v, w) in pairs:
+        if v == w or not (0 <= v < n and 0 <= w < n):
+            raise Exception('Invalid pair!')
+        if not directed and w >= v:
+            raise Exception('Undirected pair is not (m, n) with n < m!')
+        if not antiparallel and (w, v) in found:
+            raise Exception('Antiparallel pairs generated!')
+    if directed and not antiparallel:
+        order = [(max(v, w), min(v, w)) for (v, w) in pairs]
+    else:
+        order = pairs
+    if order != sorted(order):
+        raise Exception('Pairs are out of order!')
+
+if __name__=='__main__':
+    n = 200
+    for directed, antiparallel in ((False, True), (True, True),
+                                   (True, False)):
+        pairs = list(gnp_pairs(n, 1, directed, antiparallel))
+        check_pairs(pairs, n, directed, antiparallel)
+        total = n*(n-1) if directed and antiparallel else n*(n-1)//2
+        if len(pairs) != total:
+            raise Exception('p = 1 does not give all pairs!')
+        for p in (0.01, 0.2):
+            random.seed(p)
+            pairs = list(gnp_pairs(n, p, directed, antiparallel))
+            check_pairs(pairs, n, directed, antiparallel)
+            total = n*(n-1) if directed else n*(n-1)//2
+            if directed and not antiparallel:
+                # expected number of pairs not dropped
+                expected = total*(p - p*p/2)
+            else:
+                expected = total*p
+            # five standard deviations
+            if abs(len(pairs) - expected) > 5*(expected**0.5):
+                raise Exception('Number of pairs is off!')
+    if list(gnp_pairs(n, 0)) or list(gnp_pairs(1, 0.5)):
+        raise Exception('Pairs generated for an empty graph!')
+    # drawn pairs are reproducible with random.seed()
+    random.seed(3)
+    first = list(gnp_pairs(n, 0.05, True, False))
+    random.seed(3)
+    if first != list(gnp_pairs(n, 0.05, True, False)):
+        raise Exception('Pairs are not reproducible!')
+    print('gnp pairs ok')
@@ -0,0 +1,68 @@
+'''
+tests if hamiltonian_branch_and_bound() finds paths and tours as cheap as
+Held-Karp dynamic programming, with and without NumPy, and if graphs whose
+Held-Karp table would not fit in memory go to branch and bound.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH, UNDIRECTED_GRAPH
+import gimpy.graph
+import random
+
+def random_graph(seed, n, graph_type):
+    random.seed(seed)
+    g = Graph(type = graph_type)
+    for u in range(n):
+        g.add_node(u)
+    for u in range(n):
+        for v in range(n):
+            if u == v or (u, v) in g.edge_attr or (v, u) in g.edge_attr:
+                continue
+            if random.random() < 0.5:
+                g.add_edge(u, v, cost = random.randint(1, 20))
+    return g
+
+def path_cost(g, path, tour):
+    arcs = list(zip(path, path[1:]))
+    if tour:
+        arcs.append((path[-1], path[0]))
+    return sum(g.get_edge_attr(u, v, 'cost') for u, v in arcs)
+
+def check(g, **kwargs):
+    path, cost = g.held_karp(**kwargs)
+    bb_path, bb_cost, optimal = g.hamiltonian_branch_and_bound(**kwargs)
+    if not optimal or cost != bb_cost:
+        raise Exception('Branch and bound and Held-Karp costs differ!')
+    if path is None:
+        if bb_path is not None:
+            raise Exception('Held-Karp missed a Hamiltonian path!')
+        return
+    for p in (path, bb_path):
+        if sorted(p) != list(range(g.get_node_num())):
+            raise Exception('Path is not Hamiltonian!')
+        if path_cost(g, p, kwargs.get('tour', False)) != cost:
+            raise Exception('Path cost is wrong!')
+        if kwargs.get('source') is not None and p[0] != kwargs['source']:
+            raise Exception('Path does not start at the source!')
+
+if __name__=='__main__':
+    for numpy_installed in (True, False):
+        gimpy.graph.NUMPY_INSTALLED = numpy_installed
+        for seed in range(10):
+            for graph_type in (DIRECTED_GRAPH, UNDIRECTED_GRAPH):
+                g = random_graph(seed, 6 + seed % 4, graph_type)
+                check(g)
+                check(g, source = 0)
+                check(g, source = 0, destination = 1)
+                check(g, tour = True)
+    gimpy.graph.NUMPY_INSTALLED = True
+    # a 20 node table would take 168 MB, branch and bound proves optimality
+    g = Graph(type = UNDIRECTED_GRAPH)
+    for u in range(20):
+        g.add_edge(u, (u + 1) % 20, cost = 1)
+    g.held_karp = None
+    path, cost, optimal = g.hamiltonian_path(tour = True)
+    if cost != 20 or not optimal:
+        raise Exception('Large tour is wrong!')
+    print('hamiltonian ok')
@@ -0,0 +1,105 @@
+'''
+tests page_rank() and page_rank_batch() (scipy.sparse, NumPy and pure
+Python paths) against the original in-place page-rank iteration on graphs
+without dangling nodes, and against a plain power iteration with dangling
+rank redistribution for personalized page-ranks.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH
+import gimpy.graph
+import random
+
+def random_digraph(seed, n = 30, m = 90, dangling = 0):
+    rand = random.Random(seed)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(range(n))
+    while len(g.edge_attr) < m:
+        u, v = rand.sample(range(n), 2)
+        if u >= dangling and (u, v) not in g.edge_attr:
+            g.add_edge(u, v)
+    return g
+
+def old_page_rank(g, damping_factor = 0.85, max_iterations = 1000,
+                  min_delta = 1e-12):
+    # the iteration page_rank() used before, valid without dangling nodes
+    nodes = g.get_node_list()
+    min_value = (1.0 - damping_factor)/len(nodes)
+    pagerank = dict.fromkeys(nodes, 1.0/len(nodes))
+    for _ in range(max_iterations):
+        diff = 0
+        for node in nodes:
+            rank = min_value
+            for referring_page in g.get_in_neighbors(node):
+                rank += (damping_factor*pagerank[referring_page]/
+                         len(g.get_neighbors(referring_page)))
+            diff += abs(pagerank[node] - rank)
+            pagerank[node] = rank
+        if diff < min_delta:
+            break
+    return pagerank
+
+def power_iteration(g, teleport, damping_factor = 0.85):
+    nodes = g.get_node_list()
+    total = float(sum(teleport.values()))
+    teleport = dict((n, teleport.get(n, 0)/total) for n in nodes)
+    rank = dict.fromkeys(nodes, 1.0/len(nodes))
+    for _ in range(1000):
+        leaked = sum(rank[n] for n in nodes if not g.neighbors[n])
+        rank = dict((n, (1 - damping_factor + damping_factor*leaked)*
+                     teleport[n] + damping_factor*
+                     sum(rank[m]/len(g.neighbors[m])
+                         for m in g.in_neighbors[n])) for n in nodes)
+    return rank
+
+def close(ranks, expected):
+    return all(abs(ranks[n] - expected[n]) < 1e-8 for n in expected)
+
+def all_paths(g, personalization = None):
+    '''
+    returns page-ranks computed by every path, scipy.sparse first
+    '''
+    results = []
+    scipy_installed = gimpy.graph.SCIPY_INSTALLED
+    numpy_installed = gimpy.graph.NUMPY_INSTALLED
+    for scipy, numpy in [(True, True), (False, True), (False, False)]:
+        gimpy.graph.SCIPY_INSTALLED = scipy and scipy_installed
+        gimpy.graph.NUMPY_INSTALLED = numpy and numpy_installed
+        g.clear_cache()
+        results.append(g.page_rank(max_iterations = 1000, min_delta = 1e-12,
+                                   personalization = personalization))
+    gimpy.graph.SCIPY_INSTALLED = scipy_installed
+    gimpy.graph.NUMPY_INSTALLED = numpy_installed
+    return results
+
+if __name__=='__main__':
+    for seed in range(5):
+        g = random_digraph(seed)
+        for n in g.get_node_list():
+            if not g.neighbors[n]:
+                g.add_edge(n, (n + 1) % 30)
+        expected = old_page_rank(g)
+        for ranks in all_paths(g):
+            if not close(ranks, expected):
+                raise Exception('Page-rank differs from the old iteration!')
+    for seed in range(5):
+        g = random_digraph(seed, dangling = 5)
+        rand = random.Random(seed)
+        vectors = [dict((n, rand.random()) for n in rand.sample(range(30), 5))
+                   for _ in range(3)]
+        for vector in [None] + vectors:
+            teleport = vector or dict.fromkeys(g.get_node_list(), 1)
+            expected = power_iteration(g, teleport)
+            for ranks in all_paths(g, vector):
+                if not close(ranks, expected):
+                    raise Exception('Wrong personalized page-rank!')
+        names, ranks = g.page_rank_batch(vectors, max_iterations = 1000,
+                                         min_delta = 1e-12)
+        for c, vector in enumerate(vectors):
+            if not close(dict(zip(names, ranks[:, c])),
+                         power_iteration(g, vector)):
+                raise Exception('Wrong batched page-rank!')
+        if abs(ranks.sum(axis = 0) - 1).max() > 1e-9:
+            raise Exception('Page-ranks do not sum up to 1!')
+    print('page rank ok')
@@ -0,0 +1,61 @@
+'''
+tests if parametric_max_flow() gives the max flow values of solves from
+scratch with scaled source arc capacities, and if its nested cuts and
+breakpoints describe the min cut capacity at every parameter in between.
+'''
+from __future__ import print_function
+from builtins import range
+
+from fractions import Fraction
+from test_steps import flow_network
+
+def scratch_value(g, parameter):
+    base = dict((n, g.get_edge_attr(0, n, 'capacity')) for n in g.neighbors[0])
+    for n in base:
+        g.set_edge_attr(0, n, 'capacity', parameter*base[n])
+    value = g.max_flow(0, 29, store = 'result').value
+    for n in base:
+        g.set_edge_attr(0, n, 'capacity', base[n])
+    return value
+
+def cut_capacity(g, cut, parameter):
+    cut = set(cut)
+    return sum(g.edge_attr[(n, m)]['capacity']*(parameter if n == 0 else 1)
+               for n in cut for m in g.neighbors[n] if m not in cut)
+
+def check(g, parameters, algo):
+    result = g.parametric_max_flow(0, 29, parameters, algo, 'off')
+    for parameter, value, k in zip(parameters, result.values,
+                                   result.cut_index):
+        if (value != scratch_value(g, parameter) or
+            cut_capacity(g, result.cuts[k], parameter) != value):
+            raise Exception('Wrong parametric max flow!')
+    for k in range(len(result.cuts)-1):
+        if not set(result.cuts[k]) < set(result.cuts[k+1]):
+            raise Exception('Cuts are not nested!')
+    # capacity of the cut of a segment is the max flow in it
+    points = sorted(set(parameters + result.breakpoints))
+    for k in range(len(points)-1):
+        middle = Fraction(points[k] + points[k+1])/2
+        segment = sum(1 for b in result.breakpoints if b < middle)
+        if (cut_capacity(g, result.cuts[segment], middle) !=
+            scratch_value(g, middle)):
+            raise Exception('Breakpoint is missing!')
+    for k, b in enumerate(result.breakpoints):
+        if (cut_capacity(g, result.cuts[k], b) != scratch_value(g, b) or
+            cut_capacity(g, result.cuts[k+1], b) != scratch_value(g, b)):
+            raise Exception('Wrong breakpoint!')
+    return result
+
+if __name__=='__main__':
+    for algo in ['FIFO', 'SAP', 'HighestLabel']:
+        g = flow_network(0)
+        if not check(g, [0, 1, 2, 3, 5, 8], algo).breakpoints:
+            raise Exception('No breakpoint to check!')
+        # node 30 can not reach sink, no flow is left on its source arc
+        g.add_edge(0, 30, capacity = 5)
+        g.add_edge(30, 31, capacity = 3)
+        check(g, [1, 2, 4], algo)
+        if g.get_edge_attr(0, 30, 'flow') > 0:
+            raise Exception('Flow left on a source arc to a node cut from sink!')
+    print('parametric ok')
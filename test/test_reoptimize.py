@@ -0,0 +1,54 @@
+'''
+tests if reoptimize_max_flow() after update_capacities() gives a feasible
+flow with the value of a max flow solved from scratch, for the augmenting
+path and preflow push algorithms.
+'''
+from __future__ import print_function
+from builtins import range
+
+from test_steps import flow_network
+
+def feasible(g, source, sink):
+    balance = dict.fromkeys(g.get_node_list(), 0)
+    for (i, j), attr in g.edge_attr.items():
+        if attr['flow'] < 0 or attr['flow'] > attr['capacity']:
+            return False
+        balance[i] -= attr['flow']
+        balance[j] += attr['flow']
+    return all(balance[n] == 0 for n in balance if n not in (source, sink))
+
+def flow_value(g, source):
+    return (sum(g.edge_attr[(source, n)]['flow'] for n in g.neighbors[source])
+            - sum(g.edge_attr[(n, source)]['flow']
+                  for n in g.in_neighbors[source]))
+
+def check_update(g, capacities):
+    g.update_capacities(capacities)
+    value = g.reoptimize_max_flow()
+    if (not feasible(g, 0, 29) or value != flow_value(g, 0) or
+        value != g.max_flow(0, 29, store = 'result').value):
+        raise Exception('Reoptimized flow is not a max flow!')
+
+if __name__=='__main__':
+    for algo in ['DFS', 'BFS', 'FIFO', 'SAP', 'HighestLabel']:
+        g = flow_network(0)
+        if algo in ('DFS', 'BFS'):
+            g.max_flow(0, 29, 'off', algo)
+        else:
+            g.max_flow_preflowpush(0, 29, algo, 'off')
+        # cut below the flow, closed and opened again
+        loaded = [e for e in g.edge_attr if g.edge_attr[e]['flow'] > 1]
+        check_update(g, dict((e, 1) for e in loaded[:3]))
+        check_update(g, {loaded[0]:0})
+        check_update(g, dict((e, 40) for e in loaded[:3]))
+        # source and sink arcs
+        check_update(g, dict(((0, n), 0) for n in g.neighbors[0]))
+        check_update(g, dict(((0, n), 20) for n in g.neighbors[0]))
+        check_update(g, dict(((n, 29), 40) for n in g.in_neighbors[29]))
+    # nodes and arcs changed, solved from scratch
+    g = flow_network(0)
+    g.max_flow(0, 29, 'off')
+    g.del_edge(g.get_edge_list()[0])
+    if g.reoptimize_max_flow() != g.max_flow(0, 29, store = 'result').value:
+        raise Exception('Max flow is not solved again after a change!')
+    print('reoptimize ok')
@@ -0,0 +1,107 @@
+'''
+tests if methods called with store='result' return the results that they
+write to attributes with store='attrs' and leave the graph unchanged.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH, netgen
+
+def attributes(g):
+    return (dict((n, dict(g.get_node(n).attr)) for n in g.get_node_list()),
+            dict((e, dict(g.edge_attr[e])) for e in g.get_edge_list()))
+
+def node_values(g, attr):
+    return dict((n, g.get_node_attr(n, attr)) for n in g.get_node_list()
+                if g.get_node_attr(n, attr) is not None)
+
+def clear(g, attr):
+    for n in g.get_node_list():
+        g.get_node(n).attr.pop(attr, None)
+
+def check_searches(g):
+    directed = g.graph_type is DIRECTED_GRAPH
+    for algo in ('DFS', 'BFS', 'Dijkstra', 'Prim'):
+        for destination in (None, 5, 7):
+            reverses = (False,)
+            if directed and algo in ('DFS', 'BFS'):
+                reverses = (False, True)
+            for reverse in reverses:
+                before = attributes(g)
+                result = g.search(1, destination, component = 3, algo = algo,
+                                  reverse = reverse, store = 'result')
+                if attributes(g) != before:
+                    raise Exception('Graph is changed with store=result!')
+                clear(g, 'component')
+                found = g.search(1, destination, component = 3, algo = algo,
+                                 reverse = reverse)
+                if result.path is not None and result.path != found:
+                    raise Exception('%s paths do not match!' %algo)
+                if result.path is None and result.pred != found:
+                    raise Exception('%s trees do not match!' %algo)
+                distance = 'priority' if algo in ('Dijkstra', 'Prim') \
+                    else 'distance'
+                if result.distance != node_values(g, distance):
+                    raise Exception('%s distances do not match!' %algo)
+                if result.component != node_values(g, 'component'):
+                    raise Exception('%s components do not match!' %algo)
+    order = []
+    result = g.dfs(1, component = 2, topological_order = order,
+                   store = 'result')
+    clear(g, 'component')
+    g.dfs(1, component = 2, topological_order = [])
+    if (result.disc_time != node_values(g, 'disc_time') or
+        result.finish_time != node_values(g, 'finish_time')):
+        raise Exception('DFS times do not match!')
+    if order != sorted(result.finish_time, key = result.finish_time.get,
+                       reverse = True):
+        raise Exception('DFS order is wrong!')
+    if directed:
+        valid, pred = g.fifo_label_correcting(1)
+        result = g.fifo_label_correcting(1, store = 'result')
+        if (result.valid, result.pred) != (valid, pred) or \
+           result.distance != dict((n, g.get_node_attr(n, 'distance'))
+                                   for n in pred):
+            raise Exception('Label correcting results do not match!')
+    else:
+        result = g.label_components(store = 'result')
+        g.label_components()
+        if (result.component != node_values(g, 'component') or
+            result.num_components != g.num_components):
+            raise Exception('Components do not match!')
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Max flow'.ljust(9), 'Min cost'.ljust(9), 'Search')
+    for seed in range(5):
+        g = netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+        before = attributes(g)
+        max_flow = g.max_flow(1, 30, store = 'result')
+        min_cost = g.min_cost_flow(store = 'result')
+        search = g.search(1, algo = 'BFS', store = 'result')
+        if attributes(g) != before:
+            raise Exception('Graph is changed with store=result!')
+        g.max_flow(1, 30)
+        if max_flow.flow != dict((e, g.edge_attr[e]['flow'])
+                                 for e in g.get_edge_list()):
+            raise Exception('Max flows do not match!')
+        g.min_cost_flow()
+        if min_cost.flow != dict((e, g.edge_attr[e]['flow'])
+                                 for e in g.get_edge_list()):
+            raise Exception('Min cost flows do not match!')
+        g.search(1, algo = 'BFS')
+        if search.distance != dict((n, g.get_node_attr(n, 'distance'))
+                                   for n in g.get_node_list()
+                                   if g.get_node_attr(n, 'distance')
+                                   is not None):
+            raise Exception('Search distances do not match!')
+        check_searches(g)
+        u = Graph()
+        u.random(numnodes = 40, degree_range = (1, 3), seedInput = seed)
+        check_searches(u)
+        max_flow = g.max_flow(1, 30, algo = 'BFS', store = 'result')
+        g.max_flow(1, 30, algo = 'BFS')
+        if max_flow.flow != dict((e, g.edge_attr[e]['flow'])
+                                 for e in g.get_edge_list()):
+            raise Exception('BFS max flows do not match!')
+        print(str(seed).ljust(5), str(max_flow.value).ljust(9),
+              str(min_cost.value).ljust(9), len(search.pred))
@@ -0,0 +1,42 @@
+'''
+tests if shortest path queries on graph snapshots, run on thread and process
+pools, give the distances of Dijkstra's algorithm of search() and if
+snapshots are not changed by later changes of the graph.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import netgen
+from gimpy import QueryExecutor, VersionedSnapshot
+
+def dijkstra_distances(g, source):
+    result = g.search(source, algo = 'Dijkstra', store = 'result')
+    return dict((n, d) for n, d in result.distance.items()
+                if n == source or n in result.pred)
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Threads'.ljust(8), 'Processes'.ljust(10), 'Frozen')
+    for seed in range(5):
+        g = netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+        store = VersionedSnapshot(g)
+        nodes = g.get_node_list()
+        expected = [dijkstra_distances(g, n) for n in nodes]
+        queries = [('distances', n) for n in nodes]
+        with QueryExecutor(store, workers = 4) as executor:
+            threads = executor.map(queries) == expected
+        with QueryExecutor(store, workers = 2, processes = True) as executor:
+            processes = executor.map(queries) == expected
+        old = store.current()
+        u, v = nodes[0], nodes[1]
+        if (u, v) in g.edge_attr:
+            g.del_edge((u, v))
+        else:
+            g.add_edge(u, v, cost = 0)
+        store.publish(g)
+        frozen = (old.distances(u) == expected[0] and
+                  store.current().distances(u) == dijkstra_distances(g, u) and
+                  store.get_version() == 2)
+        print(str(seed).ljust(5), str(threads).ljust(8),
+              str(processes).ljust(10), frozen)
+        if not (threads and processes and frozen):
+            raise Exception('Snapshot query does not match search()!')
@@ -0,0 +1,44 @@
+'''
+tests if headless minimum spanning forest kernels agree with each other,
+with Boruvka scans run in this process and on a process pool, and if
+kernels run by KernelPool in threads do not share their data.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Kruskal'.ljust(8), 'Prim'.ljust(8), 'Boruvka')
+    for seed in range(10):
+        g = Graph()
+        g.random(numnodes = 100, density = 0.05, seedInput = seed)
+        weight = {}
+        for algo in ['Kruskal', 'Prim', 'Boruvka']:
+            edges, weight[algo] = g.minimum_spanning_forest(algo = algo)
+        print(str(seed).ljust(5), str(weight['Kruskal']).ljust(8),
+              str(weight['Prim']).ljust(8), str(weight['Boruvka']))
+        if len(set(weight.values())) != 1:
+            raise Exception('Spanning forest weights do not match!')
+        if g.minimum_spanning_forest('Boruvka', workers = 2)[1] != \
+           weight['Boruvka']:
+            raise Exception('Boruvka on a process pool is wrong!')
+    # kernels run by KernelPool in threads do not share their data
+    from concurrent.futures import ThreadPoolExecutor
+    import gimpy.graph
+    import sys
+    gimpy.graph.NUMPY_INSTALLED = False
+    # switch threads often so a shared kernel state would be overwritten
+    sys.setswitchinterval(1e-6)
+    graphs = []
+    for seed in range(8):
+        g = Graph()
+        g.random(numnodes = 100 + 10*seed, density = 0.05, seedInput = seed)
+        graphs.append(g)
+    expected = [g.minimum_spanning_forest('Kruskal')[1] for g in graphs]
+    with ThreadPoolExecutor(max_workers = 4) as pool:
+        for _ in range(10):
+            weights = list(pool.map(
+                lambda g: g.minimum_spanning_forest('Boruvka')[1], graphs))
+            if weights != expected:
+                raise Exception('Boruvka threads overwrite each other!')
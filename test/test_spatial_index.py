@@ -0,0 +1,66 @@
+'''
+tests if the k-d tree and the grid fallback of SpatialIndex find the same
+nearest neighbors and the same points within a radius, if the grid is
+used when NumPy is not installed, and if random() builds the same Euclidean
+graph with both.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph
+from gimpy.graph import SpatialIndex
+import gimpy.graph
+import random
+
+SCIPY_INSTALLED = gimpy.graph.NUMPY_INSTALLED and gimpy.graph.SCIPY_INSTALLED
+
+def build(xs, ys, scipy_installed, numpy_installed = True):
+    gimpy.graph.SCIPY_INSTALLED = scipy_installed
+    gimpy.graph.NUMPY_INSTALLED = numpy_installed
+    index = SpatialIndex(xs, ys)
+    gimpy.graph.SCIPY_INSTALLED = SCIPY_INSTALLED
+    gimpy.graph.NUMPY_INSTALLED = True
+    return index
+
+def random_graph(seed):
+    g = Graph()
+    g.random(numnodes = 150, degree_range = (2, 6), Euclidean = True,
+             seedInput = seed)
+    return g
+
+if __name__=='__main__':
+    if not SCIPY_INSTALLED:
+        print('SciPy is not installed, nothing to compare')
+        exit()
+    for seed in range(5):
+        random.seed(seed)
+        n = 300
+        xs = [random.random()*10 for i in range(n)]
+        ys = [random.random()*10 for i in range(n)]
+        # a dense cluster puts many points in one grid cell
+        xs[:50] = [5 + random.random()*0.01 for i in range(50)]
+        tree = build(xs, ys, True)
+        grid = build(xs, ys, False)
+        if tree.tree is None or grid.cells is None or grid.points is not None:
+            raise Exception('Index did not pick the expected structure!')
+        # SciPy without NumPy falls back to the grid
+        if build(xs, ys, True, False).cells is None:
+            raise Exception('k-d tree built without NumPy!')
+        for i in range(n):
+            for k in (1, 5, 20):
+                if tree.nearest(i, k) != grid.nearest(i, k):
+                    raise Exception('Nearest neighbors differ!')
+            for r in (0.05, 0.5, 2.0):
+                if sorted(tree.within(i, r)) != sorted(grid.within(i, r)):
+                    raise Exception('Points within radius differ!')
+        tree.prefetch(20)
+        for i in range(n):
+            if tree.nearest(i, 10) != grid.nearest(i, 10):
+                raise Exception('Prefetched nearest neighbors differ!')
+    expected = random_graph(0)
+    gimpy.graph.SCIPY_INSTALLED = False
+    g = random_graph(0)
+    gimpy.graph.SCIPY_INSTALLED = SCIPY_INSTALLED
+    if sorted(g.get_edge_list()) != sorted(expected.get_edge_list()):
+        raise Exception('Euclidean graphs differ!')
+    print('spatial index ok')
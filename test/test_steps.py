@@ -0,0 +1,74 @@
+'''
+tests if the *_steps() generators of network simplex, cycle canceling and
+preflow push reach the results of the methods that run to completion, and
+if the asyncio wrappers interleave solves on one event loop.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH, netgen
+from gimpy import aio
+import asyncio
+import random
+
+def flow_network(seed, n = 30, m = 120):
+    rand = random.Random(seed)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(range(n))
+    while len(g.edge_attr) < m:
+        u, v = rand.sample(range(n), 2)
+        if (u, v) not in g.edge_attr and (v, u) not in g.edge_attr:
+            g.add_edge(u, v, capacity = rand.randint(1, 20))
+    return g
+
+def max_flow_value(g, source):
+    return sum(g.get_edge_attr(source, n, 'flow') for n in g.neighbors[source])
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Simplex'.ljust(8), 'Cycle'.ljust(6),
+          'Preflow'.ljust(8), 'Steps')
+    for seed in range(5):
+        g = netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+        g.min_cost_flow(algo = 'simplex', root = g.get_node_list()[0])
+        simplex = g.get_flow_cost()
+        steps = list(g.network_simplex_steps('off', 'dantzig',
+                                             g.get_node_list()[0], 1, False))
+        if steps[-1].objective != simplex or not steps[-1].done:
+            raise Exception('Simplex steps do not reach optimal cost!')
+        # pushes of the feasible flow search are yielded before pivots
+        feasibility = [s for s in steps if s.objective is None]
+        pivots = steps[len(feasibility):-1]
+        if ([s.iteration for s in feasibility] !=
+            list(range(1, len(feasibility) + 1)) or
+            'from' not in feasibility[0].state):
+            raise Exception('Feasible flow search does not yield pushes!')
+        if [s.iteration for s in pivots] != list(range(1, len(pivots) + 1)):
+            raise Exception('Simplex does not yield after every pivot!')
+        canceling = list(g.cycle_canceling_steps('off', 5))
+        if canceling[-1].objective != simplex:
+            raise Exception('Cycle canceling steps do not reach optimal cost!')
+        if canceling[0].objective is not None or canceling[0].iteration != 5:
+            raise Exception('Cycle canceling does not yield pushes first!')
+        f = flow_network(seed)
+        f.max_flow(0, 29, 'off')
+        value = max_flow_value(f, 0)
+        pushes = list(f.max_flow_preflowpush_steps(0, 29, every = 10))
+        objectives = [s.objective for s in pushes]
+        if objectives[-1] != value or objectives != sorted(objectives):
+            raise Exception('Preflow push steps do not reach max flow!')
+        print(str(seed).ljust(5), str(simplex).ljust(8),
+              str(canceling[-1].objective).ljust(6), str(value).ljust(8),
+              len(steps) + len(canceling) + len(pushes))
+    # solves on one event loop take turns
+    order = []
+    graphs = [netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+              for seed in range(3)]
+    async def solve_all():
+        return await asyncio.gather(*[
+            aio.min_cost_flow(g, every = 1,
+                              callback = lambda step, k = k: order.append(k))
+            for k, g in enumerate(graphs)])
+    if asyncio.run(solve_all()) != [True]*3:
+        raise Exception('Asynchronous solve failed!')
+    if order[:3] != [0, 1, 2]:
+        raise Exception('Solves are not interleaved!')
@@ -1,5 +1,7 @@
 from __future__ import print_function
+from builtins import range
 from gimpy import Graph, DIRECTED_GRAPH
+import random
 
 def generate_test_instance1():
     g = Graph(type=DIRECTED_GRAPH, display='pygame')
@@ -31,7 +33,60 @@ def generate_test_instance2():
     g.add_edge(1,8)
     return g
 
+def random_digraph(seed, n = 40, m = 70):
+    rand = random.Random(seed)
+    g = Graph(type = DIRECTED_GRAPH)
+    g.add_nodes(range(n))
+    while len(g.edge_attr) < m:
+        u, v = rand.sample(range(n), 2)
+        if (u, v) not in g.edge_attr:
+            g.add_edge(u, v)
+    return g
+
+def reachable(g, s):
+    reached = set([s])
+    q = [s]
+    while q:
+        for m in g.neighbors[q.pop()]:
+            if m not in reached:
+                reached.add(m)
+                q.append(m)
+    return reached
+
+def check_strong_components():
+    '''
+    compares iterative Tarjan (Pearce) components with mutual reachability
+    and checks that components are numbered in reverse topological order of
+    the condensation. A long cycle checks there is no recursion limit.
+    '''
+    for seed in range(20):
+        g = random_digraph(seed)
+        nl = g.get_node_list()
+        component, dag = g.strong_components(condensation = True)
+        comp = dict(zip(nl, component))
+        reach = dict((n, reachable(g, n)) for n in nl)
+        for u in nl:
+            for v in nl:
+                if (comp[u] == comp[v]) != (v in reach[u] and u in reach[v]):
+                    raise Exception('Wrong strongly connected components!')
+        for u, v in g.edge_attr:
+            if comp[u] < comp[v]:
+                raise Exception('Components are not in reverse '
+                                'topological order!')
+        if sorted(dag.edge_attr) != sorted(set(
+            (comp[u], comp[v]) for u, v in g.edge_attr if comp[u] != comp[v])):
+            raise Exception('Wrong condensation!')
+    g = Graph(type = DIRECTED_GRAPH)
+    for i in range(20000):
+        g.add_edge(i, i + 1)
+    g.add_edge(20000, 0)
+    g.add_edge(0, 20001)
+    component = g.strong_components()[0]
+    if sorted(set(component)) != [0, 1] or component.count(1) != 20001:
+        raise Exception('Long cycle is not one component!')
+
 if __name__=='__main__':
+    check_strong_components()
     g = generate_test_instance1()
     #g.label_strong_component(0)
     g.tarjan()
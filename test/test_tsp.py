@@ -0,0 +1,59 @@
+'''
+tests TSP local search on Euclidean random graphs. Checks that returned
+tours visit every node once, that their reported length is correct and
+that restarts on a process pool give the tour of restarts in this process.
+Also checks Or-opt moves that put a segment next to its old neighbors.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, UNDIRECTED_GRAPH, solve_tsp
+from gimpy.tsp import tsp_data, Tour
+import math
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Restarts'.ljust(9), 'Length')
+    for seed in range(5):
+        g = Graph(type = UNDIRECTED_GRAPH)
+        g.random(numnodes = 200, degree_range = (6, 8), Euclidean = True,
+                 seedInput = seed)
+        for restarts in [1, 4]:
+            tour, length = solve_tsp(g, restarts = restarts, workers = 2,
+                                     seed = seed)
+            if sorted(tour) != sorted(g.get_node_list()):
+                raise Exception('Tour does not visit every node once!')
+            x = [g.get_node_attr(v, 'locationx') for v in tour]
+            y = [g.get_node_attr(v, 'locationy') for v in tour]
+            check = sum(math.hypot(x[k-1] - x[k], y[k-1] - y[k])
+                        for k in range(len(tour)))
+            if abs(check - length) > 1e-6:
+                raise Exception('Tour length is wrong!')
+            if (tour, length) != solve_tsp(g, restarts = restarts,
+                                           seed = seed):
+                raise Exception('Restarts on a process pool differ!')
+            print(str(seed).ljust(5), str(restarts).ljust(9), round(length, 3))
+    # 2-opt optimal tour only improved by moving a segment next to its old
+    # neighbors, (c,d) of the move contains p0 or n0
+    g = Graph(type = UNDIRECTED_GRAPH)
+    g.random(numnodes = 12, degree_range = (3, 4), Euclidean = True,
+             seedInput = 1)
+    data = tsp_data(g, neighbors = 3)
+    order = [5, 1, 2, 3, 7, 8, 0, 10, 4, 6, 9, 11]
+    found = False
+    for a in range(12):
+        tour = Tour(data, order)
+        if tour.two_opt_step(a) is not None:
+            raise Exception('Tour is not 2-opt optimal!')
+        length = tour.length()
+        touched = tour.or_opt_step(a)
+        if touched is None:
+            continue
+        p0, n0, s1, s2, c, d = touched
+        if not set([c, d]) & set([p0, n0]):
+            raise Exception('Or-opt move is not next to the segment!')
+        if (tour.length() > length - 1e-9 or
+            sorted(tour.get_order()) != list(range(12))):
+            raise Exception('Or-opt move next to the segment is wrong!')
+        found = True
+    if not found:
+        raise Exception('Or-opt move next to the segment is not found!')
@@ -0,0 +1,56 @@
+'''
+tests if graph views have the same nodes, edges and edge attributes as the
+graphs they represent (reversed graph, induced subgraph, residual graph) and
+if the overlay used by find_feasible_flow leaves the graph unchanged.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import Graph, DIRECTED_GRAPH, netgen
+import random
+
+def same(view, g, attr):
+    if sorted(view.get_node_list()) != sorted(g.get_node_list()):
+        return False
+    if sorted(view.get_edge_list()) != sorted(g.get_edge_list()):
+        return False
+    for n in g.get_node_list():
+        if sorted(view.get_neighbors(n)) != sorted(g.get_neighbors(n)):
+            return False
+        if sorted(view.get_in_neighbors(n)) != sorted(g.get_in_neighbors(n)):
+            return False
+    for (u, v) in g.get_edge_list():
+        if view.get_edge_attr(u, v, attr) != g.get_edge_attr(u, v, attr):
+            return False
+    return True
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Reverse'.ljust(8), 'Subgraph'.ljust(9), 'Residual')
+    for seed in range(5):
+        rand = random.Random(seed)
+        g = netgen(30, 100, sources = 2, sinks = 3, seed = seed)
+        reverse = Graph(type = DIRECTED_GRAPH)
+        reverse.add_nodes(g.get_node_list())
+        for (u, v) in g.get_edge_list():
+            reverse.add_edge(v, u, cost = g.get_edge_attr(u, v, 'cost'))
+        nodes = rand.sample(g.get_node_list(), 15)
+        sub = Graph(type = DIRECTED_GRAPH)
+        sub.add_nodes(nodes)
+        for (u, v) in g.get_edge_list():
+            if u in nodes and v in nodes:
+                sub.add_edge(u, v, cost = g.get_edge_attr(u, v, 'cost'))
+        edges = g.get_edge_list()
+        g.min_cost_flow()
+        if g.get_edge_list() != edges or 's' in g.nodes:
+            raise Exception('Graph is changed by find_feasible_flow!')
+        residual = g.create_residual_graph()
+        for n in g.get_node_list():
+            if n not in residual.nodes:
+                residual.add_node(n)
+        results = (same(g.reverse_view(), reverse, 'cost'),
+                   same(g.subgraph_view(nodes), sub, 'cost'),
+                   same(g.residual_view(), residual, 'capacity'))
+        print(str(seed).ljust(5), str(results[0]).ljust(8),
+              str(results[1]).ljust(9), results[2])
+        if not all(results):
+            raise Exception('View does not match the graph it represents!')
@@ -0,0 +1,48 @@
+'''
+tests if network simplex started from the basis of the previous solve finds
+the optimal costs of a solve from scratch after arc costs, node demands and
+arc capacities change.
+'''
+from __future__ import print_function
+from builtins import range
+
+from gimpy import netgen
+import random
+import time
+
+if __name__=='__main__':
+    print('Seed'.ljust(5), 'Change'.ljust(9), 'Cost'.ljust(8), 'Cold'.ljust(8),
+          'Warm')
+    for seed in range(5):
+        rand = random.Random(seed)
+        g = netgen(60, 300, sources = 3, sinks = 4, seed = seed)
+        root = g.get_node_list()[0]
+        g.min_cost_flow(root = root)
+        for change in ['cost', 'demand', 'capacity']*2:
+            edges = rand.sample(g.get_edge_list(), 5)
+            if change == 'cost':
+                for e in edges:
+                    g.edge_attr[e]['cost'] = rand.randint(1, 100)
+            elif change == 'demand':
+                supply = [n for n in g.get_node_list()
+                          if g.get_node(n).get_attr('demand') > 0]
+                a = rand.choice(supply)
+                b = rand.choice(g.get_node_list())
+                amount = rand.randint(1, 5)
+                g.get_node(a).attr['demand'] += amount
+                g.get_node(b).attr['demand'] -= amount
+            else:
+                for e in edges:
+                    g.edge_attr[e]['capacity'] = max(0,
+                        g.edge_attr[e]['capacity'] + rand.randint(-10, 10))
+            start = time.time()
+            cold = g.min_cost_flow(root = root, store = 'result')
+            cold_time = time.time() - start
+            start = time.time()
+            feasible = g.min_cost_flow(root = root)
+            warm_time = time.time() - start
+            print(str(seed).ljust(5), change.ljust(9),
+                  str(cold.value).ljust(8), ('%.4f' %cold_time).ljust(8),
+                  '%.4f' %warm_time)
+            if feasible != cold.feasible or g.get_flow_cost() != cold.value:
+                raise Exception('Warm started simplex is not optimal!')